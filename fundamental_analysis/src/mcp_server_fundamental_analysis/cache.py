@@ -0,0 +1,228 @@
+"""In-process cache of Finnhub responses.
+
+Entries expire after a per-endpoint TTL and are evicted least recently used
+first once the cache holds too many entries or too many bytes. Concurrent
+misses for the same key are coalesced, so only one thread fetches while the
+others wait for its result.
+"""
+
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, NamedTuple, Optional
+
+# TTL in seconds for endpoints without an entry in the TTL table
+DEFAULT_TTL = 3600.0
+
+# Empty responses, e.g. for an unknown ticker, are cached at most this long
+EMPTY_TTL = 300.0
+
+
+class CacheEntry(NamedTuple):
+    """A cached response."""
+
+    value: Any
+    expires: float
+    size: int
+
+
+class Fetched(NamedTuple):
+    """A fetched response that knows how long it stays fresh.
+
+    Fetches returning one, e.g. a response read from a persistent store,
+    are cached for ttl seconds instead of the endpoint's TTL.
+    """
+
+    value: Any
+    ttl: Optional[float] = None
+
+
+class _Flight:
+    """A fetch in progress that other callers wait on."""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.value: Any = None
+        self.error: Optional[BaseException] = None
+
+
+def is_empty(value: Any) -> bool:
+    """Whether a response carries no data.
+
+    Finnhub answers an unknown ticker with ``{}`` on most endpoints, but with
+    ``{"metric": {}, "series": {}, ...}`` on basic financials.
+    """
+    if isinstance(value, dict) and "metric" in value:
+        return not value["metric"]
+    return not value
+
+
+def _size(value: Any) -> int:
+    try:
+        return len(json.dumps(value, default=str))
+    except (TypeError, ValueError):
+        return len(repr(value))
+
+
+class ResponseCache:
+    """Thread-safe TTL and LRU cache with single-flight fetches."""
+
+    def __init__(
+        self,
+        ttls: Optional[Dict[str, float]] = None,
+        max_entries: int = 1000,
+        max_bytes: int = 32 * 1024 * 1024
+    ):
+        """Initialize an empty cache.
+
+        Args:
+            ttls: Seconds each endpoint's responses stay fresh, by endpoint name.
+            max_entries: Maximum number of entries; 0 disables caching.
+            max_bytes: Maximum total size of the cached responses as JSON.
+        """
+        self.ttls = dict(ttls or {})
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[Hashable, CacheEntry]" = OrderedDict()
+        self._flights: Dict[Hashable, _Flight] = {}
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._counters: Dict[str, Dict[str, int]] = {}
+
+    def _count(self, endpoint: str, counter: str) -> None:
+        counters = self._counters.setdefault(
+            endpoint, {"hits": 0, "misses": 0, "coalesced": 0, "evictions": 0, "expirations": 0}
+        )
+        counters[counter] += 1
+
+    def _fresh(self, key: Hashable, now: float) -> Optional[CacheEntry]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry.expires <= now:
+            self._remove(key)
+            self._count(key[0], "expirations")
+            return None
+        return entry
+
+    def _remove(self, key: Hashable) -> None:
+        entry = self._entries.pop(key)
+        self._bytes -= entry.size
+
+    def contains(self, endpoint: str, ticker: str) -> bool:
+        """Whether a fresh response is cached, without counting a lookup."""
+        with self._lock:
+            return self._fresh((endpoint, ticker.upper()), time.monotonic()) is not None
+
+    def get_or_fetch(self, endpoint: str, ticker: str, fetch: Callable[[], Any]) -> Any:
+        """Return the cached response, or fetch and cache it.
+
+        Errors raised by fetch are passed to every waiting caller and are not
+        cached.
+
+        Args:
+            endpoint: Endpoint name, used for the TTL and statistics.
+            ticker: The stock ticker symbol.
+            fetch: Performs the request on a miss, returning the response or
+                a Fetched with its remaining lifetime.
+        """
+        if self.max_entries <= 0:
+            result = fetch()
+            return result.value if isinstance(result, Fetched) else result
+
+        key = (endpoint, ticker.upper())
+        leader = False
+        with self._lock:
+            entry = self._fresh(key, time.monotonic())
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self._count(endpoint, "hits")
+                return entry.value
+            flight = self._flights.get(key)
+            if flight is not None:
+                self._count(endpoint, "coalesced")
+            else:
+                flight = self._flights[key] = _Flight()
+                self._count(endpoint, "misses")
+                leader = True
+        if not leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.value
+
+        try:
+            result = fetch()
+            if not isinstance(result, Fetched):
+                result = Fetched(result)
+            flight.value = result.value
+        except BaseException as e:
+            flight.error = e
+            raise
+        else:
+            self._store(key, result.value, result.ttl)
+        finally:
+            with self._lock:
+                del self._flights[key]
+            flight.done.set()
+        return flight.value
+
+    def put(self, endpoint: str, ticker: str, value: Any, ttl: Optional[float] = None) -> None:
+        """Cache a response fetched outside get_or_fetch, e.g. by a background refresh.
+
+        Args:
+            endpoint: Endpoint name, used for the TTL and statistics.
+            ticker: The stock ticker symbol.
+            value: The response.
+            ttl: Seconds the response stays fresh (optional, defaults to the endpoint's TTL).
+        """
+        if self.max_entries > 0:
+            self._store((endpoint, ticker.upper()), value, ttl)
+
+    def _store(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> None:
+        if ttl is None:
+            ttl = self.ttls.get(key[0], DEFAULT_TTL)
+        if is_empty(value):
+            ttl = min(ttl, EMPTY_TTL)
+        size = _size(value)
+        if ttl <= 0 or size > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = CacheEntry(value, time.monotonic() + ttl, size)
+            self._bytes += size
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self._count(oldest[0], "evictions")
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit, miss and eviction counts overall and per endpoint."""
+        with self._lock:
+            totals = {"hits": 0, "misses": 0, "coalesced": 0, "evictions": 0, "expirations": 0}
+            for counters in self._counters.values():
+                for name, value in counters.items():
+                    totals[name] += value
+            lookups = totals["hits"] + totals["misses"] + totals["coalesced"]
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_entries": self.max_entries,
+                "max_bytes": self.max_bytes,
+                **totals,
+                "hit_rate": (totals["hits"] + totals["coalesced"]) / lookups if lookups else 0.0,
+                "endpoints": {name: dict(counters) for name, counters in sorted(self._counters.items())},
+            }
+
+    def reset_stats(self) -> None:
+        """Zero the statistics."""
+        with self._lock:
+            self._counters.clear()
+
+    def clear(self) -> None:
+        """Drop every cached response."""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
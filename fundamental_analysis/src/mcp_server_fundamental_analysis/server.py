@@ -1,15 +1,225 @@
 """MCP server for performing fundamental analysis of stocks."""
 
 import asyncio
+import atexit
 import json
 import os
+import random
+import threading
+import time
 import finnhub
-from mcp.server.fastmcp import FastMCP
-from typing import Dict, Any, Optional
+from concurrent.futures import ThreadPoolExecutor
+from mcp.server.fastmcp import Context, FastMCP
+from requests.adapters import HTTPAdapter
+from typing import Callable, Dict, Any, Iterable, List, Optional, Set, Tuple
+
+from .cache import Fetched, ResponseCache, is_empty
+from .store import ResponseStore
 
 # Initialize FastMCP server
 mcp = FastMCP("fundamental_analysis")
 
+# Finnhub endpoints fetched for an analysis, by name. Each entry takes the
+# client and a ticker; add an entry here to fetch another endpoint alongside.
+ENDPOINTS: Dict[str, Callable[[finnhub.Client, str], Any]] = {
+    "financials": lambda client, ticker: client.company_basic_financials(ticker, 'all'),
+    "profile": lambda client, ticker: client.company_profile2(symbol=ticker),
+}
+
+# Maximum number of Finnhub requests in flight across all analyses
+FETCH_WORKERS = int(os.getenv("FINNHUB_FETCH_WORKERS", "8"))
+
+# Shared pool the endpoint requests of each analysis are issued on
+fetch_pool = ThreadPoolExecutor(max_workers=FETCH_WORKERS, thread_name_prefix="finnhub")
+
+# Keep-alive connections kept open per client; matches the fetch pool so no
+# worker thread has to open a fresh connection
+HTTP_POOL_SIZE = int(os.getenv("FINNHUB_HTTP_POOL_SIZE", str(FETCH_WORKERS)))
+
+def _mount_pool(client: finnhub.Client, pool_size: int) -> bool:
+    """Size the connection pool of a client's requests session.
+
+    finnhub.Client has no public way to configure its session, so this reaches
+    into the private ``_session`` attribute of finnhub-python 2.x. If a later
+    release renames or replaces it, the client keeps its default pool instead
+    of failing.
+
+    Returns:
+        Whether the pool was resized.
+    """
+    session = getattr(client, "_session", None)
+    if not callable(getattr(session, "mount", None)):
+        return False
+    session.mount("https://", HTTPAdapter(pool_connections=1, pool_maxsize=pool_size))
+    return True
+
+class ClientPool:
+    """Process-wide Finnhub clients keyed by API key.
+
+    Each client keeps a requests session whose connection pool is sized for
+    the fetch pool, so repeated calls reuse open TLS connections instead of
+    paying for a new handshake. Sessions are safe to share between the
+    executor threads for the plain GET requests Finnhub uses.
+    """
+
+    def __init__(self, pool_size: int = HTTP_POOL_SIZE):
+        """Initialize an empty pool.
+
+        Args:
+            pool_size: Keep-alive connections kept open per client.
+        """
+        self.pool_size = pool_size
+        self._clients: Dict[str, finnhub.Client] = {}
+        self._lock = threading.Lock()
+
+    def get(self, api_key: str) -> finnhub.Client:
+        """Get the client for an API key, creating it on first use.
+
+        Args:
+            api_key: The API key for the Finnhub API.
+        """
+        with self._lock:
+            client = self._clients.get(api_key)
+            if client is None:
+                client = finnhub.Client(api_key=api_key)
+                _mount_pool(client, self.pool_size)
+                self._clients[api_key] = client
+            return client
+
+    def close(self) -> None:
+        """Close every client's connections."""
+        with self._lock:
+            clients = list(self._clients.values())
+            self._clients.clear()
+        for client in clients:
+            try:
+                client.close()
+            except Exception:
+                pass
+
+# Clients shared by every tool call, closed when the server exits
+client_pool = ClientPool()
+atexit.register(client_pool.close)
+
+# Finnhub requests allowed per minute for one API key (60 on the free plan)
+CALLS_PER_MINUTE = float(os.getenv("FINNHUB_CALLS_PER_MINUTE", "60"))
+
+# Requests that may be sent at once before the per-minute rate applies
+CALLS_BURST = float(os.getenv("FINNHUB_CALLS_BURST", "30"))
+
+# Retries of a request rejected with HTTP 429 before giving up
+MAX_RETRIES = 4
+
+# Base and maximum delay in seconds between 429 retries
+RETRY_BASE_DELAY = 1.0
+RETRY_MAX_DELAY = 30.0
+
+# Seconds each endpoint's responses are cached; profiles barely change and
+# basic financials update at most daily
+CACHE_TTLS = {
+    "financials": float(os.getenv("FINNHUB_CACHE_TTL_FINANCIALS", "86400")),
+    "profile": float(os.getenv("FINNHUB_CACHE_TTL_PROFILE", str(7 * 86400))),
+}
+
+# Maximum number of cached responses; 0 disables the cache
+CACHE_MAX_ENTRIES = int(os.getenv("FINNHUB_CACHE_MAX_ENTRIES", "1000"))
+
+# Maximum total size of the cached responses in bytes
+CACHE_MAX_BYTES = int(os.getenv("FINNHUB_CACHE_MAX_BYTES", str(32 * 1024 * 1024)))
+
+# Responses shared by every tool call and API key
+response_cache = ResponseCache(CACHE_TTLS, CACHE_MAX_ENTRIES, CACHE_MAX_BYTES)
+
+# SQLite file responses are persisted to; unset keeps responses in memory only
+STORE_PATH = os.getenv("FINNHUB_STORE_PATH")
+
+# Stored responses older than this many seconds are refetched before being
+# returned; younger ones past their TTL are returned while a refresh runs
+STORE_MAX_STALENESS = float(os.getenv("FINNHUB_STORE_MAX_STALENESS", str(30 * 86400)))
+
+# Persistent responses shared across server restarts, if enabled
+response_store: Optional[ResponseStore] = ResponseStore(STORE_PATH) if STORE_PATH else None
+
+# Counters for stale responses served and background refreshes
+store_counters = {"stale_served": 0, "refreshes": 0, "refresh_failures": 0}
+
+# Keys with a background refresh in progress
+refreshing: set = set()
+
+# Background refresh tasks, referenced until they finish
+refresh_tasks: set = set()
+
+# Guards store_counters and refreshing across the fetch threads
+store_lock = threading.Lock()
+
+def _count_store(counter: str) -> None:
+    with store_lock:
+        store_counters[counter] += 1
+
+# Tickers analyzed at once by get_fundamental_analysis_batch
+DEFAULT_BATCH_CONCURRENCY = max(1, FETCH_WORKERS // len(ENDPOINTS))
+
+class TokenBucket:
+    """Async token bucket limiting the rate of Finnhub requests."""
+
+    def __init__(self, rate: float, capacity: float):
+        """Initialize a full bucket.
+
+        Args:
+            rate: Tokens added per second.
+            capacity: Maximum number of tokens held.
+        """
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self, tokens: float = 1.0) -> None:
+        """Wait until the tokens are available and take them.
+
+        Args:
+            tokens: Number of tokens to take, capped at the capacity.
+        """
+        tokens = min(tokens, self.capacity)
+        # Waiters are served in order, so a large request can't be starved
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= tokens:
+                    self.tokens -= tokens
+                    return
+                await asyncio.sleep((tokens - self.tokens) / self.rate)
+
+# Rate limiters by API key, since Finnhub's quota applies per key
+rate_limiters: Dict[str, TokenBucket] = {}
+
+def rate_limiter(api_key: str) -> TokenBucket:
+    """Get the rate limiter for an API key, creating it on first use."""
+    limiter = rate_limiters.get(api_key)
+    if limiter is None:
+        limiter = rate_limiters[api_key] = TokenBucket(CALLS_PER_MINUTE / 60, CALLS_BURST)
+    return limiter
+
+def retry_delay(attempt: int, response: Any = None) -> float:
+    """Seconds to wait before retrying a rate-limited request.
+
+    Honors a Retry-After header when Finnhub sends one, and otherwise uses
+    exponential backoff with full jitter so parallel requests spread out.
+
+    Args:
+        attempt: Number of retries already made.
+        response: The rejected HTTP response (optional).
+    """
+    headers = getattr(response, "headers", None) or {}
+    try:
+        retry_after = float(headers.get("Retry-After"))
+    except (TypeError, ValueError):
+        return random.uniform(0, min(RETRY_MAX_DELAY, RETRY_BASE_DELAY * 2 ** attempt))
+    return min(RETRY_MAX_DELAY, retry_after) + random.uniform(0, RETRY_BASE_DELAY)
+
 class FundamentalAnalysisManager:
     """Manager for fetching and analyzing stock fundamental data."""
 
@@ -19,7 +229,123 @@ class FundamentalAnalysisManager:
         Args:
             api_key: The API key for the Finnhub API.
         """
-        self.finnhub_client = finnhub.Client(api_key=api_key)
+        self.finnhub_client = client_pool.get(api_key)
+        # Stale stored responses served so far, refreshed by the tools
+        # within the rate limit
+        self.stale: Set[Tuple[str, str]] = set()
+
+    def fetch(self, ticker: str, endpoints: Iterable[str] = ENDPOINTS) -> Tuple[Dict[str, Any], Dict[str, str]]:
+        """Fetch several endpoints for a ticker concurrently.
+
+        Args:
+            ticker: The stock ticker symbol (e.g., AAPL).
+            endpoints: Names of the entries in ENDPOINTS to fetch.
+
+        Returns:
+            The responses by endpoint name, and error messages for endpoints
+            that failed or returned no data.
+        """
+        futures = {
+            name: fetch_pool.submit(self.request, name, ticker)
+            for name in endpoints
+        }
+        data: Dict[str, Any] = {}
+        errors: Dict[str, str] = {}
+        for name, future in futures.items():
+            try:
+                response = future.result()
+            except finnhub.FinnhubAPIException as e:
+                errors[name] = f"Finnhub API error: {e}"
+            except Exception as e:
+                errors[name] = f"An unexpected error occurred: {e}"
+            else:
+                if is_empty(response):
+                    errors[name] = "No data returned"
+                else:
+                    data[name] = response
+        return data, errors
+
+    def request(self, endpoint: str, ticker: str) -> Any:
+        """Call one endpoint through the response cache.
+
+        Concurrent misses for the same ticker and endpoint share one request.
+
+        Args:
+            endpoint: Name of the entry in ENDPOINTS to call.
+            ticker: The stock ticker symbol (e.g., AAPL).
+        """
+        return response_cache.get_or_fetch(
+            endpoint, ticker, lambda: self.request_stored(endpoint, ticker)
+        )
+
+    def request_stored(self, endpoint: str, ticker: str) -> Fetched:
+        """Call one endpoint through the persistent store, if one is configured.
+
+        A stored response within its TTL is returned as is. One past its TTL
+        but within STORE_MAX_STALENESS is returned immediately and recorded in
+        stale for schedule_refreshes to refetch; anything older is refetched
+        first.
+
+        Args:
+            endpoint: Name of the entry in ENDPOINTS to call.
+            ticker: The stock ticker symbol (e.g., AAPL).
+
+        Returns:
+            The response with the rest of its lifetime, so a stored response
+            isn't cached in memory for longer than it stays fresh.
+        """
+        store = response_store
+        if store is None:
+            return Fetched(self.request_uncached(endpoint, ticker))
+
+        stored = store.get(endpoint, ticker)
+        if stored is not None and stored.age <= STORE_MAX_STALENESS:
+            remaining = CACHE_TTLS.get(endpoint, 0) - stored.age
+            if remaining <= 0:
+                _count_store("stale_served")
+                with store_lock:
+                    self.stale.add((endpoint, ticker.upper()))
+            return Fetched(stored.value, remaining)
+
+        value = self.request_uncached(endpoint, ticker)
+        if not is_empty(value):
+            store.put(endpoint, ticker, value)
+        return Fetched(value)
+
+    def refresh(self, store: ResponseStore, endpoint: str, ticker: str) -> None:
+        """Refetch a stale response and replace its stored and cached copies.
+
+        Failures are counted rather than raised, since nothing waits on a
+        background refresh.
+
+        Args:
+            store: The store to write the new response to.
+            endpoint: Name of the entry in ENDPOINTS to call.
+            ticker: The stock ticker symbol (e.g., AAPL).
+        """
+        try:
+            value = self.request_uncached(endpoint, ticker)
+            if not is_empty(value):
+                store.put(endpoint, ticker, value)
+                response_cache.put(endpoint, ticker, value)
+            _count_store("refreshes")
+        except Exception:
+            _count_store("refresh_failures")
+
+    def request_uncached(self, endpoint: str, ticker: str) -> Any:
+        """Call one endpoint, retrying when Finnhub answers HTTP 429.
+
+        Args:
+            endpoint: Name of the entry in ENDPOINTS to call.
+            ticker: The stock ticker symbol (e.g., AAPL).
+        """
+        for attempt in range(MAX_RETRIES + 1):
+            try:
+                return ENDPOINTS[endpoint](self.finnhub_client, ticker)
+            except finnhub.FinnhubAPIException as e:
+                if e.status_code != 429 or attempt == MAX_RETRIES:
+                    raise
+                time.sleep(retry_delay(attempt, e.response))
 
     def get_fundamental_analysis(self, ticker: str) -> Dict[str, Any]:
         """Get fundamental analysis for a given stock ticker.
@@ -28,24 +354,26 @@ class FundamentalAnalysisManager:
             ticker: The stock ticker symbol (e.g., AAPL).
 
         Returns:
-            A dictionary containing fundamental analysis data.
+            A dictionary containing fundamental analysis data. If some
+            endpoints fail, the fields they provide are None and their errors
+            are listed under "errors".
         """
         try:
-            # Fetch basic financials
-            basic_financials = self.finnhub_client.company_basic_financials(ticker, 'all')
+            data, errors = self.fetch(ticker)
 
-            # Fetch company profile
-            profile = self.finnhub_client.company_profile2(symbol=ticker)
-
-            if not basic_financials or not profile:
+            if not data:
+                failures = [message for message in errors.values() if message != "No data returned"]
+                if failures:
+                    return {"error": failures[0]}
                 return {"error": f"Could not retrieve data for ticker {ticker}. It might be an invalid symbol."}
 
+            profile = data.get('profile', {})
             # Extract key metrics
-            metric = basic_financials.get('metric', {})
+            metric = data.get('financials', {}).get('metric', {})
 
             # Prepare the result
             analysis = {
-                "ticker": profile.get('ticker'),
+                "ticker": profile.get('ticker', ticker),
                 "companyName": profile.get('name'),
                 "exchange": profile.get('exchange'),
                 "marketCap": profile.get('marketCapitalization'),
@@ -58,11 +386,11 @@ class FundamentalAnalysisManager:
                 "eps": metric.get('epsNormalizedAnnual'),
                 "dividendYield": metric.get('dividendYieldIndicatedAnnual'),
             }
+            if errors:
+                analysis["errors"] = errors
 
             return analysis
 
-        except finnhub.FinnhubAPIException as e:
-            return {"error": f"Finnhub API error: {e}"}
         except Exception as e:
             return {"error": f"An unexpected error occurred: {e}"}
 
@@ -88,6 +416,9 @@ async def get_fundamental_analysis(ticker: str, finnhub_api_key: Optional[str] =
         })
 
     manager = FundamentalAnalysisManager(api_key=api_key)
+    missing = _uncached_requests(ticker)
+    if missing:
+        await rate_limiter(api_key).acquire(missing)
 
     # Running the synchronous get_fundamental_analysis in a separate thread
     # to avoid blocking the asyncio event loop.
@@ -95,12 +426,159 @@ async def get_fundamental_analysis(ticker: str, finnhub_api_key: Optional[str] =
     analysis_result = await loop.run_in_executor(
         None, manager.get_fundamental_analysis, ticker
     )
+    schedule_refreshes(manager, api_key)
 
     return json.dumps(analysis_result, indent=2)
 
+def schedule_refreshes(manager: FundamentalAnalysisManager, api_key: str) -> None:
+    """Refetch the stale responses a manager served, in the background.
+
+    Each refresh takes a token from the API key's rate limiter like any other
+    request, so revalidation can't push an analysis past Finnhub's quota.
+    Only one refresh runs per ticker and endpoint at a time.
+
+    Args:
+        manager: The manager that served the stale responses.
+        api_key: The API key the refreshes are made with.
+    """
+    with store_lock:
+        keys, manager.stale = manager.stale, set()
+    store = response_store
+    if not keys or store is None:
+        return
+    limiter = rate_limiter(api_key)
+    loop = asyncio.get_running_loop()
+
+    async def refresh(key: Tuple[str, str]) -> None:
+        with store_lock:
+            if key in refreshing:
+                return
+            refreshing.add(key)
+        try:
+            await limiter.acquire()
+            await loop.run_in_executor(fetch_pool, manager.refresh, store, *key)
+        finally:
+            with store_lock:
+                refreshing.discard(key)
+
+    task = asyncio.ensure_future(asyncio.gather(*(refresh(key) for key in sorted(keys))))
+    refresh_tasks.add(task)
+    task.add_done_callback(refresh_tasks.discard)
+
+def _uncached_requests(ticker: str) -> int:
+    """Number of requests an analysis of ticker will wait on Finnhub for."""
+    missing = 0
+    for name in ENDPOINTS:
+        if response_cache.contains(name, ticker):
+            continue
+        stored = response_store.get(name, ticker) if response_store is not None else None
+        if stored is None or stored.age > STORE_MAX_STALENESS:
+            missing += 1
+    return missing
+
+async def _report_progress(ctx: Context, progress: float, total: float, message: str) -> None:
+    """Send a progress notification, without the message on older MCP versions."""
+    try:
+        await ctx.report_progress(progress, total, message=message)
+    except TypeError:
+        await ctx.report_progress(progress, total)
+
+@mcp.tool()
+async def get_fundamental_analysis_batch(
+    tickers: List[str],
+    finnhub_api_key: Optional[str] = None,
+    concurrency: int = DEFAULT_BATCH_CONCURRENCY,
+    ctx: Optional[Context] = None
+) -> str:
+    """
+    Performs fundamental analysis for several stock tickers in one call.
+    Tickers are analyzed in parallel while staying within Finnhub's
+    per-minute quota, and requests rejected with HTTP 429 are retried with
+    backoff. Each result is sent as a progress notification as soon as its
+    ticker completes.
+
+    Args:
+        tickers: The stock ticker symbols (e.g., ["AAPL", "MSFT"]).
+        finnhub_api_key: Your Finnhub API key (optional).
+        concurrency: Maximum number of tickers analyzed at the same time.
+
+    Returns:
+        A JSON string with the analysis of each ticker and the tickers that failed.
+    """
+    api_key = finnhub_api_key or os.getenv("FINNHUB_API_KEY")
+
+    if not api_key:
+        return json.dumps({
+            "error": "Finnhub API key not found. Please provide it as an argument or set the FINNHUB_API_KEY environment variable."
+        })
+
+    symbols = list(dict.fromkeys(t.strip() for t in tickers if t.strip()))
+    if not symbols:
+        return json.dumps({"error": "No tickers given."})
+
+    manager = FundamentalAnalysisManager(api_key=api_key)
+    limiter = rate_limiter(api_key)
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+    loop = asyncio.get_event_loop()
+    results: Dict[str, Dict[str, Any]] = {}
+
+    async def analyze(ticker: str) -> None:
+        async with semaphore:
+            missing = _uncached_requests(ticker)
+            if missing:
+                await limiter.acquire(missing)
+            results[ticker] = await loop.run_in_executor(
+                None, manager.get_fundamental_analysis, ticker
+            )
+        if ctx is not None:
+            await _report_progress(
+                ctx, len(results), len(symbols), json.dumps({ticker: results[ticker]})
+            )
+
+    await asyncio.gather(*(analyze(ticker) for ticker in symbols))
+    schedule_refreshes(manager, api_key)
+
+    return json.dumps({
+        "count": len(symbols),
+        "failed": [ticker for ticker in symbols if "error" in results[ticker]],
+        "results": {ticker: results[ticker] for ticker in symbols},
+    }, indent=2)
+
+@mcp.tool()
+async def get_cache_stats(reset: bool = False, clear: bool = False) -> str:
+    """
+    Reports hit, miss and eviction statistics of the Finnhub response cache,
+    and of the persistent store when FINNHUB_STORE_PATH is set.
+
+    Args:
+        reset: Zero the statistics after reporting them.
+        clear: Drop every cached response after reporting.
+
+    Returns:
+        A JSON string with overall and per-endpoint cache statistics.
+    """
+    stats = response_cache.stats()
+    stats["ttls"] = dict(response_cache.ttls)
+    if response_store is not None:
+        stats["store"] = {**response_store.stats(), **store_counters, "max_staleness": STORE_MAX_STALENESS}
+        if reset:
+            with store_lock:
+                for name in store_counters:
+                    store_counters[name] = 0
+    if reset:
+        response_cache.reset_stats()
+    if clear:
+        response_cache.clear()
+    return json.dumps(stats, indent=2)
+
 def main():
     """Main entry point for the MCP server."""
-    mcp.run(transport="stdio")
+    try:
+        mcp.run(transport="stdio")
+    finally:
+        client_pool.close()
+        if response_store is not None:
+            response_store.close()
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,108 @@
+"""Persistent SQLite store of Finnhub responses.
+
+Responses are kept in a single table keyed by ticker and endpoint, with the
+time they were fetched, so data survives server restarts. The database runs
+in WAL mode so reads never wait on a write in progress.
+"""
+
+import json
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, NamedTuple, Optional
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    ticker TEXT NOT NULL,
+    endpoint TEXT NOT NULL,
+    fetched_at REAL NOT NULL,
+    body TEXT NOT NULL,
+    PRIMARY KEY (ticker, endpoint)
+)
+"""
+
+
+class StoredResponse(NamedTuple):
+    """A response read from the store."""
+
+    value: Any
+    fetched_at: float
+
+    @property
+    def age(self) -> float:
+        """Seconds since the response was fetched."""
+        return time.time() - self.fetched_at
+
+
+class ResponseStore:
+    """Thread-safe SQLite store of responses by ticker and endpoint."""
+
+    def __init__(self, path: str):
+        """Open or create the store.
+
+        Args:
+            path: Path of the SQLite database file.
+        """
+        self.path = Path(path).expanduser()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        # WAL keeps the database consistent with NORMAL; a crash can only
+        # lose the most recent writes, which are refetched on demand
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(SCHEMA)
+
+    def get(self, endpoint: str, ticker: str) -> Optional[StoredResponse]:
+        """Read a stored response, or None if there isn't one.
+
+        Args:
+            endpoint: Endpoint name.
+            ticker: The stock ticker symbol.
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT body, fetched_at FROM responses WHERE ticker = ? AND endpoint = ?",
+                (ticker.upper(), endpoint)
+            ).fetchone()
+        if row is None:
+            return None
+        try:
+            return StoredResponse(json.loads(row[0]), row[1])
+        except ValueError:
+            return None
+
+    def put(self, endpoint: str, ticker: str, value: Any, fetched_at: Optional[float] = None) -> None:
+        """Store a response, replacing any earlier one.
+
+        Args:
+            endpoint: Endpoint name.
+            ticker: The stock ticker symbol.
+            value: The JSON-serializable response.
+            fetched_at: When the response was fetched (defaults to now).
+        """
+        body = json.dumps(value)
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (ticker, endpoint, fetched_at, body) VALUES (?, ?, ?, ?)",
+                (ticker.upper(), endpoint, time.time() if fetched_at is None else fetched_at, body)
+            )
+
+    def stats(self) -> Dict[str, Any]:
+        """Number of stored responses per endpoint and the oldest fetch time."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT endpoint, COUNT(*), MIN(fetched_at) FROM responses GROUP BY endpoint"
+            ).fetchall()
+        return {
+            "path": str(self.path),
+            "entries": sum(count for _, count, _ in rows),
+            "endpoints": {endpoint: count for endpoint, count, _ in rows},
+            "oldest": min((oldest for _, _, oldest in rows), default=None),
+        }
+
+    def close(self) -> None:
+        """Close the database."""
+        with self._lock:
+            self._conn.close()
@@ -3,10 +3,84 @@
 import asyncio
 import json
 import os
+import sqlite3
+import tempfile
+import time
+import finnhub
 import pytest
-from unittest.mock import MagicMock, patch
+from unittest.mock import AsyncMock, MagicMock, patch
 
-from mcp_server_fundamental_analysis.server import get_fundamental_analysis
+from mcp_server_fundamental_analysis import server
+from mcp_server_fundamental_analysis.server import (
+    ClientPool,
+    FundamentalAnalysisManager,
+    TokenBucket,
+    get_cache_stats,
+    get_fundamental_analysis,
+    get_fundamental_analysis_batch,
+    retry_delay,
+)
+from mcp_server_fundamental_analysis.cache import EMPTY_TTL, ResponseCache
+from mcp_server_fundamental_analysis.store import ResponseStore
+
+@pytest.fixture(autouse=True)
+def fresh_cache():
+    """Give every test an empty response cache."""
+    with patch('mcp_server_fundamental_analysis.server.response_cache', ResponseCache(server.CACHE_TTLS)):
+        yield
+
+def make_manager(financials=None, profile=None, delay=0.0):
+    """Build a manager whose Finnhub client returns canned responses after a delay."""
+    def respond(value):
+        def call(*args, **kwargs):
+            time.sleep(delay)
+            if isinstance(value, Exception):
+                raise value
+            return value
+        return call
+
+    with patch('mcp_server_fundamental_analysis.server.client_pool', ClientPool()), \
+         patch('mcp_server_fundamental_analysis.server.finnhub.Client'):
+        manager = FundamentalAnalysisManager(api_key="key")
+    manager.finnhub_client.company_basic_financials.side_effect = respond(financials)
+    manager.finnhub_client.company_profile2.side_effect = respond(profile)
+    return manager
+
+def test_endpoints_fetched_concurrently():
+    """Test that the endpoint requests overlap instead of running in series."""
+    manager = make_manager({"metric": {"peNormalizedAnnual": 30.0}}, {"ticker": "AAPL", "name": "Apple Inc"}, delay=0.2)
+    started = time.monotonic()
+    result = manager.get_fundamental_analysis("AAPL")
+    elapsed = time.monotonic() - started
+
+    assert elapsed < 0.35
+    assert result["companyName"] == "Apple Inc"
+    assert result["peRatio"] == 30.0
+    assert "errors" not in result
+
+def test_partial_results_when_an_endpoint_fails():
+    """Test that one failing endpoint doesn't discard the others."""
+    manager = make_manager(RuntimeError("timed out"), {"ticker": "AAPL", "name": "Apple Inc"})
+    result = manager.get_fundamental_analysis("AAPL")
+
+    assert result["companyName"] == "Apple Inc"
+    assert result["peRatio"] is None
+    assert "timed out" in result["errors"]["financials"]
+
+def test_error_when_every_endpoint_fails():
+    """Test the error reported when nothing could be fetched."""
+    assert "invalid symbol" in make_manager({}, {}).get_fundamental_analysis("NOPE")["error"]
+
+def test_empty_financials_count_as_no_data():
+    """Test that financials without metrics, as returned for unknown tickers, count as no data."""
+    manager = make_manager({"metric": {}, "series": {}}, {})
+    assert "invalid symbol" in manager.get_fundamental_analysis("NOPE")["error"]
+    assert server.response_cache._entries[("financials", "NOPE")].expires <= time.monotonic() + EMPTY_TTL
+
+    response = MagicMock(status_code=401)
+    response.json.return_value = {"error": "Invalid API key"}
+    error = finnhub.FinnhubAPIException(response)
+    assert "Invalid API key" in make_manager(error, error).get_fundamental_analysis("AAPL")["error"]
 
 @pytest.mark.asyncio
 async def test_get_fundamental_analysis_with_key_as_arg():
@@ -59,3 +133,262 @@ async def test_arg_key_precedence():
         result = json.loads(result_str)
         mock_manager_class.assert_called_once_with(api_key="arg_key_override")
         assert result == mock_analysis
+
+def test_client_pool_reuses_clients_per_key():
+    """Test that clients and their sessions are shared per API key."""
+    pool = ClientPool(pool_size=4)
+    first = pool.get("key-a")
+    assert pool.get("key-a") is first
+    assert pool.get("key-b") is not first
+
+    adapter = first._session.get_adapter("https://api.finnhub.io/api/v1")
+    assert adapter._pool_maxsize == 4
+
+    with patch.object(first, 'close') as close:
+        pool.close()
+        close.assert_called_once()
+    assert pool.get("key-a") is not first
+
+def test_client_pool_without_session():
+    """Test that clients keep working if finnhub stops exposing its session."""
+    with patch('mcp_server_fundamental_analysis.server.finnhub.Client') as client_class:
+        client_class.return_value = MagicMock(spec=["close", "company_profile2"])
+        client = ClientPool().get("key")
+    assert client is client_class.return_value
+    assert not server._mount_pool(client, 4)
+
+def api_exception(status_code, headers=None):
+    response = MagicMock(status_code=status_code, headers=headers or {})
+    response.json.return_value = {"error": "API limit reached"}
+    return finnhub.FinnhubAPIException(response)
+
+@pytest.mark.asyncio
+async def test_token_bucket_limits_rate():
+    """Test that requests beyond the burst wait for tokens to refill."""
+    bucket = TokenBucket(rate=20, capacity=2)
+    started = time.monotonic()
+    await bucket.acquire(2)
+    assert time.monotonic() - started < 0.05
+    await bucket.acquire(2)
+    assert time.monotonic() - started >= 0.09
+
+def test_rate_limited_requests_are_retried():
+    """Test that HTTP 429 responses are retried and other errors are not."""
+    manager = make_manager()
+    manager.finnhub_client.company_profile2.side_effect = [api_exception(429), api_exception(429), {"name": "Apple Inc"}]
+    with patch('mcp_server_fundamental_analysis.server.retry_delay', return_value=0):
+        assert manager.request_uncached("profile", "AAPL") == {"name": "Apple Inc"}
+
+        manager.finnhub_client.company_profile2.side_effect = api_exception(403)
+        with pytest.raises(finnhub.FinnhubAPIException):
+            manager.request_uncached("profile", "AAPL")
+        assert manager.finnhub_client.company_profile2.call_count == 4
+
+def test_retry_delay():
+    """Test jittered backoff and the Retry-After header."""
+    for attempt in range(6):
+        assert 0 <= retry_delay(attempt) <= min(server.RETRY_MAX_DELAY, server.RETRY_BASE_DELAY * 2 ** attempt)
+    response = MagicMock(headers={"Retry-After": "5"})
+    assert 5 <= retry_delay(0, response) <= 5 + server.RETRY_BASE_DELAY
+
+@pytest.mark.asyncio
+async def test_batch_reports_each_ticker():
+    """Test batch results, failures and per-ticker progress notifications."""
+    def analyze(ticker):
+        time.sleep(0.1)
+        if ticker == "NOPE":
+            return {"error": "Could not retrieve data for ticker NOPE."}
+        return {"ticker": ticker}
+
+    mock_manager_instance = MagicMock()
+    mock_manager_instance.get_fundamental_analysis.side_effect = analyze
+    ctx = MagicMock()
+    ctx.report_progress = AsyncMock()
+
+    with patch('mcp_server_fundamental_analysis.server.FundamentalAnalysisManager', return_value=mock_manager_instance), \
+         patch('mcp_server_fundamental_analysis.server.rate_limiters', {}):
+        started = time.monotonic()
+        result = json.loads(await get_fundamental_analysis_batch(
+            ["AAPL", "MSFT", "NOPE", "AAPL", "GOOG"], finnhub_api_key="key", concurrency=4, ctx=ctx
+        ))
+        elapsed = time.monotonic() - started
+
+    assert elapsed < 0.3
+    assert result["count"] == 4
+    assert result["failed"] == ["NOPE"]
+    assert list(result["results"]) == ["AAPL", "MSFT", "NOPE", "GOOG"]
+    assert ctx.report_progress.await_count == 4
+    progress, total = ctx.report_progress.await_args.args
+    assert (progress, total) == (4, 4)
+
+@pytest.mark.asyncio
+async def test_batch_respects_rate_limit():
+    """Test that the batch waits for the rate limiter between tickers."""
+    mock_manager_instance = MagicMock()
+    mock_manager_instance.get_fundamental_analysis.side_effect = lambda ticker: {"ticker": ticker}
+    limiter = TokenBucket(rate=40, capacity=2)
+
+    with patch('mcp_server_fundamental_analysis.server.FundamentalAnalysisManager', return_value=mock_manager_instance), \
+         patch('mcp_server_fundamental_analysis.server.rate_limiters', {"key": limiter}):
+        started = time.monotonic()
+        await get_fundamental_analysis_batch(["A", "B", "C"], finnhub_api_key="key")
+        elapsed = time.monotonic() - started
+
+    # The first ticker uses the burst, the other two wait 2 tokens each at 40/s
+    assert elapsed >= 0.09
+
+def test_repeat_analysis_served_from_cache():
+    """Test that a repeat lookup doesn't call Finnhub again."""
+    manager = make_manager({"metric": {"peNormalizedAnnual": 30.0}}, {"ticker": "AAPL", "name": "Apple Inc"})
+    first = manager.get_fundamental_analysis("AAPL")
+    assert manager.get_fundamental_analysis("aapl") == first
+    assert manager.finnhub_client.company_profile2.call_count == 1
+    assert manager.finnhub_client.company_basic_financials.call_count == 1
+
+def test_concurrent_misses_share_one_fetch():
+    """Test single-flight coalescing of concurrent requests for one ticker."""
+    manager = make_manager({"metric": {}}, {"ticker": "AAPL"}, delay=0.1)
+    futures = [server.fetch_pool.submit(manager.request, "profile", "AAPL") for _ in range(4)]
+    assert [future.result() for future in futures] == [{"ticker": "AAPL"}] * 4
+    assert manager.finnhub_client.company_profile2.call_count == 1
+    stats = server.response_cache.stats()
+    assert stats["misses"] == 1
+    assert stats["coalesced"] == 3
+
+def test_cache_expiry_and_lru_limits():
+    """Test TTL expiry and eviction by entry count and size."""
+    cache = ResponseCache({"profile": 0.05}, max_entries=2, max_bytes=1000)
+    assert cache.get_or_fetch("profile", "A", lambda: {"n": 1}) == {"n": 1}
+    assert cache.get_or_fetch("profile", "A", lambda: {"n": 2}) == {"n": 1}
+    time.sleep(0.06)
+    assert cache.get_or_fetch("profile", "A", lambda: {"n": 3}) == {"n": 3}
+
+    cache = ResponseCache(max_entries=2, max_bytes=1000)
+    for ticker in "ABC":
+        cache.get_or_fetch("profile", ticker, lambda: {"ticker": "x"})
+    assert not cache.contains("profile", "A")
+    assert cache.contains("profile", "C")
+    assert cache.stats()["evictions"] == 1
+
+    cache = ResponseCache(max_entries=10, max_bytes=1000)
+    for ticker in "AB":
+        cache.get_or_fetch("profile", ticker, lambda: {"ticker": "x"})
+    cache.get_or_fetch("financials", "D", lambda: {"data": "x" * 980})
+    assert cache.stats()["entries"] == 1
+    assert cache.stats()["evictions"] == 2
+    assert cache.contains("financials", "D")
+
+def test_errors_are_not_cached():
+    """Test that a failed fetch is retried on the next lookup."""
+    cache = ResponseCache()
+    with pytest.raises(RuntimeError):
+        cache.get_or_fetch("profile", "A", MagicMock(side_effect=RuntimeError("down")))
+    assert cache.get_or_fetch("profile", "A", lambda: {"ok": True}) == {"ok": True}
+
+@pytest.mark.asyncio
+async def test_get_cache_stats():
+    """Test the cache statistics tool."""
+    manager = make_manager({"metric": {}}, {"ticker": "AAPL"})
+    manager.get_fundamental_analysis("AAPL")
+    manager.get_fundamental_analysis("AAPL")
+
+    stats = json.loads(await get_cache_stats(reset=True))
+    assert stats["hits"] == 2
+    assert stats["misses"] == 2
+    assert stats["endpoints"]["profile"]["hits"] == 1
+    assert stats["ttls"]["profile"] == server.CACHE_TTLS["profile"]
+
+    stats = json.loads(await get_cache_stats(clear=True))
+    assert stats["hits"] == 0
+    assert stats["entries"] == 2
+    assert json.loads(await get_cache_stats())["entries"] == 0
+
+@pytest.fixture
+def store():
+    """A temporary persistent store installed as the server's store."""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        response_store = ResponseStore(os.path.join(temp_dir, "finnhub.db"))
+        with patch('mcp_server_fundamental_analysis.server.response_store', response_store):
+            yield response_store
+        response_store.close()
+
+def test_store_persists_responses(store):
+    """Test that stored responses survive reopening the database."""
+    store.put("profile", "aapl", {"name": "Apple Inc"}, fetched_at=1000.0)
+    store.close()
+
+    reopened = ResponseStore(str(store.path))
+    stored = reopened.get("profile", "AAPL")
+    assert stored.value == {"name": "Apple Inc"}
+    assert stored.fetched_at == 1000.0
+    assert reopened.get("financials", "AAPL") is None
+    assert reopened.stats()["endpoints"] == {"profile": 1}
+    reopened.close()
+
+    conn = sqlite3.connect(str(store.path))
+    assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+    conn.close()
+
+def test_fresh_stored_response_skips_the_api(store):
+    """Test that a response within its TTL is served from disk."""
+    store.put("profile", "AAPL", {"ticker": "AAPL", "name": "Stored Inc"})
+    manager = make_manager({"metric": {"beta": 1.2}}, {"ticker": "AAPL", "name": "Live Inc"})
+
+    assert manager.request("profile", "AAPL")["name"] == "Stored Inc"
+    assert manager.finnhub_client.company_profile2.call_count == 0
+    assert manager.request("financials", "AAPL") == {"metric": {"beta": 1.2}}
+    assert store.get("financials", "AAPL").value == {"metric": {"beta": 1.2}}
+
+def test_stored_response_cached_for_its_remaining_ttl(store):
+    """Test that a stored response isn't cached in memory beyond its TTL."""
+    store.put("profile", "AAPL", {"name": "Stored Inc"}, fetched_at=time.time() - server.CACHE_TTLS["profile"] + 60)
+    manager = make_manager({"metric": {}}, {"name": "Live Inc"})
+
+    assert manager.request("profile", "AAPL") == {"name": "Stored Inc"}
+    expires = server.response_cache._entries[("profile", "AAPL")].expires
+    assert expires - time.monotonic() <= 60
+
+    # Stale rows are served but never cached in memory
+    store.put("profile", "MSFT", {"name": "Old Inc"}, fetched_at=time.time() - server.CACHE_TTLS["profile"] - 60)
+    assert manager.request("profile", "MSFT") == {"name": "Old Inc"}
+    assert not server.response_cache.contains("profile", "MSFT")
+    assert manager.stale == {("profile", "MSFT")}
+
+@pytest.mark.asyncio
+async def test_stale_response_served_while_revalidating(store):
+    """Test stale-while-revalidate and the hard refresh past max staleness."""
+    stale_at = time.time() - server.CACHE_TTLS["profile"] - 60
+    store.put("profile", "AAPL", {"name": "Old Inc"}, fetched_at=stale_at)
+    manager = make_manager({"metric": {}}, {"name": "New Inc"}, delay=0.1)
+
+    started = time.monotonic()
+    assert manager.request_stored("profile", "AAPL").value == {"name": "Old Inc"}
+    assert time.monotonic() - started < 0.05
+    assert manager.request_stored("profile", "AAPL").value == {"name": "Old Inc"}
+    assert manager.finnhub_client.company_profile2.call_count == 0
+
+    # Refreshes wait for the rate limiter, and a second one for the same key isn't started
+    limiter = MagicMock(acquire=AsyncMock())
+    with patch.dict(server.rate_limiters, {"key": limiter}):
+        server.schedule_refreshes(manager, "key")
+        manager.stale.add(("profile", "AAPL"))
+        server.schedule_refreshes(manager, "key")
+        await asyncio.gather(*server.refresh_tasks)
+    limiter.acquire.assert_awaited_once()
+    assert store.get("profile", "AAPL").value == {"name": "New Inc"}
+    assert server.response_cache.contains("profile", "AAPL")
+    assert manager.finnhub_client.company_profile2.call_count == 1
+    assert server.store_counters["refreshes"] >= 1
+
+    store.put("profile", "AAPL", {"name": "Ancient Inc"}, fetched_at=time.time() - server.STORE_MAX_STALENESS - 1)
+    assert manager.request_stored("profile", "AAPL").value == {"name": "New Inc"}
+    assert manager.finnhub_client.company_profile2.call_count == 2
+
+@pytest.mark.asyncio
+async def test_cache_stats_include_store(store):
+    """Test that the statistics tool reports the persistent store."""
+    store.put("profile", "AAPL", {"name": "Apple Inc"})
+    stats = json.loads(await get_cache_stats())
+    assert stats["store"]["entries"] == 1
+    assert stats["store"]["path"] == str(store.path)
+    assert "stale_served" in stats["store"]
@@ -0,0 +1,305 @@
+#!/usr/bin/env python3
+"""Throughput benchmark for log capture and the log query paths.
+
+Spawns load generators (``test_environment/test_load.py``) that emulate
+Overmind's ``name | `` prefix and drains them through the server's
+``LogCapture`` into a ``LogBuffer`` and ``RecordStore``, stepping up the
+target rate until the capture drops lines or falls behind. After each step
+the query paths (``RecordStore.query`` and ``LogBuffer.tail``) are timed
+against the captured data. When overmind and tmux are installed,
+``--overmind`` runs the same load through ``Procfile.load`` and a real
+Overmind instead.
+
+Usage:
+    python benchmarks/bench_capture.py --rates 1000,5000,20000,50000 --processes 4
+    python benchmarks/bench_capture.py --overmind --output capture.json
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import re
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Any, Dict, List
+
+HERE = Path(__file__).resolve().parent
+ROOT = HERE.parent
+LOAD_SCRIPT = ROOT / "test_environment" / "test_load.py"
+
+# Run against the working tree rather than an installed copy
+sys.path.insert(0, str(ROOT / "src"))
+
+from mcp_server_overmind import server  # noqa: E402
+from mcp_server_overmind.logs import LogBuffer, LogCapture, LogLine  # noqa: E402
+from mcp_server_overmind.records import RecordStore  # noqa: E402
+
+from bench_tools import call_tool, git_commit, percentile, wait_for_exit  # noqa: E402
+
+# Sequence number and send time embedded in each generated line
+LOAD_FIELDS = re.compile(r"seq=(?P<seq>\d+) t=(?P<sent>\d+\.\d+)")
+
+# Summary the generator writes to stderr when it exits
+LOAD_SUMMARY = re.compile(r"wrote (?P<lines>\d+) lines")
+
+# A step falls behind if it achieves less than this fraction of its target
+MIN_ACHIEVED_RATIO = 0.95
+
+# A step falls behind if the p99 capture lag exceeds this many seconds
+MAX_LAG_P99 = 0.5
+
+
+class CaptureProbe:
+    """Listener tallying captured load lines per process."""
+
+    def __init__(self):
+        self.lines: Dict[str, int] = {}
+        self.seqs: Dict[str, int] = {}
+        self.lags: List[float] = []
+
+    def __call__(self, line: LogLine) -> None:
+        self.lines[line.process] = self.lines.get(line.process, 0) + 1
+        match = LOAD_FIELDS.search(line.text)
+        if match is None:
+            return
+        self.seqs[line.process] = max(self.seqs.get(line.process, 0), int(match.group("seq")))
+        self.lags.append(line.timestamp - float(match.group("sent")))
+
+    def captured(self, prefix: str = "load") -> int:
+        return sum(count for name, count in self.lines.items() if name.startswith(prefix))
+
+    def gaps(self, prefix: str = "load") -> int:
+        """Lines missing between the first and highest sequence number seen."""
+        return sum(
+            max(0, self.seqs[name] - self.lines.get(name, 0))
+            for name in self.seqs if name.startswith(prefix)
+        )
+
+
+def summarize_step(
+    target: float,
+    duration: float,
+    emitted: int,
+    captured: int,
+    lags: List[float]
+) -> Dict[str, Any]:
+    achieved = captured / duration if duration else 0.0
+    result = {
+        "target_per_s": target,
+        "emitted": emitted,
+        "captured": captured,
+        "dropped": max(0, emitted - captured),
+        "achieved_per_s": achieved,
+        "lag_p50_ms": percentile(lags, 50) * 1000,
+        "lag_p99_ms": percentile(lags, 99) * 1000,
+        "lag_max_ms": max(lags, default=0.0) * 1000,
+    }
+    result["sustained"] = (
+        result["dropped"] == 0
+        and achieved >= target * MIN_ACHIEVED_RATIO
+        and result["lag_p99_ms"] <= MAX_LAG_P99 * 1000
+    )
+    print(
+        f"  target {target:>8.0f}/s  achieved {achieved:>8.0f}/s  dropped {result['dropped']:>6}  "
+        f"lag p50 {result['lag_p50_ms']:7.1f} ms  p99 {result['lag_p99_ms']:7.1f} ms  "
+        f"{'ok' if result['sustained'] else 'FELL BEHIND'}"
+    )
+    return result
+
+
+async def capture_step(
+    rate: float,
+    processes: int,
+    duration: float,
+    size: int,
+    buffer: LogBuffer,
+    store: RecordStore
+) -> Dict[str, Any]:
+    """Drain K generators sharing a total target rate for one step."""
+    probe = CaptureProbe()
+    captures = []
+    spawned = []
+    for i in range(processes):
+        process = await asyncio.create_subprocess_exec(
+            sys.executable, "-u", str(LOAD_SCRIPT),
+            "--rate", str(rate / processes),
+            "--size", str(size),
+            "--duration", str(duration),
+            "--prefix", f"load#{i + 1}",
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE
+        )
+        capture = LogCapture(buffer)
+        capture.add_listener(store.add_line)
+        capture.add_listener(probe)
+        # Only stdout goes through the capture; stderr carries the summary
+        capture.attach(SimpleNamespace(stdout=process.stdout, stderr=None))
+        captures.append(capture)
+        spawned.append(process)
+
+    started = time.perf_counter()
+    summaries = await asyncio.gather(*(process.stderr.read() for process in spawned))
+    await asyncio.gather(*(process.wait() for process in spawned))
+    for capture in captures:
+        await capture.wait()
+    elapsed = time.perf_counter() - started
+
+    emitted = 0
+    for summary in summaries:
+        match = LOAD_SUMMARY.search(summary.decode(errors="replace"))
+        if match:
+            emitted += int(match.group("lines"))
+    # Generators pace themselves over the step duration; a capture that falls
+    # behind shows up as lag and a longer drain rather than a lower rate here
+    step = summarize_step(rate, duration, emitted, probe.captured(), probe.lags)
+    step["drain_s"] = elapsed
+    return step
+
+
+def time_queries(buffer: LogBuffer, store: RecordStore, iterations: int) -> Dict[str, Any]:
+    """Time the query paths against the data captured so far."""
+    scenarios = {
+        "records_all": lambda: store.query(limit=100),
+        "records_error": lambda: store.query(levels=["ERROR"], limit=100),
+        "records_process": lambda: store.query(process="load#1", limit=100),
+        "records_since": lambda: store.query(levels=["WARN"], since=5, limit=100),
+        "records_contains": lambda: store.query(component="database", contains="seq=1", limit=20),
+        "tail_all": lambda: buffer.tail(lines=100),
+        "tail_process": lambda: buffer.tail(process="load#1", lines=100),
+    }
+    results = {}
+    for name, query in scenarios.items():
+        latencies = []
+        for _ in range(iterations):
+            started = time.perf_counter()
+            query()
+            latencies.append(time.perf_counter() - started)
+        total = sum(latencies)
+        results[name] = {
+            "calls": iterations,
+            "queries_per_s": iterations / total if total else 0.0,
+            "p50_ms": percentile(latencies, 50) * 1000,
+            "p99_ms": percentile(latencies, 99) * 1000,
+        }
+        print(
+            f"    {name:<18} {results[name]['queries_per_s']:>10.0f} q/s  "
+            f"p50 {results[name]['p50_ms']:7.3f} ms  p99 {results[name]['p99_ms']:7.3f} ms"
+        )
+    return results
+
+
+async def bench_direct(args: argparse.Namespace) -> List[Dict[str, Any]]:
+    """Step through the target rates with generators drained directly."""
+    steps = []
+    for rate in args.rates:
+        buffer = LogBuffer()
+        store = RecordStore()
+        step = await capture_step(rate, args.processes, args.duration, args.size, buffer, store)
+        step["records"] = len(store)
+        step["queries"] = time_queries(buffer, store, args.query_iterations)
+        steps.append(step)
+        if not step["sustained"] and not args.keep_going:
+            break
+    return steps
+
+
+async def bench_overmind(args: argparse.Namespace, temp: Path) -> List[Dict[str, Any]]:
+    """Step through the target rates with Procfile.load under real Overmind."""
+    project = temp / "load"
+    project.mkdir()
+    shutil.copy(ROOT / "test_environment" / "Procfile.load", project / "Procfile")
+    shutil.copy(LOAD_SCRIPT, project / "test_load.py")
+    working_dir = str(project)
+    formation = f"steady={args.processes},bursty=0,crashy=0,wide=0"
+
+    steps = []
+    for rate in args.rates:
+        server.registry = server.ManagerRegistry()
+        manager = server.registry.get(working_dir)
+        os.environ["LOAD_RATE"] = str(rate / args.processes)
+        os.environ["LOAD_SIZE"] = str(args.size)
+        probe = CaptureProbe()
+
+        output = await call_tool("overmind_start", {"working_dir": working_dir, "formation": formation})
+        if "successfully" not in output:
+            print(f"  target {rate:>8.0f}/s  failed to start: {output}")
+            break
+        manager.capture.add_listener(probe)
+        await asyncio.sleep(args.duration)
+        await call_tool("overmind_quit", {"working_dir": working_dir})
+        await wait_for_exit(manager)
+
+        # Overmind doesn't report what each process wrote, so lines missing
+        # below the highest sequence number seen count as dropped
+        captured = probe.captured("steady")
+        step = summarize_step(rate, args.duration, captured + probe.gaps("steady"), captured, probe.lags)
+        step["records"] = len(manager.records)
+        step["queries"] = time_queries(manager.logs, manager.records, args.query_iterations)
+        steps.append(step)
+        if not step["sustained"] and not args.keep_going:
+            break
+    return steps
+
+
+async def run(args: argparse.Namespace) -> Dict[str, Any]:
+    report: Dict[str, Any] = {
+        "commit": git_commit(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "config": {
+            "rates": args.rates,
+            "processes": args.processes,
+            "duration": args.duration,
+            "size": args.size,
+        },
+        "results": {},
+    }
+
+    print(f"Direct capture ({args.processes} generators):")
+    report["results"]["direct"] = await bench_direct(args)
+
+    if args.overmind:
+        if not (shutil.which("overmind") and shutil.which("tmux")):
+            print("Real overmind: skipped (overmind and tmux are not both installed)")
+        else:
+            print(f"Real overmind (Procfile.load, steady={args.processes}):")
+            with tempfile.TemporaryDirectory(prefix="omc") as temp_dir:
+                report["results"]["overmind"] = await bench_overmind(args, Path(temp_dir))
+
+    for target, steps in report["results"].items():
+        sustained = [step["target_per_s"] for step in steps if step["sustained"]]
+        report.setdefault("max_sustained_per_s", {})[target] = max(sustained, default=0.0)
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rates", type=lambda s: [float(r) for r in s.split(",")],
+                        default=[1000.0, 5000.0, 20000.0, 50000.0, 100000.0],
+                        help="comma-separated total target rates in lines per second")
+    parser.add_argument("--processes", type=int, default=4, help="generator processes sharing the rate")
+    parser.add_argument("--duration", type=float, default=5.0, help="seconds per step")
+    parser.add_argument("--size", type=int, default=120, help="approximate bytes per line")
+    parser.add_argument("--query-iterations", type=int, default=200, help="timed calls per query scenario")
+    parser.add_argument("--keep-going", action="store_true", help="run every step even after falling behind")
+    parser.add_argument("--overmind", action="store_true", help="also run Procfile.load under real Overmind")
+    parser.add_argument("--output", type=Path, help="write results as JSON to this file")
+    args = parser.parse_args()
+
+    report = asyncio.run(run(args))
+    for target, rate in report["max_sustained_per_s"].items():
+        print(f"\nMax sustained ({target}): {rate:.0f} lines/s")
+    if args.output:
+        args.output.write_text(json.dumps(report, indent=2) + "\n")
+        print(f"\nResults written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,319 @@
+#!/usr/bin/env python3
+"""Latency benchmarks for the overmind MCP tools.
+
+Drives the real tool functions through the FastMCP dispatcher against a stub
+``overmind`` executable (``fake_overmind.py``) placed first on PATH, and
+reports p50/p95/p99 latency and subprocesses spawned per call. When overmind
+and tmux are installed, the ``test_environment`` Procfile is benchmarked as
+well.
+
+Usage:
+    python benchmarks/bench_tools.py --iterations 200 --concurrency 8 --output results.json
+    python benchmarks/bench_tools.py --compare results.json
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+HERE = Path(__file__).resolve().parent
+ROOT = HERE.parent
+
+# Run against the working tree rather than an installed copy
+sys.path.insert(0, str(ROOT / "src"))
+
+from mcp_server_overmind import server  # noqa: E402
+
+FAKE_PROCFILE = "web: python -u web.py\nworker: python -u worker.py\nlogger: python -u logger.py\n"
+
+TEST_ENVIRONMENT_FILES = [
+    "Procfile",
+    "test_web.py",
+    "test_worker.py",
+    "test_logger.py",
+    "test_counter.py",
+]
+
+
+class SpawnCounter:
+    """Counts subprocesses created through asyncio while installed."""
+
+    def __init__(self):
+        self.count = 0
+        self._original = asyncio.create_subprocess_exec
+
+    async def _create(self, *args, **kwargs):
+        self.count += 1
+        return await self._original(*args, **kwargs)
+
+    def __enter__(self):
+        asyncio.create_subprocess_exec = self._create
+        return self
+
+    def __exit__(self, *exc):
+        asyncio.create_subprocess_exec = self._original
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of a list of values."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(1, int(round(pct / 100 * len(ordered) + 0.5)))
+    return ordered[min(rank, len(ordered)) - 1]
+
+
+def count_lines(path: Path) -> int:
+    try:
+        return len(path.read_text().splitlines())
+    except OSError:
+        return 0
+
+
+async def call_tool(name: str, arguments: Dict[str, Any]) -> str:
+    """Invoke a tool the way an MCP client request would."""
+    content = await server.mcp.call_tool(name, arguments)
+    if isinstance(content, tuple):
+        content = content[0]
+    return "".join(getattr(block, "text", "") for block in content)
+
+
+async def measure(
+    name: str,
+    call: Callable[[int], Awaitable[Any]],
+    iterations: int,
+    concurrency: int,
+    spawn_log: Optional[Path] = None,
+    between: Optional[Callable[[int], Awaitable[Any]]] = None
+) -> Dict[str, Any]:
+    """Run a scenario and summarize its latency distribution.
+
+    Args:
+        name: Scenario name
+        call: Coroutine factory performing one timed call
+        iterations: Number of timed calls
+        concurrency: Calls in flight at once
+        spawn_log: File the stub appends each CLI invocation to
+        between: Untimed coroutine run after each call (only with concurrency 1)
+    """
+    latencies: List[float] = []
+    errors = 0
+    semaphore = asyncio.Semaphore(concurrency)
+    cli_before = count_lines(spawn_log) if spawn_log else 0
+    untimed_spawns = 0
+
+    async def one(i: int):
+        nonlocal errors, untimed_spawns
+        async with semaphore:
+            started = time.perf_counter()
+            try:
+                await call(i)
+            except Exception:
+                errors += 1
+            latencies.append(time.perf_counter() - started)
+            if between is not None:
+                before = counter.count
+                await between(i)
+                untimed_spawns += counter.count - before
+
+    started = time.perf_counter()
+    with SpawnCounter() as counter:
+        await asyncio.gather(*(one(i) for i in range(iterations)))
+    elapsed = time.perf_counter() - started
+    cli_calls = (count_lines(spawn_log) - cli_before) if spawn_log else None
+
+    result = {
+        "calls": iterations,
+        "concurrency": concurrency,
+        "errors": errors,
+        "throughput_per_s": iterations / elapsed if elapsed else 0.0,
+        "mean_ms": sum(latencies) / len(latencies) * 1000,
+        "p50_ms": percentile(latencies, 50) * 1000,
+        "p95_ms": percentile(latencies, 95) * 1000,
+        "p99_ms": percentile(latencies, 99) * 1000,
+        "max_ms": max(latencies) * 1000,
+        "spawns_per_call": (counter.count - untimed_spawns) / iterations,
+    }
+    if cli_calls is not None:
+        result["overmind_cli_per_call"] = cli_calls / iterations
+    print(
+        f"  {name:<18} p50 {result['p50_ms']:8.2f} ms  p95 {result['p95_ms']:8.2f} ms  "
+        f"p99 {result['p99_ms']:8.2f} ms  spawns/call {result['spawns_per_call']:.2f}"
+    )
+    return result
+
+
+async def wait_for_exit(manager: "server.OvermindManager", timeout: float = 10) -> None:
+    """Wait until Overmind has exited and removed its socket."""
+    deadline = time.monotonic() + timeout
+    if manager.process is not None:
+        try:
+            await asyncio.wait_for(manager.process.wait(), timeout)
+        except asyncio.TimeoutError:
+            manager.process.kill()
+    while manager.socket_path.exists() and time.monotonic() < deadline:
+        await asyncio.sleep(0.01)
+
+
+async def bench_project(
+    project: Path,
+    iterations: int,
+    concurrency: int,
+    start_iterations: int,
+    spawn_log: Optional[Path] = None
+) -> Dict[str, Any]:
+    """Benchmark start, status and restart against one project directory."""
+    server.registry = server.ManagerRegistry()
+    working_dir = str(project)
+    manager = server.registry.get(working_dir)
+    results = {}
+
+    async def start(i):
+        output = await call_tool("overmind_start", {"working_dir": working_dir})
+        if "successfully" not in output:
+            raise RuntimeError(output)
+
+    async def quit_(i):
+        await call_tool("overmind_quit", {"working_dir": working_dir})
+        await wait_for_exit(manager)
+
+    # Start cycles share one directory, so they always run one at a time
+    results["start"] = await measure("overmind_start", start, start_iterations, 1, spawn_log, quit_)
+
+    await start(0)
+    try:
+        results["status"] = await measure(
+            "overmind_status",
+            lambda i: call_tool("overmind_status", {"working_dir": working_dir}),
+            iterations, concurrency, spawn_log
+        )
+        results["status_uncached"] = await measure(
+            "status (max_age=0)",
+            lambda i: call_tool("overmind_status", {"working_dir": working_dir, "max_age": 0}),
+            iterations, concurrency, spawn_log
+        )
+        results["restart"] = await measure(
+            "overmind_restart",
+            lambda i: call_tool("overmind_restart", {"processes": "web", "working_dir": working_dir}),
+            iterations, concurrency, spawn_log
+        )
+    finally:
+        await quit_(0)
+    return results
+
+
+def install_stub(bin_dir: Path) -> None:
+    """Put an ``overmind`` wrapper around fake_overmind.py on PATH."""
+    bin_dir.mkdir()
+    wrapper = bin_dir / "overmind"
+    wrapper.write_text(f'#!/bin/sh\nexec "{sys.executable}" "{HERE / "fake_overmind.py"}" "$@"\n')
+    wrapper.chmod(0o755)
+    os.environ["PATH"] = f"{bin_dir}{os.pathsep}{os.environ.get('PATH', '')}"
+
+
+async def run(args: argparse.Namespace) -> Dict[str, Any]:
+    report: Dict[str, Any] = {
+        "commit": git_commit(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "config": {
+            "iterations": args.iterations,
+            "concurrency": args.concurrency,
+            "start_iterations": args.start_iterations,
+        },
+        "results": {},
+    }
+    original_path = os.environ.get("PATH", "")
+
+    with tempfile.TemporaryDirectory(prefix="omb") as temp_dir:
+        temp = Path(temp_dir)
+        project = temp / "fake"
+        project.mkdir()
+        (project / "Procfile").write_text(FAKE_PROCFILE)
+        spawn_log = temp / "spawns.log"
+        os.environ["FAKE_OVERMIND_SPAWN_LOG"] = str(spawn_log)
+        install_stub(temp / "bin")
+
+        print("Stub overmind:")
+        try:
+            report["results"]["stub"] = await bench_project(
+                project, args.iterations, args.concurrency, args.start_iterations, spawn_log
+            )
+        finally:
+            os.environ["PATH"] = original_path
+
+        if args.skip_real:
+            return report
+        if not (shutil.which("overmind") and shutil.which("tmux")):
+            print("Real overmind: skipped (overmind and tmux are not both installed)")
+            return report
+
+        real = temp / "real"
+        real.mkdir()
+        for name in TEST_ENVIRONMENT_FILES:
+            shutil.copy(ROOT / "test_environment" / name, real / name)
+        print("Real overmind (test_environment):")
+        report["results"]["test_environment"] = await bench_project(
+            real,
+            max(1, args.iterations // 10),
+            args.concurrency,
+            max(1, args.start_iterations // 5)
+        )
+    return report
+
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=ROOT, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any]) -> None:
+    """Print latency changes relative to a saved baseline."""
+    print(f"\nCompared with {baseline.get('commit') or 'baseline'}:")
+    for target, scenarios in current["results"].items():
+        for scenario, result in scenarios.items():
+            base = baseline.get("results", {}).get(target, {}).get(scenario)
+            if not base:
+                continue
+            changes = []
+            for key in ("p50_ms", "p95_ms", "p99_ms"):
+                if base[key]:
+                    changes.append(f"{key[:3]} {(result[key] / base[key] - 1) * 100:+.1f}%")
+            print(f"  {target}/{scenario:<16} " + "  ".join(changes))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=200, help="timed calls per scenario")
+    parser.add_argument("--concurrency", type=int, default=8, help="calls in flight at once")
+    parser.add_argument("--start-iterations", type=int, default=20, help="start/quit cycles")
+    parser.add_argument("--output", type=Path, help="write results as JSON to this file")
+    parser.add_argument("--compare", type=Path, help="JSON results to compare against")
+    parser.add_argument("--skip-real", action="store_true", help="only benchmark the stub")
+    args = parser.parse_args()
+
+    report = asyncio.run(run(args))
+    if args.output:
+        args.output.write_text(json.dumps(report, indent=2) + "\n")
+        print(f"\nResults written to {args.output}")
+    if args.compare:
+        compare(report, json.loads(args.compare.read_text()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""Stand-in for the overmind binary used by the benchmark harness.
+
+``fake_overmind.py start`` reads the Procfile, listens on ``.overmind.sock``
+and speaks the same line protocol as Overmind's command center, without
+tmux or real processes. Every other command connects to the socket like the
+real CLI does. Each invocation is appended to ``$FAKE_OVERMIND_SPAWN_LOG`` if
+set, so the harness can count spawns.
+"""
+
+import asyncio
+import os
+import socket
+import sys
+import time
+from pathlib import Path
+
+# Seconds "overmind start" waits before creating the socket
+START_DELAY = float(os.environ.get("FAKE_OVERMIND_START_DELAY", "0.05"))
+
+SOCKET_NAME = ".overmind.sock"
+
+
+def log_spawn(args):
+    path = os.environ.get("FAKE_OVERMIND_SPAWN_LOG")
+    if path:
+        with open(path, "a") as f:
+            f.write(" ".join(args) + "\n")
+
+
+def option(args, flag, default=None):
+    if flag in args:
+        return args[args.index(flag) + 1]
+    return default
+
+
+def read_procfile(path):
+    names = []
+    for line in Path(path).read_text().splitlines():
+        name, sep, _ = line.partition(":")
+        if sep and name.strip() and not line.startswith("#"):
+            names.append(name.strip())
+    return names
+
+
+async def start(args):
+    names = read_procfile(option(args, "-f", "Procfile"))
+    state = {name: "running" for name in names}
+    done = asyncio.Event()
+
+    def emit(name, text):
+        print(f"{name.ljust(9)} | {text}", flush=True)
+
+    async def handle(reader, writer):
+        while True:
+            line = await reader.readline()
+            if not line:
+                break
+            command, *targets = line.decode().split()
+            targets = targets or list(state)
+            if command == "status":
+                writer.write(b"PROCESS   PID       STATUS\n")
+                for name, status in state.items():
+                    writer.write(f"{name.ljust(10)}{os.getpid():<10}{status}\n".encode())
+                await writer.drain()
+                break
+            elif command == "restart":
+                for name in targets:
+                    state[name] = "running"
+                    emit(name, "Restarting...")
+            elif command == "stop":
+                for name in targets:
+                    state[name] = "dead"
+                    emit(name, "Interrupting...")
+            elif command in ("quit", "kill"):
+                done.set()
+                break
+            elif command == "echo":
+                writer.write(b"system    | echo attached\n")
+                await writer.drain()
+        writer.close()
+
+    await asyncio.sleep(START_DELAY)
+    server = await asyncio.start_unix_server(handle, SOCKET_NAME)
+    print("system    | Tmux socket name: fake-overmind", flush=True)
+    for name in names:
+        emit(name, "started")
+    try:
+        await done.wait()
+    finally:
+        server.close()
+        Path(SOCKET_NAME).unlink(missing_ok=True)
+
+
+def client(command, args):
+    sock = socket.socket(socket.AF_UNIX)
+    try:
+        sock.connect(SOCKET_NAME)
+    except OSError:
+        print("overmind: dial unix .overmind.sock: connect: no such file or directory", file=sys.stderr)
+        return 1
+    sock.sendall((" ".join([command] + args) + "\n").encode())
+    if command == "status":
+        while True:
+            chunk = sock.recv(65536)
+            if not chunk:
+                break
+            sys.stdout.write(chunk.decode())
+    sock.close()
+    return 0
+
+
+def main():
+    args = sys.argv[1:]
+    log_spawn(args)
+    if not args:
+        print("usage: overmind <command>", file=sys.stderr)
+        return 1
+    command, rest = args[0], args[1:]
+    if command in ("start", "s"):
+        asyncio.run(start(rest))
+        return 0
+    if command == "run":
+        time.sleep(0.01)
+        print(" ".join(rest))
+        return 0
+    return client(command, rest)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,194 @@
+"""Async client for the Overmind control socket.
+
+Overmind's command center listens on ``.overmind.sock`` and accepts one
+command per line, e.g. ``restart web worker\\n``. Commands such as ``status``
+write a response and then close the connection, while ``restart``, ``stop``,
+``quit`` and ``kill`` produce no response and leave the connection open, so
+they can share a single persistent connection.
+"""
+
+import asyncio
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Union
+
+# Commands that write a response back on the connection
+RESPONSE_COMMANDS = frozenset({"status", "echo", "get-connection"})
+
+# Commands that are fire-and-forget on the persistent connection
+CONTROL_COMMANDS = frozenset({"restart", "stop", "quit", "kill"})
+
+# Default number of seconds to wait for connecting and for a response
+DEFAULT_TIMEOUT = 2.0
+
+
+def parse_status(output: str) -> List[Dict[str, Any]]:
+    """Parse the table printed by ``overmind status``.
+
+    Args:
+        output: Status output, e.g. ``PROCESS PID STATUS`` followed by one row
+            per process
+
+    Returns:
+        One dictionary per process with ``name``, ``pid`` and ``status``.
+    """
+    processes = []
+    for line in output.splitlines():
+        fields = line.split()
+        if len(fields) < 3 or fields[0] == "PROCESS":
+            continue
+        try:
+            pid: Optional[int] = int(fields[1])
+        except ValueError:
+            pid = None
+        processes.append({"name": fields[0], "pid": pid, "status": fields[-1]})
+    return processes
+
+
+class OvermindProtocolError(Exception):
+    """Raised when the control socket cannot serve a command."""
+
+
+class OvermindClient:
+    """Client speaking Overmind's line-based control socket protocol."""
+
+    def __init__(self, socket_path: Union[str, Path], timeout: float = DEFAULT_TIMEOUT):
+        """Initialize the client.
+
+        Args:
+            socket_path: Path to the ``.overmind.sock`` file
+            timeout: Seconds to wait when connecting or reading a response
+        """
+        self.socket_path = Path(socket_path)
+        self.timeout = timeout
+        self._reader: Optional[asyncio.StreamReader] = None
+        self._writer: Optional[asyncio.StreamWriter] = None
+        self._lock = asyncio.Lock()
+
+    @staticmethod
+    def encode(command: str, args: Sequence[str] = ()) -> bytes:
+        """Encode a command line for the control socket."""
+        parts = [command] + [arg.strip() for arg in args if arg.strip()]
+        for part in parts:
+            if any(c.isspace() for c in part):
+                raise OvermindProtocolError(f"Argument cannot contain whitespace: {part!r}")
+        return (" ".join(parts) + "\n").encode("utf-8")
+
+    async def _open(self):
+        try:
+            return await asyncio.wait_for(
+                asyncio.open_unix_connection(str(self.socket_path)), self.timeout
+            )
+        except (OSError, asyncio.TimeoutError) as e:
+            raise OvermindProtocolError(f"Cannot connect to {self.socket_path}: {e}") from e
+
+    def _connected(self) -> bool:
+        return (
+            self._writer is not None
+            and not self._writer.is_closing()
+            and not self._reader.at_eof()
+        )
+
+    async def send(self, command: str, args: Sequence[str] = ()) -> None:
+        """Send a command that has no response over the persistent connection.
+
+        The connection is re-established once if it turns out to be broken.
+
+        Args:
+            command: One of the control commands (restart, stop, quit, kill)
+            args: Command arguments, typically process names
+        """
+        if command not in CONTROL_COMMANDS:
+            raise OvermindProtocolError(f"Unsupported control command: {command}")
+
+        line = self.encode(command, args)
+        async with self._lock:
+            for attempt in range(2):
+                if not self._connected():
+                    await self._reset()
+                    self._reader, self._writer = await self._open()
+                try:
+                    self._writer.write(line)
+                    await self._writer.drain()
+                    return
+                except OSError as e:
+                    await self._reset()
+                    if attempt:
+                        raise OvermindProtocolError(f"Failed to send {command}: {e}") from e
+
+    async def request(
+        self,
+        command: str,
+        args: Sequence[str] = (),
+        idle_timeout: Optional[float] = None,
+        max_time: Optional[float] = None,
+        max_bytes: Optional[int] = None
+    ) -> str:
+        """Send a command on a fresh connection and read its response.
+
+        Args:
+            command: One of the response commands (status, echo, get-connection)
+            args: Command arguments
+            idle_timeout: Stop reading after this many seconds without data
+                instead of waiting for the server to close the connection
+            max_time: Stop reading after this many seconds in total (optional)
+            max_bytes: Stop reading once this many bytes arrived (optional)
+
+        Returns:
+            The decoded response text, cut short if max_time or max_bytes
+            was reached.
+        """
+        if command not in RESPONSE_COMMANDS:
+            raise OvermindProtocolError(f"Unsupported request command: {command}")
+
+        reader, writer = await self._open()
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + max_time if max_time is not None else None
+        chunks: List[bytes] = []
+        size = 0
+        try:
+            writer.write(self.encode(command, args))
+            await writer.drain()
+
+            while max_bytes is None or size < max_bytes:
+                wait = idle_timeout or self.timeout
+                if deadline is not None:
+                    remaining = deadline - loop.time()
+                    if remaining <= 0:
+                        break
+                    wait = min(wait, remaining)
+                try:
+                    chunk = await asyncio.wait_for(reader.read(65536), wait)
+                except asyncio.TimeoutError:
+                    if idle_timeout is not None or (deadline is not None and loop.time() >= deadline):
+                        break
+                    raise OvermindProtocolError(
+                        f"No response to {command} within {self.timeout} seconds"
+                    )
+                if not chunk:
+                    break
+                chunks.append(chunk)
+                size += len(chunk)
+        except OSError as e:
+            raise OvermindProtocolError(f"Failed to request {command}: {e}") from e
+        finally:
+            writer.close()
+
+        data = b"".join(chunks)
+        if max_bytes is not None:
+            data = data[:max_bytes]
+        return data.decode("utf-8", errors="replace")
+
+    async def _reset(self) -> None:
+        if self._writer is not None:
+            self._writer.close()
+            try:
+                await self._writer.wait_closed()
+            except OSError:
+                pass
+        self._reader = None
+        self._writer = None
+
+    async def close(self) -> None:
+        """Close the persistent connection."""
+        async with self._lock:
+            await self._reset()
@@ -0,0 +1,211 @@
+"""Procfile discovery with a directory-mtime keyed index.
+
+The walker uses ``os.scandir`` with an explicit depth bound and prunes ignored
+directories before descending, so dependency trees such as ``node_modules``
+are never listed. Directory listings are cached by the directory's mtime: a
+repeat search only stats each directory it visits and re-lists the ones that
+changed.
+"""
+
+import fnmatch
+import os
+import threading
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+# Directories that never contain Procfiles worth managing
+DEFAULT_IGNORED_DIRS = frozenset({
+    ".git",
+    ".hg",
+    ".svn",
+    ".venv",
+    "venv",
+    "node_modules",
+    "__pycache__",
+    ".tox",
+    ".nox",
+    ".mypy_cache",
+    ".pytest_cache",
+    ".ruff_cache",
+})
+
+# Number of characters of each Procfile shown as a preview
+PREVIEW_LENGTH = 200
+
+
+class _DirListing(NamedTuple):
+    mtime_ns: int
+    subdirs: Tuple[str, ...]
+    procfile: bool
+    gitignore: bool
+
+
+class _Preview(NamedTuple):
+    mtime_ns: int
+    size: int
+    text: str
+
+
+class _Ignore(NamedTuple):
+    mtime_ns: int
+    patterns: Tuple[Tuple[str, bool], ...]
+
+
+def parse_gitignore(text: str) -> Tuple[Tuple[str, bool], ...]:
+    """Parse the directory-relevant subset of a ``.gitignore`` file.
+
+    Negations are not supported and are skipped.
+
+    Returns:
+        Tuples of ``(pattern, anchored)``; anchored patterns only match
+        relative to the directory containing the ``.gitignore``.
+    """
+    patterns = []
+    for line in text.splitlines():
+        line = line.strip()
+        if not line or line.startswith("#") or line.startswith("!"):
+            continue
+        line = line.rstrip("/")
+        if line.startswith("**/"):
+            line = line[3:]
+        anchored = "/" in line
+        patterns.append((line.lstrip("/"), anchored))
+    return tuple(patterns)
+
+
+class ProcfileIndex:
+    """Thread-safe cache of Procfile locations keyed by directory mtimes."""
+
+    def __init__(self):
+        """Initialize an empty index."""
+        self._listings: Dict[str, _DirListing] = {}
+        self._previews: Dict[str, _Preview] = {}
+        self._ignores: Dict[str, _Ignore] = {}
+        self._lock = threading.Lock()
+        self.scanned = 0
+
+    def _listing(self, path: str) -> Optional[_DirListing]:
+        try:
+            mtime_ns = os.stat(path).st_mtime_ns
+        except OSError:
+            with self._lock:
+                self._listings.pop(path, None)
+            return None
+
+        with self._lock:
+            cached = self._listings.get(path)
+        if cached is not None and cached.mtime_ns == mtime_ns:
+            return cached
+
+        subdirs = []
+        procfile = gitignore = False
+        try:
+            with os.scandir(path) as entries:
+                for entry in entries:
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            subdirs.append(entry.name)
+                        elif entry.name == "Procfile":
+                            procfile = entry.is_file()
+                        elif entry.name == ".gitignore":
+                            gitignore = True
+                    except OSError:
+                        continue
+        except OSError:
+            return None
+
+        listing = _DirListing(mtime_ns, tuple(sorted(subdirs)), procfile, gitignore)
+        with self._lock:
+            self._listings[path] = listing
+            self.scanned += 1
+        return listing
+
+    def _gitignore(self, directory: str) -> Tuple[Tuple[str, bool], ...]:
+        path = os.path.join(directory, ".gitignore")
+        try:
+            mtime_ns = os.stat(path).st_mtime_ns
+        except OSError:
+            return ()
+        with self._lock:
+            cached = self._ignores.get(path)
+        if cached is not None and cached.mtime_ns == mtime_ns:
+            return cached.patterns
+        try:
+            with open(path, encoding="utf-8", errors="replace") as f:
+                patterns = parse_gitignore(f.read())
+        except OSError:
+            return ()
+        with self._lock:
+            self._ignores[path] = _Ignore(mtime_ns, patterns)
+        return patterns
+
+    def _preview(self, path: str) -> Dict[str, Any]:
+        try:
+            stat = os.stat(path)
+            with self._lock:
+                cached = self._previews.get(path)
+            if cached is None or (cached.mtime_ns, cached.size) != (stat.st_mtime_ns, stat.st_size):
+                with open(path, encoding="utf-8", errors="replace") as f:
+                    text = f.read(PREVIEW_LENGTH + 1)
+                if len(text) > PREVIEW_LENGTH:
+                    text = text[:PREVIEW_LENGTH] + "..."
+                cached = _Preview(stat.st_mtime_ns, stat.st_size, text)
+                with self._lock:
+                    self._previews[path] = cached
+            return {"path": path, "size": cached.size, "preview": cached.text}
+        except OSError as e:
+            return {"path": path, "error": str(e)}
+
+    def find(
+        self,
+        root: str,
+        max_depth: int = 1,
+        ignore: Iterable[str] = (),
+        use_gitignore: bool = True
+    ) -> List[Dict[str, Any]]:
+        """Find Procfiles below a directory.
+
+        Args:
+            root: Directory to start searching from
+            max_depth: Number of subdirectory levels to descend into
+            ignore: Extra directory names or glob patterns to skip
+            use_gitignore: Also skip directories matched by ``.gitignore`` files
+
+        Returns:
+            One dictionary per Procfile with ``path``, ``size`` and ``preview``,
+            or ``path`` and ``error`` if it could not be read.
+        """
+        ignored = DEFAULT_IGNORED_DIRS | frozenset(ignore)
+        results = []
+        # Each entry carries the gitignore rules inherited from its parents as
+        # (base directory, patterns) pairs
+        stack = [(os.path.abspath(root), 0, ())]
+        while stack:
+            path, depth, rules = stack.pop()
+            listing = self._listing(path)
+            if listing is None:
+                continue
+            if listing.procfile:
+                results.append(self._preview(os.path.join(path, "Procfile")))
+            if depth >= max_depth:
+                continue
+
+            if use_gitignore and listing.gitignore:
+                rules = rules + ((path, self._gitignore(path)),)
+            for name in listing.subdirs:
+                child = os.path.join(path, name)
+                if self._ignored(name, child, ignored, rules):
+                    continue
+                stack.append((child, depth + 1, rules))
+
+        return sorted(results, key=lambda result: result["path"])
+
+    @staticmethod
+    def _ignored(name: str, path: str, ignored: frozenset, rules: tuple) -> bool:
+        if name in ignored or any(fnmatch.fnmatch(name, pattern) for pattern in ignored):
+            return True
+        for base, patterns in rules:
+            relative = os.path.relpath(path, base)
+            for pattern, anchored in patterns:
+                if fnmatch.fnmatch(relative if anchored else name, pattern):
+                    return True
+        return False
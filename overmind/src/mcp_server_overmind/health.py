@@ -0,0 +1,273 @@
+"""Readiness and health probes for Procfile processes.
+
+Probes are declared with comments in the Procfile, one per line::
+
+    # health web tcp:8000
+    # health api http://127.0.0.1:3000/health
+    # health worker log:Worker ready
+
+``tcp:[host:]port`` succeeds when the port accepts a connection,
+``http://...`` when the URL answers with a 2xx status, and ``log:<regex>``
+when the pattern appears in the output captured from the process. ``$PORT``
+in a target stands for the port Overmind gives the process.
+
+Log probes usually match a one-time startup message, which eventually drops
+out of the capture buffer. Once a log probe matches it stays passed until
+the process is restarted or stopped, or runs under a different PID.
+"""
+
+import asyncio
+import re
+import time
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+from urllib.parse import urlsplit
+
+from .logs import LogBuffer, process_matches
+
+# Matches a probe declaration comment in a Procfile
+PROBE_COMMENT = re.compile(r"^#\s*health\s+(?P<process>[\w.#-]+)\s+(?P<spec>\S.*?)\s*$")
+
+# Default seconds each probe may take
+DEFAULT_PROBE_TIMEOUT = 2.0
+
+# Default seconds probe results are reused
+DEFAULT_HEALTH_TTL = 2.0
+
+# Number of captured lines searched by log probes
+LOG_PROBE_LINES = 1000
+
+# Placeholder in probe targets for the port Overmind assigns the process
+PORT_PLACEHOLDER = "$PORT"
+
+
+class ProbeError(ValueError):
+    """Raised for malformed probe specifications."""
+
+
+class Probe(NamedTuple):
+    """A readiness check for one process."""
+
+    process: str
+    kind: str
+    target: str
+
+    @property
+    def spec(self) -> str:
+        """The probe in its declaration syntax."""
+        return self.target if self.kind == "http" else f"{self.kind}:{self.target}"
+
+    def with_port(self, port: int) -> "Probe":
+        """The probe with ``$PORT`` in its target replaced by a port number."""
+        if self.kind == "log" or PORT_PLACEHOLDER not in self.target:
+            return self
+        return self._replace(target=self.target.replace(PORT_PLACEHOLDER, str(port)))
+
+
+def parse_probe(process: str, spec: str) -> Probe:
+    """Parse a probe specification such as ``tcp:8000``.
+
+    Args:
+        process: Process the probe belongs to
+        spec: ``tcp:[host:]port``, ``http(s)://...`` or ``log:<regex>``
+    """
+    spec = spec.strip()
+    if spec.startswith(("http://", "https://")):
+        return Probe(process, "http", spec)
+    kind, sep, target = spec.partition(":")
+    if not sep or not target:
+        raise ProbeError(f"Invalid probe for {process}: {spec!r}")
+    if kind == "tcp":
+        host, _, port = target.rpartition(":")
+        if not port.isdigit() and port != PORT_PLACEHOLDER:
+            raise ProbeError(f"Invalid port in probe for {process}: {spec!r}")
+        return Probe(process, "tcp", f"{host or '127.0.0.1'}:{port}")
+    if kind == "log":
+        try:
+            re.compile(target)
+        except re.error as e:
+            raise ProbeError(f"Invalid pattern in probe for {process}: {e}")
+        return Probe(process, "log", target)
+    raise ProbeError(f"Unknown probe type for {process}: {kind!r}")
+
+
+async def _check_tcp(target: str) -> str:
+    host, _, port = target.rpartition(":")
+    _, writer = await asyncio.open_connection(host, int(port))
+    writer.close()
+    return f"accepting connections on {target}"
+
+
+async def _check_http(url: str) -> str:
+    parts = urlsplit(url)
+    secure = parts.scheme == "https"
+    port = parts.port or (443 if secure else 80)
+    reader, writer = await asyncio.open_connection(parts.hostname, port, ssl=secure or None)
+    try:
+        path = parts.path or "/"
+        if parts.query:
+            path += "?" + parts.query
+        writer.write(
+            f"GET {path} HTTP/1.0\r\nHost: {parts.netloc}\r\nConnection: close\r\n\r\n".encode()
+        )
+        await writer.drain()
+        status_line = (await reader.readline()).decode("latin-1").split()
+    finally:
+        writer.close()
+    if len(status_line) < 2 or not status_line[1].isdigit():
+        raise ConnectionError("invalid HTTP response")
+    status = int(status_line[1])
+    if not 200 <= status < 300:
+        raise ConnectionError(f"HTTP {status}")
+    return f"HTTP {status}"
+
+
+def _check_log(probe: Probe, logs: Optional[LogBuffer], after_seq: int) -> str:
+    if logs is None:
+        raise LookupError("no captured output")
+    pattern = re.compile(probe.target)
+    for line in reversed(logs.tail(probe.process, LOG_PROBE_LINES, after_seq=after_seq)):
+        if pattern.search(line.text):
+            return f"matched: {line.text[:200]}"
+    raise LookupError("pattern not found in captured output")
+
+
+async def run_probe(
+    probe: Probe,
+    logs: Optional[LogBuffer] = None,
+    timeout: float = DEFAULT_PROBE_TIMEOUT,
+    after_seq: int = 0
+) -> Dict[str, Any]:
+    """Run one probe.
+
+    Args:
+        probe: The probe to run
+        logs: Captured output searched by log probes
+        timeout: Seconds the probe may take
+        after_seq: Log probes only consider lines captured after this sequence number
+
+    Returns:
+        A dictionary with ``process``, ``probe``, ``healthy``, ``detail`` and
+        ``latency`` in seconds.
+    """
+    started = time.monotonic()
+    try:
+        if probe.kind == "tcp":
+            detail = await asyncio.wait_for(_check_tcp(probe.target), timeout)
+        elif probe.kind == "http":
+            detail = await asyncio.wait_for(_check_http(probe.target), timeout)
+        else:
+            detail = _check_log(probe, logs, after_seq)
+        healthy = True
+    except asyncio.TimeoutError:
+        healthy, detail = False, f"timed out after {timeout}s"
+    except Exception as e:
+        healthy, detail = False, str(e) or type(e).__name__
+    return {
+        "process": probe.process,
+        "probe": probe.spec,
+        "healthy": healthy,
+        "detail": detail,
+        "latency": time.monotonic() - started,
+    }
+
+
+def _related(name: str, process: str) -> bool:
+    """Whether two process names overlap, e.g. ``worker`` and ``worker#2``."""
+    return process_matches(name, process) or process_matches(process, name)
+
+
+class HealthChecker:
+    """Runs probes concurrently and caches their results briefly."""
+
+    def __init__(self, ttl: float = DEFAULT_HEALTH_TTL):
+        """Initialize the checker.
+
+        Args:
+            ttl: Seconds a probe result is reused
+        """
+        self.ttl = ttl
+        self._cache: Dict[Probe, Tuple[float, Dict[str, Any]]] = {}
+        # Log probes that matched, with the PIDs of their process at the time
+        self._latched: Dict[Probe, Tuple[Optional[Tuple[int, ...]], Dict[str, Any]]] = {}
+        # Log probes only search output captured after the last restart or
+        # stop of every process, and of individual processes
+        self._after_all = 0
+        self._after: Dict[str, int] = {}
+
+    def _after_seq(self, probe: Probe) -> int:
+        return max(
+            [self._after_all] + [seq for name, seq in self._after.items() if _related(name, probe.process)]
+        )
+
+    async def check(
+        self,
+        probes: List[Probe],
+        logs: Optional[LogBuffer] = None,
+        timeout: float = DEFAULT_PROBE_TIMEOUT,
+        max_age: Optional[float] = None,
+        pids: Optional[Dict[str, int]] = None
+    ) -> List[Dict[str, Any]]:
+        """Run all probes at once, reusing fresh cached results.
+
+        Args:
+            probes: Probes to run
+            logs: Captured output searched by log probes
+            timeout: Seconds each probe may take
+            max_age: Oldest cached result to accept (optional, defaults to the TTL)
+            pids: Current PID of each process (optional); a latched log probe
+                is checked again once its process runs under another PID
+        """
+        max_age = self.ttl if max_age is None else max_age
+        now = time.monotonic()
+        results: Dict[Probe, Dict[str, Any]] = {}
+        current: Dict[Probe, Optional[Tuple[int, ...]]] = {}
+        pending = []
+        for probe in probes:
+            if probe.kind == "log":
+                current[probe] = None if pids is None else tuple(sorted(
+                    pid for name, pid in pids.items() if process_matches(name, probe.process)
+                ))
+                latched = self._latched.get(probe)
+                if latched is not None and latched[0] == current[probe]:
+                    results[probe] = latched[1]
+                    continue
+                self._latched.pop(probe, None)
+            cached = self._cache.get(probe)
+            if cached is not None and now - cached[0] <= max_age:
+                results[probe] = cached[1]
+            else:
+                pending.append(probe)
+
+        fresh = await asyncio.gather(*(
+            run_probe(p, logs, timeout, self._after_seq(p)) for p in pending
+        ))
+        now = time.monotonic()
+        for probe, result in zip(pending, fresh):
+            self._cache[probe] = (now, result)
+            results[probe] = result
+            if probe.kind == "log" and result["healthy"]:
+                self._latched[probe] = (current[probe], result)
+        return [results[probe] for probe in probes]
+
+    def invalidate(self) -> None:
+        """Drop all cached results."""
+        self._cache.clear()
+
+    def reset(self, processes: Optional[List[str]] = None, after_seq: int = 0) -> None:
+        """Unlatch log probes of restarted or stopped processes.
+
+        Args:
+            processes: Processes that were restarted or stopped (optional, defaults to all)
+            after_seq: Their log probes only match output captured after this
+                sequence number from now on
+        """
+        if not processes:
+            self._latched.clear()
+            self._after.clear()
+            self._after_all = after_seq
+            return
+        for probe in list(self._latched):
+            if any(_related(name, probe.process) for name in processes):
+                del self._latched[probe]
+        for name in processes:
+            self._after[name] = after_seq
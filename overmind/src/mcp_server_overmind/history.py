@@ -0,0 +1,360 @@
+"""Persistent, segmented store of captured process output.
+
+Captured lines are appended to segment files under ``.overmind-mcp/logs`` in
+the project directory, one ``timestamp<TAB>process<TAB>text`` line each. A
+segment is closed once it reaches a size limit and a new one is started, so
+retention can drop whole files. Alongside each segment a sparse index records
+the capture time, byte offset and line number every few kilobytes; a read for "two hours
+ago" bisects the index to the nearest preceding entry and scans forward from
+there through an mmap of the segment, instead of reading the whole history.
+"""
+
+import bisect
+import mmap
+import os
+import re
+import struct
+import time
+from pathlib import Path
+from typing import BinaryIO, List, NamedTuple, Optional
+
+from .logs import LogLine, process_matches
+
+# Directory under the project holding the server's persistent state
+STATE_DIR = ".overmind-mcp"
+
+# Default segment size at which a new segment is started
+DEFAULT_SEGMENT_BYTES = 8 * 1024 * 1024
+
+# Default total size of all segments before the oldest are deleted
+DEFAULT_MAX_BYTES = int(os.environ.get("OVERMIND_MCP_HISTORY_MAX_BYTES", str(256 * 1024 * 1024)))
+
+# Default age in seconds after which segments are deleted
+DEFAULT_MAX_AGE = float(os.environ.get("OVERMIND_MCP_HISTORY_MAX_AGE", str(7 * 24 * 3600)))
+
+# Bytes of segment data between sparse index entries
+INDEX_INTERVAL_BYTES = 4096
+
+# Seconds between flushes of buffered writes to disk
+FLUSH_INTERVAL = 1.0
+
+# Seconds between retention checks while lines are appended, so segments
+# age out even when no rotation happens
+RETENTION_INTERVAL = 60.0
+
+# Index entry: capture timestamp, byte offset and number of the line it points at
+INDEX_ENTRY = struct.Struct("<dQQ")
+
+# Segment files are named after the number of their first line
+SEGMENT_NAME = re.compile(r"^(?P<first>\d{20})\.log$")
+
+
+def history_enabled() -> bool:
+    """Whether captured output is persisted, controlled by OVERMIND_MCP_HISTORY."""
+    return os.environ.get("OVERMIND_MCP_HISTORY", "1").lower() not in ("0", "false", "no", "off")
+
+
+class Segment(NamedTuple):
+    """One segment file and its sparse index."""
+
+    first: int
+    path: Path
+    index_path: Path
+    times: List[float]
+    offsets: List[int]
+    lines: List[int]
+
+
+def _load_index(path: Path) -> tuple:
+    try:
+        data = path.read_bytes()
+    except OSError:
+        return [], [], []
+    times, offsets, lines = [], [], []
+    for i in range(len(data) // INDEX_ENTRY.size):
+        timestamp, offset, seq = INDEX_ENTRY.unpack_from(data, i * INDEX_ENTRY.size)
+        times.append(timestamp)
+        offsets.append(offset)
+        lines.append(seq)
+    return times, offsets, lines
+
+
+def _parse(raw: bytes, seq: int) -> Optional[LogLine]:
+    parts = raw.decode("utf-8", errors="replace").split("\t", 2)
+    if len(parts) != 3:
+        return None
+    try:
+        timestamp = float(parts[0])
+    except ValueError:
+        return None
+    return LogLine(seq, timestamp, parts[1], parts[2])
+
+
+def read_segments(
+    segments: List[Segment],
+    since: float,
+    until: Optional[float] = None,
+    process: Optional[str] = None,
+    contains: Optional[str] = None,
+    limit: int = 200
+) -> List[LogLine]:
+    """Return lines captured in a time window, oldest first.
+
+    Only reads files, so it can run on a worker thread given a snapshot.
+
+    Args:
+        segments: Segments from LogHistory.snapshot
+        since: Earliest capture time (epoch seconds)
+        until: Latest capture time (epoch seconds, optional)
+        process: Only lines from this process or its scaled instances (optional)
+        contains: Only lines containing this text (optional)
+        limit: Maximum number of lines returned
+    """
+    selected: List[LogLine] = []
+    # Skip segments that end before the window; a segment ends where the
+    # next one begins
+    start = 0
+    for i in range(1, len(segments)):
+        times = segments[i].times
+        if times and times[0] < since:
+            start = i
+    for segment in segments[start:]:
+        if until is not None and segment.times and segment.times[0] > until:
+            break
+        if _read_segment(segment, since, until, process, contains, limit, selected):
+            break
+    return selected
+
+
+def _read_segment(
+    segment: Segment,
+    since: float,
+    until: Optional[float],
+    process: Optional[str],
+    contains: Optional[str],
+    limit: int,
+    selected: List[LogLine]
+) -> bool:
+    """Scan one segment into selected; returns True once the read is done."""
+    # Start at the last index entry captured before the window
+    i = bisect.bisect_left(segment.times, since) - 1
+    offset = segment.offsets[i] if i >= 0 else 0
+    seq = segment.lines[i] if i >= 0 else segment.first
+    try:
+        with open(segment.path, "rb") as f:
+            if os.fstat(f.fileno()).st_size <= offset:
+                return False
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                while offset < len(data) and len(selected) < limit:
+                    end = data.find(b"\n", offset)
+                    if end < 0:
+                        break
+                    line = _parse(data[offset:end], seq)
+                    offset = end + 1
+                    seq += 1
+                    if line is None or line.timestamp < since:
+                        continue
+                    if until is not None and line.timestamp > until:
+                        return True
+                    if process is not None and not process_matches(line.process, process):
+                        continue
+                    if contains is not None and contains not in line.text:
+                        continue
+                    selected.append(line)
+    except (OSError, ValueError):
+        return False
+    return len(selected) >= limit
+
+
+class LogHistory:
+    """Append-only output history in rotating, indexed segment files.
+
+    Lines are numbered from the first line ever written, so numbers stay
+    stable across restarts and segment deletion.
+    """
+
+    def __init__(
+        self,
+        directory: Path,
+        segment_bytes: int = DEFAULT_SEGMENT_BYTES,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+        max_age: float = DEFAULT_MAX_AGE
+    ):
+        """Open the history, picking up segments from earlier runs.
+
+        Args:
+            directory: Directory holding the segment files
+            segment_bytes: Size at which a new segment is started
+            max_bytes: Total size of all segments before the oldest are deleted
+            max_age: Age in seconds after which segments are deleted
+        """
+        self.directory = Path(directory)
+        self.segment_bytes = segment_bytes
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self.segments: List[Segment] = []
+        self._file: Optional[BinaryIO] = None
+        self._index_file: Optional[BinaryIO] = None
+        self._size = 0
+        self._indexed_at = 0
+        self._next = 0
+        self._last_flush = 0.0
+        self._last_retention = 0.0
+        self._scan()
+
+    def _scan(self) -> None:
+        if not self.directory.is_dir():
+            return
+        for entry in sorted(self.directory.iterdir()):
+            match = SEGMENT_NAME.match(entry.name)
+            if match:
+                index_path = entry.with_suffix(".idx")
+                first = int(match.group("first"))
+                self.segments.append(Segment(first, entry, index_path, *_load_index(index_path)))
+
+    def _segment(self, first: int) -> Segment:
+        path = self.directory / f"{first:020d}.log"
+        return Segment(first, path, path.with_suffix(".idx"), [], [], [])
+
+    def _open_active(self) -> None:
+        """Open the newest segment for appending, repairing a torn last line."""
+        self.directory.mkdir(parents=True, exist_ok=True)
+        if not self.segments:
+            self.segments.append(self._segment(0))
+        segment = self.segments[-1]
+        with open(segment.path, "a+b") as f:
+            f.seek(0)
+            data = f.read()
+            end = data.rfind(b"\n") + 1
+            if end != len(data):
+                f.truncate(end)
+        self._size = end
+        self._next = segment.first + data.count(b"\n", 0, end)
+        # Drop index entries past the repaired end
+        while segment.offsets and segment.offsets[-1] >= end:
+            segment.offsets.pop()
+            segment.times.pop()
+            segment.lines.pop()
+        with open(segment.index_path, "wb") as f:
+            for entry in zip(segment.times, segment.offsets, segment.lines):
+                f.write(INDEX_ENTRY.pack(*entry))
+        # The first line of a segment is always indexed
+        self._indexed_at = segment.offsets[-1] if segment.offsets else -INDEX_INTERVAL_BYTES
+        self._file = open(segment.path, "ab")
+        self._index_file = open(segment.index_path, "ab")
+        self.enforce_retention()
+
+    def _rotate(self) -> None:
+        self.close()
+        self.segments.append(self._segment(self._next))
+        self._open_active()
+
+    def append(self, line: LogLine) -> None:
+        """Append a captured line."""
+        if self._file is None:
+            self._open_active()
+        elif self._size >= self.segment_bytes:
+            self._rotate()
+        segment = self.segments[-1]
+        process = line.process.replace("\t", " ")
+        data = f"{line.timestamp:.6f}\t{process}\t{line.text}\n".encode("utf-8", errors="replace")
+        if self._size - self._indexed_at >= INDEX_INTERVAL_BYTES:
+            segment.times.append(line.timestamp)
+            segment.offsets.append(self._size)
+            segment.lines.append(self._next)
+            self._index_file.write(INDEX_ENTRY.pack(line.timestamp, self._size, self._next))
+            self._indexed_at = self._size
+        self._file.write(data)
+        self._size += len(data)
+        self._next += 1
+        now = time.monotonic()
+        if now - self._last_flush >= FLUSH_INTERVAL:
+            self.flush()
+            self._last_flush = now
+            if now - self._last_retention >= RETENTION_INTERVAL:
+                self.enforce_retention()
+                self._last_retention = now
+
+    def flush(self) -> None:
+        """Write buffered lines to disk."""
+        if self._file is not None:
+            self._file.flush()
+            self._index_file.flush()
+
+    def size(self) -> int:
+        """Total size of all segments in bytes."""
+        total = 0
+        for segment in self.segments:
+            try:
+                total += segment.path.stat().st_size
+            except OSError:
+                pass
+        return total
+
+    def enforce_retention(self, now: Optional[float] = None) -> int:
+        """Delete the oldest segments beyond the size and age limits.
+
+        The segment being written is never deleted.
+
+        Returns:
+            Number of segments deleted
+        """
+        now = time.time() if now is None else now
+        sizes = []
+        for segment in self.segments:
+            try:
+                sizes.append(segment.path.stat().st_size)
+            except OSError:
+                sizes.append(0)
+        total = sum(sizes)
+        deleted = 0
+        while len(self.segments) > 1:
+            # A segment's newest line is older than the next segment's first
+            following = self.segments[1].times
+            expired = bool(following) and following[0] < now - self.max_age
+            if total <= self.max_bytes and not expired:
+                break
+            segment = self.segments.pop(0)
+            total -= sizes.pop(0)
+            for path in (segment.path, segment.index_path):
+                try:
+                    path.unlink()
+                except OSError:
+                    pass
+            deleted += 1
+        return deleted
+
+    def snapshot(self) -> List[Segment]:
+        """Flush buffered lines and copy the segment list for read_segments.
+
+        Call this on the thread that appends, so the copy is consistent; the
+        copy can then be read on any thread.
+        """
+        self.flush()
+        return [
+            segment._replace(times=list(segment.times), offsets=list(segment.offsets), lines=list(segment.lines))
+            for segment in self.segments
+        ]
+
+    def read(
+        self,
+        since: float,
+        until: Optional[float] = None,
+        process: Optional[str] = None,
+        contains: Optional[str] = None,
+        limit: int = 200
+    ) -> List[LogLine]:
+        """Return lines captured in a time window, oldest first.
+
+        See read_segments for the arguments.
+        """
+        return read_segments(self.snapshot(), since, until, process, contains, limit)
+
+    def close(self) -> None:
+        """Flush and close the active segment."""
+        if self._file is not None:
+            self.flush()
+            self._file.close()
+            self._index_file.close()
+            self._file = None
+            self._index_file = None
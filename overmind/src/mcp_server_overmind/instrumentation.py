@@ -0,0 +1,201 @@
+"""Timing and resource instrumentation for the MCP tools.
+
+Each instrumented tool records its latency in a fixed-bucket histogram along
+with error counts. Subprocess spawns and the bytes they print are attributed
+to the tool that caused them through a context variable, so work done in
+helper tasks is still charged to the calling tool.
+"""
+
+import asyncio
+import bisect
+import contextvars
+import functools
+import os
+import time
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+# Upper bounds of the latency histogram buckets, in seconds
+LATENCY_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+# Tool results starting with one of these are counted as errors, here and by
+# overmind_batch; the tools report failures as text rather than raising
+ERROR_PREFIXES = (
+    "Failed",
+    "Error",
+    "Invalid",
+    "Unknown process",
+    "Overmind is not currently running",
+    "Procfile not found",
+    "Procfile at",
+    "Command failed",
+    "Command timed out",
+)
+
+# Seconds between Prometheus text file writes
+DEFAULT_EXPORT_INTERVAL = float(os.environ.get("OVERMIND_MCP_PROMETHEUS_INTERVAL", "15"))
+
+# Name of the tool currently executing in this context
+current_tool: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar("current_tool", default=None)
+
+
+class ToolStats:
+    """Counters and latency histogram for a single tool."""
+
+    def __init__(self):
+        """Initialize empty counters."""
+        self.calls = 0
+        self.errors = 0
+        self.total_seconds = 0.0
+        self.max_seconds = 0.0
+        # One count per bucket plus a final +Inf bucket
+        self.buckets = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.spawns = 0
+        self.output_bytes = 0
+
+    def observe(self, seconds: float, error: bool) -> None:
+        """Record one call."""
+        self.calls += 1
+        self.errors += error
+        self.total_seconds += seconds
+        self.max_seconds = max(self.max_seconds, seconds)
+        self.buckets[bisect.bisect_left(LATENCY_BUCKETS, seconds)] += 1
+
+    def quantile(self, q: float) -> float:
+        """Upper bound of the bucket containing the q-quantile."""
+        if not self.calls:
+            return 0.0
+        rank = q * self.calls
+        seen = 0
+        for i, count in enumerate(self.buckets):
+            seen += count
+            if seen >= rank:
+                return LATENCY_BUCKETS[i] if i < len(LATENCY_BUCKETS) else self.max_seconds
+        return self.max_seconds
+
+
+class Instrumentation:
+    """Collects per-tool statistics and optionally exports them."""
+
+    def __init__(self, export_path: Optional[str] = None, export_interval: float = DEFAULT_EXPORT_INTERVAL):
+        """Initialize the collector.
+
+        Args:
+            export_path: Prometheus text file written periodically (optional)
+            export_interval: Seconds between writes of the text file
+        """
+        self.tools: Dict[str, ToolStats] = {}
+        self.export_path = Path(export_path) if export_path else None
+        self.export_interval = export_interval
+        self.started = time.time()
+        self._exporter: Optional[asyncio.Task] = None
+
+    def _stats(self, tool: str) -> ToolStats:
+        stats = self.tools.get(tool)
+        if stats is None:
+            stats = self.tools[tool] = ToolStats()
+        return stats
+
+    def instrument(self, func: Callable) -> Callable:
+        """Wrap an async tool function with timing instrumentation."""
+        name = func.__name__
+
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            self.ensure_exporter()
+            token = current_tool.set(name)
+            started = time.perf_counter()
+            error = True
+            try:
+                result = await func(*args, **kwargs)
+                error = isinstance(result, str) and result.startswith(ERROR_PREFIXES)
+                return result
+            finally:
+                self._stats(name).observe(time.perf_counter() - started, error)
+                current_tool.reset(token)
+
+        return wrapper
+
+    def record_spawn(self) -> None:
+        """Charge a subprocess spawn to the current tool."""
+        tool = current_tool.get()
+        if tool is not None:
+            self._stats(tool).spawns += 1
+
+    def record_output(self, nbytes: int) -> None:
+        """Charge bytes of subprocess output to the current tool."""
+        tool = current_tool.get()
+        if tool is not None:
+            self._stats(tool).output_bytes += nbytes
+
+    def reset(self) -> None:
+        """Clear all statistics."""
+        self.tools.clear()
+        self.started = time.time()
+
+    def summary(self) -> List[Tuple[str, ToolStats]]:
+        """Statistics per tool, busiest first."""
+        return sorted(self.tools.items(), key=lambda item: item[1].total_seconds, reverse=True)
+
+    def render_prometheus(self) -> str:
+        """Render all statistics in the Prometheus text exposition format."""
+        lines = [
+            "# HELP overmind_mcp_tool_calls_total Tool invocations.",
+            "# TYPE overmind_mcp_tool_calls_total counter",
+        ]
+        lines += [f'overmind_mcp_tool_calls_total{{tool="{t}"}} {s.calls}' for t, s in self.tools.items()]
+        lines += [
+            "# HELP overmind_mcp_tool_errors_total Tool invocations that failed.",
+            "# TYPE overmind_mcp_tool_errors_total counter",
+        ]
+        lines += [f'overmind_mcp_tool_errors_total{{tool="{t}"}} {s.errors}' for t, s in self.tools.items()]
+        lines += [
+            "# HELP overmind_mcp_tool_duration_seconds Tool latency.",
+            "# TYPE overmind_mcp_tool_duration_seconds histogram",
+        ]
+        for tool, stats in self.tools.items():
+            cumulative = 0
+            for bound, count in zip(LATENCY_BUCKETS + (float("inf"),), stats.buckets):
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else repr(bound)
+                lines.append(f'overmind_mcp_tool_duration_seconds_bucket{{tool="{tool}",le="{le}"}} {cumulative}')
+            lines.append(f'overmind_mcp_tool_duration_seconds_sum{{tool="{tool}"}} {stats.total_seconds}')
+            lines.append(f'overmind_mcp_tool_duration_seconds_count{{tool="{tool}"}} {stats.calls}')
+        lines += [
+            "# HELP overmind_mcp_subprocess_spawns_total Subprocesses spawned by tools.",
+            "# TYPE overmind_mcp_subprocess_spawns_total counter",
+        ]
+        lines += [f'overmind_mcp_subprocess_spawns_total{{tool="{t}"}} {s.spawns}' for t, s in self.tools.items()]
+        lines += [
+            "# HELP overmind_mcp_subprocess_output_bytes_total Bytes printed by subprocesses spawned by tools.",
+            "# TYPE overmind_mcp_subprocess_output_bytes_total counter",
+        ]
+        lines += [
+            f'overmind_mcp_subprocess_output_bytes_total{{tool="{t}"}} {s.output_bytes}'
+            for t, s in self.tools.items()
+        ]
+        return "\n".join(lines) + "\n"
+
+    def write_prometheus(self) -> None:
+        """Atomically write the Prometheus text file."""
+        if self.export_path is None:
+            return
+        temp_path = self.export_path.with_name(self.export_path.name + ".tmp")
+        temp_path.write_text(self.render_prometheus())
+        os.replace(temp_path, self.export_path)
+
+    def ensure_exporter(self) -> None:
+        """Start the periodic text file writer if configured and not running."""
+        if self.export_path is None or (self._exporter is not None and not self._exporter.done()):
+            return
+        # Create the task in an empty context so it isn't charged to the calling tool
+        self._exporter = contextvars.Context().run(asyncio.ensure_future, self._export_loop())
+
+    async def _export_loop(self) -> None:
+        while True:
+            try:
+                self.write_prometheus()
+            except OSError:
+                pass
+            await asyncio.sleep(self.export_interval)
+
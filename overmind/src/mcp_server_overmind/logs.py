@@ -0,0 +1,283 @@
+"""Capture and buffer output from the Overmind master process.
+
+``overmind start`` multiplexes the output of every Procfile process onto its
+own stdout, prefixing each line with the padded process name and a pipe, e.g.
+``web     | Listening on 8000``. The capture drains those pipes continuously so
+Overmind never blocks on a full pipe, and keeps the most recent lines of each
+process in fixed-size ring buffers.
+"""
+
+import asyncio
+import heapq
+import re
+import time
+from collections import deque
+from typing import Callable, Deque, Dict, List, NamedTuple, Optional
+
+# Matches ANSI color and cursor control sequences
+ANSI_ESCAPE = re.compile(r"\x1b\[[0-9;?]*[ -/]*[@-~]")
+
+# Matches the "name | text" prefix Overmind adds to each line
+LINE_PREFIX = re.compile(r"^(?P<name>[\w.#-]+)\s*\| ?(?P<text>.*)$")
+
+# Process name used for lines that carry no process prefix
+MASTER_PROCESS = "overmind"
+
+# Default number of lines kept per process
+DEFAULT_BUFFER_LINES = 1000
+
+# Maximum number of distinct processes tracked before lines are folded
+# into the master buffer
+MAX_PROCESSES = 256
+
+# Lines longer than this many characters are truncated
+MAX_LINE_LENGTH = 4096
+
+# Size of each read from the master's pipes
+READ_CHUNK_SIZE = 65536
+
+# Number of raw lines kept per stream for startup diagnostics
+RECENT_RAW_LINES = 50
+
+
+class LogLine(NamedTuple):
+    """A single captured output line."""
+
+    seq: int
+    timestamp: float
+    process: str
+    text: str
+
+
+def parse_line(raw: str) -> tuple:
+    """Split a raw Overmind output line into ``(process, text)``."""
+    line = ANSI_ESCAPE.sub("", raw).rstrip("\r\n")
+    match = LINE_PREFIX.match(line)
+    if match:
+        return match.group("name"), match.group("text")
+    return MASTER_PROCESS, line
+
+
+def process_matches(name: str, process: str) -> bool:
+    """Check whether a line from ``name`` belongs to ``process``.
+
+    A base process name also matches its scaled instances, so ``worker``
+    matches ``worker#2``.
+    """
+    return name == process or name.split("#", 1)[0] == process
+
+
+class LogBuffer:
+    """Fixed-size ring buffers of recent output, one per process."""
+
+    def __init__(self, max_lines: int = DEFAULT_BUFFER_LINES, max_processes: int = MAX_PROCESSES):
+        """Initialize the buffer.
+
+        Args:
+            max_lines: Number of lines kept per process
+            max_processes: Number of distinct processes tracked
+        """
+        self.max_lines = max_lines
+        self.max_processes = max_processes
+        self._buffers: Dict[str, Deque[LogLine]] = {}
+        self._seq = 0
+
+    @property
+    def last_seq(self) -> int:
+        """Sequence number of the most recently appended line."""
+        return self._seq
+
+    def append(self, process: str, text: str, timestamp: Optional[float] = None) -> LogLine:
+        """Append a line of output for a process."""
+        if process not in self._buffers and len(self._buffers) >= self.max_processes:
+            process = MASTER_PROCESS
+        buffer = self._buffers.get(process)
+        if buffer is None:
+            buffer = self._buffers[process] = deque(maxlen=self.max_lines)
+
+        self._seq += 1
+        line = LogLine(self._seq, timestamp if timestamp is not None else time.time(), process, text)
+        buffer.append(line)
+        return line
+
+    def feed(self, raw: str, timestamp: Optional[float] = None) -> LogLine:
+        """Parse a raw Overmind output line and append it."""
+        process, text = parse_line(raw)
+        return self.append(process, text, timestamp)
+
+    def processes(self) -> List[str]:
+        """Names of all processes with captured output."""
+        return sorted(self._buffers)
+
+    def tail(
+        self,
+        process: Optional[str] = None,
+        lines: int = 50,
+        since: Optional[float] = None,
+        after_seq: int = 0
+    ) -> List[LogLine]:
+        """Return the most recent lines in the order they were captured.
+
+        Args:
+            process: Only include lines from this process (optional)
+            lines: Maximum number of lines to return
+            since: Only include lines from the last N seconds (optional)
+            after_seq: Only include lines with a greater sequence number
+        """
+        buffers = [
+            buffer for name, buffer in self._buffers.items()
+            if process is None or process_matches(name, process)
+        ]
+        cutoff = time.time() - since if since is not None else None
+
+        selected = []
+        for line in heapq.merge(*buffers):
+            if line.seq <= after_seq:
+                continue
+            if cutoff is not None and line.timestamp < cutoff:
+                continue
+            selected.append(line)
+        return selected[-lines:] if lines > 0 else []
+
+    def clear(self) -> None:
+        """Drop all captured output."""
+        self._buffers.clear()
+
+
+class LogCapture:
+    """Drains the stdout/stderr pipes of an ``overmind start`` process."""
+
+    def __init__(self, buffer: LogBuffer):
+        """Initialize the capture.
+
+        Args:
+            buffer: Buffer receiving the parsed lines
+        """
+        self.buffer = buffer
+        self.listeners: List[Callable[[LogLine], None]] = []
+        self.recent: Dict[str, Deque[str]] = {
+            "stdout": deque(maxlen=RECENT_RAW_LINES),
+            "stderr": deque(maxlen=RECENT_RAW_LINES),
+        }
+        self._tasks: List[asyncio.Task] = []
+        # Exceptions raised by listeners, by listener name
+        self.listener_errors: Dict[str, int] = {}
+        self.last_listener_error: Optional[str] = None
+
+    def attach(self, process: asyncio.subprocess.Process) -> None:
+        """Start draining the pipes of a process in the background."""
+        for name in ("stdout", "stderr"):
+            stream = getattr(process, name)
+            if stream is not None:
+                self._tasks.append(asyncio.ensure_future(self._drain(stream, name)))
+
+    def add_listener(self, listener: Callable[[LogLine], None]) -> None:
+        """Register a callback invoked for every captured line."""
+        self.listeners.append(listener)
+
+    def _emit(self, raw: bytes, stream: str) -> None:
+        text = raw.decode("utf-8", errors="replace")[:MAX_LINE_LENGTH]
+        self.recent[stream].append(ANSI_ESCAPE.sub("", text).rstrip("\r"))
+        line = self.buffer.feed(text)
+        for listener in self.listeners:
+            try:
+                listener(line)
+            except Exception as e:
+                # Keep draining, so one broken listener can't stall Overmind,
+                # but record the failure so it can be reported
+                name = getattr(listener, "__qualname__", type(listener).__name__)
+                self.listener_errors[name] = self.listener_errors.get(name, 0) + 1
+                self.last_listener_error = f"{name}: {type(e).__name__}: {e}"
+
+    async def _drain(self, stream: asyncio.StreamReader, name: str) -> None:
+        pending = b""
+        discarding = False
+        while True:
+            chunk = await stream.read(READ_CHUNK_SIZE)
+            if not chunk:
+                break
+            pending += chunk
+            *complete, pending = pending.split(b"\n")
+            for raw in complete:
+                if discarding:
+                    # Tail end of an over-long line that was already emitted
+                    discarding = False
+                    continue
+                self._emit(raw, name)
+            if len(pending) > MAX_LINE_LENGTH:
+                if not discarding:
+                    self._emit(pending, name)
+                discarding = True
+                pending = b""
+        if pending and not discarding:
+            self._emit(pending, name)
+
+    def listener_warning(self) -> Optional[str]:
+        """Describe listener failures, or None if every listener succeeded."""
+        if not self.listener_errors:
+            return None
+        failures = ", ".join(f"{name} x{count}" for name, count in sorted(self.listener_errors.items()))
+        return f"Captured lines failed to reach {failures} (last error: {self.last_listener_error})"
+
+    def output(self, stream: str) -> str:
+        """Recent raw output of one stream, for error reporting."""
+        return "\n".join(self.recent[stream]).strip()
+
+    async def wait(self) -> None:
+        """Wait until both pipes have reached end of file."""
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+
+    async def stop(self) -> None:
+        """Stop draining the pipes."""
+        for task in self._tasks:
+            task.cancel()
+        await self.wait()
+        self._tasks = []
+
+
+class BoundedOutput:
+    """Keeps the head and tail of a byte stream within a fixed budget.
+
+    The first half of the budget holds the start of the output and the second
+    half a rolling window of the most recent bytes; everything in between is
+    counted but dropped.
+    """
+
+    def __init__(self, max_bytes: int):
+        """Initialize the buffer.
+
+        Args:
+            max_bytes: Maximum number of bytes retained
+        """
+        self.head_limit = max_bytes // 2
+        self.tail_limit = max_bytes - self.head_limit
+        self.head = bytearray()
+        self.tail = bytearray()
+        self.total = 0
+
+    @property
+    def truncated(self) -> bool:
+        """Whether any output was dropped."""
+        return self.total > len(self.head) + len(self.tail)
+
+    def write(self, data: bytes) -> None:
+        """Append a chunk of output."""
+        self.total += len(data)
+        room = self.head_limit - len(self.head)
+        if room > 0:
+            self.head += data[:room]
+            data = data[room:]
+        if data:
+            self.tail += data
+            if len(self.tail) > self.tail_limit:
+                del self.tail[:len(self.tail) - self.tail_limit]
+
+    def getvalue(self) -> str:
+        """Decoded output with a marker where bytes were dropped."""
+        head = self.head.decode("utf-8", errors="replace")
+        tail = self.tail.decode("utf-8", errors="replace")
+        if self.truncated:
+            dropped = self.total - len(self.head) - len(self.tail)
+            return f"{head}\n... [{dropped} bytes truncated] ...\n{tail}"
+        return head + tail
@@ -0,0 +1,270 @@
+"""Per-process resource sampling from ``/proc``.
+
+Overmind reports one PID per Procfile process, which is the shell running in
+its tmux pane. The sampler resolves the whole process tree below that PID,
+sums CPU time and resident memory from ``/proc/<pid>/stat`` and
+``/proc/<pid>/status``, and appends the result to a fixed-size ring per
+process. CPU usage is the change in CPU time of the PIDs seen in two
+consecutive samples, so nothing is recorded until a process has been seen
+twice.
+"""
+
+import asyncio
+import os
+import time
+from array import array
+from pathlib import Path
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+
+# Root of the proc filesystem
+PROC_ROOT = Path("/proc")
+
+# Seconds between samples
+DEFAULT_SAMPLE_INTERVAL = float(os.environ.get("OVERMIND_MCP_METRICS_INTERVAL", "5"))
+
+# Samples kept per process (one hour at the default interval)
+DEFAULT_SERIES_CAPACITY = 720
+
+
+def clock_ticks() -> int:
+    """Kernel clock ticks per second used by ``/proc/<pid>/stat``."""
+    try:
+        return os.sysconf("SC_CLK_TCK")
+    except (AttributeError, ValueError, OSError):
+        return 100
+
+
+def metrics_supported(proc_root: Path = PROC_ROOT) -> bool:
+    """Check whether ``/proc`` is available to sample from."""
+    return (proc_root / "self" / "stat").exists()
+
+
+def read_stat(pid: int, proc_root: Path = PROC_ROOT) -> Optional[Tuple[int, int]]:
+    """Read the parent PID and total CPU ticks of a process.
+
+    Returns:
+        ``(ppid, utime + stime)``, or None if the process is gone.
+    """
+    try:
+        data = (proc_root / str(pid) / "stat").read_text()
+    except OSError:
+        return None
+    # The command name may contain spaces and parentheses, so split after it
+    fields = data[data.rfind(")") + 2:].split()
+    try:
+        return int(fields[1]), int(fields[11]) + int(fields[12])
+    except (IndexError, ValueError):
+        return None
+
+
+def read_rss(pid: int, proc_root: Path = PROC_ROOT) -> int:
+    """Read the resident set size of a process in bytes."""
+    try:
+        with open(proc_root / str(pid) / "status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) * 1024
+    except (OSError, ValueError, IndexError):
+        pass
+    return 0
+
+
+def process_tree(roots: Dict[str, int], proc_root: Path = PROC_ROOT) -> Dict[str, List[int]]:
+    """Resolve every root PID to itself plus all of its descendants.
+
+    Args:
+        roots: Process name to root PID
+        proc_root: Root of the proc filesystem
+
+    Returns:
+        Process name to the list of PIDs in its tree.
+    """
+    children: Dict[int, List[int]] = {}
+    try:
+        entries = os.listdir(proc_root)
+    except OSError:
+        entries = []
+    for entry in entries:
+        if not entry.isdigit():
+            continue
+        stat = read_stat(int(entry), proc_root)
+        if stat is not None:
+            children.setdefault(stat[0], []).append(int(entry))
+
+    trees = {}
+    for name, root in roots.items():
+        pids = [root]
+        for pid in pids:
+            pids.extend(children.get(pid, ()))
+        trees[name] = pids
+    return trees
+
+
+class MetricSeries:
+    """Fixed-size ring of ``(timestamp, cpu_percent, rss_bytes)`` samples."""
+
+    def __init__(self, capacity: int = DEFAULT_SERIES_CAPACITY):
+        """Initialize the ring.
+
+        Args:
+            capacity: Number of samples kept
+        """
+        self.capacity = capacity
+        self._timestamps = array("d", [0.0]) * capacity
+        self._cpu = array("d", [0.0]) * capacity
+        self._rss = array("d", [0.0]) * capacity
+        self._next = 0
+        self.count = 0
+
+    def append(self, timestamp: float, cpu_percent: float, rss_bytes: float) -> None:
+        """Record a sample, overwriting the oldest one when full."""
+        i = self._next
+        self._timestamps[i] = timestamp
+        self._cpu[i] = cpu_percent
+        self._rss[i] = rss_bytes
+        self._next = (i + 1) % self.capacity
+        self.count = min(self.count + 1, self.capacity)
+
+    def latest(self) -> Optional[Tuple[float, float, float]]:
+        """The most recent sample, if any."""
+        if not self.count:
+            return None
+        i = (self._next - 1) % self.capacity
+        return self._timestamps[i], self._cpu[i], self._rss[i]
+
+    def window(self, seconds: float, now: Optional[float] = None) -> List[Tuple[float, float, float]]:
+        """Samples from the last ``seconds`` seconds, oldest first."""
+        cutoff = (now if now is not None else time.time()) - seconds
+        samples = []
+        for offset in range(self.count, 0, -1):
+            i = (self._next - offset) % self.capacity
+            if self._timestamps[i] >= cutoff:
+                samples.append((self._timestamps[i], self._cpu[i], self._rss[i]))
+        return samples
+
+    def summary(self, seconds: float, now: Optional[float] = None) -> Optional[Dict[str, float]]:
+        """Min/avg/max of CPU and memory over a window."""
+        samples = self.window(seconds, now)
+        if not samples:
+            return None
+        cpu = [s[1] for s in samples]
+        rss = [s[2] for s in samples]
+        return {
+            "samples": len(samples),
+            "cpu_min": min(cpu),
+            "cpu_avg": sum(cpu) / len(cpu),
+            "cpu_max": max(cpu),
+            "rss_min": min(rss),
+            "rss_avg": sum(rss) / len(rss),
+            "rss_max": max(rss),
+        }
+
+
+class MetricsSampler:
+    """Samples CPU and memory of each Procfile process on an interval."""
+
+    def __init__(
+        self,
+        get_pids: Callable[[], Awaitable[Dict[str, int]]],
+        interval: float = DEFAULT_SAMPLE_INTERVAL,
+        capacity: int = DEFAULT_SERIES_CAPACITY,
+        proc_root: Path = PROC_ROOT
+    ):
+        """Initialize the sampler.
+
+        Args:
+            get_pids: Coroutine returning process name to root PID; an empty
+                result stops the background loop
+            interval: Seconds between samples
+            capacity: Samples kept per process
+            proc_root: Root of the proc filesystem
+        """
+        self.get_pids = get_pids
+        self.interval = interval
+        self.capacity = capacity
+        self.proc_root = proc_root
+        self.series: Dict[str, MetricSeries] = {}
+        self.pids: Dict[str, List[int]] = {}
+        self._last: Dict[str, Tuple[float, Dict[int, int]]] = {}
+        self._ticks = clock_ticks()
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def running(self) -> bool:
+        """Whether the background loop is active."""
+        return self._task is not None and not self._task.done()
+
+    def _measure(self, roots: Dict[str, int]) -> Dict[str, Tuple[Dict[int, int], int]]:
+        measurements = {}
+        for name, pids in process_tree(roots, self.proc_root).items():
+            ticks: Dict[int, int] = {}
+            rss = 0
+            for pid in pids:
+                stat = read_stat(pid, self.proc_root)
+                if stat is None:
+                    continue
+                ticks[pid] = stat[1]
+                rss += read_rss(pid, self.proc_root)
+            measurements[name] = (ticks, rss)
+        return measurements
+
+    async def sample(self) -> bool:
+        """Take one sample of every process.
+
+        A process is only recorded once its CPU usage can be measured: it
+        needs a previous sample sharing at least one PID, so the first sample
+        and the first after a restart only serve as a baseline. A process with
+        no PIDs left is recorded as idle.
+
+        Returns:
+            False if there was nothing to sample.
+        """
+        roots = await self.get_pids()
+        if not roots:
+            return False
+
+        now = time.time()
+        measurements = await asyncio.to_thread(self._measure, roots)
+        for name, (ticks, rss) in measurements.items():
+            self.pids[name] = list(ticks)
+            previous = self._last.get(name)
+            self._last[name] = (now, ticks)
+            if not ticks:
+                cpu = 0.0
+            else:
+                shared = [pid for pid in ticks if previous is not None and pid in previous[1]]
+                if not shared or now <= previous[0]:
+                    continue
+                # PIDs that came or went between samples have no CPU delta
+                used = sum(max(0, ticks[pid] - previous[1][pid]) for pid in shared)
+                cpu = used / self._ticks / (now - previous[0]) * 100
+            series = self.series.get(name)
+            if series is None:
+                series = self.series[name] = MetricSeries(self.capacity)
+            series.append(now, cpu, rss)
+        return True
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            if not await self.sample():
+                break
+
+    def start(self) -> None:
+        """Start sampling in the background if not already running.
+
+        The first background sample is taken one interval from now, so callers
+        take their own initial samples.
+        """
+        if not self.running:
+            self._task = asyncio.ensure_future(self._run())
+
+    async def stop(self) -> None:
+        """Stop the background loop."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except (asyncio.CancelledError, Exception):
+                pass
+            self._task = None
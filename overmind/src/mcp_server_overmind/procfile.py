@@ -0,0 +1,264 @@
+"""Parsed Procfile model with a stat-keyed cache.
+
+Parsing a Procfile once and reusing the result lets every tool check process
+names and formations locally, so a typo is reported immediately instead of
+after a failed ``overmind start`` or a round trip to the control socket. The
+cache is keyed by the Procfile's and ``.overmind.env``'s mtime and size, so
+edits are picked up on the next call.
+"""
+
+import fnmatch
+import os
+import re
+import threading
+from pathlib import Path
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+from .health import PROBE_COMMENT, Probe, ProbeError, parse_probe
+
+# Matches a "name: command" process declaration
+ENTRY_LINE = re.compile(r"^(?P<name>[\w-]+):\s*(?P<command>.*)$")
+
+# Matches $NAME and ${NAME} environment variable references
+ENV_REFERENCE = re.compile(r"\$(?:\{(?P<braced>[A-Za-z_]\w*)[^}]*\}|(?P<plain>[A-Za-z_]\w*))")
+
+# File Overmind reads its own options, including the default formation, from
+OVERMIND_ENV_FILE = ".overmind.env"
+
+# Option setting the base port Overmind uses when started without -p
+PORT_OPTION = "OVERMIND_PORT"
+
+# Formation entry applying to every process
+FORMATION_ALL = "all"
+
+
+class ProcfileEntry(NamedTuple):
+    """One process declared in a Procfile."""
+
+    name: str
+    command: str
+    line: int
+    env_refs: Tuple[str, ...]
+
+
+class Procfile(NamedTuple):
+    """A parsed Procfile."""
+
+    path: Path
+    entries: Tuple[ProcfileEntry, ...]
+    formation: Dict[str, int]
+    probes: Tuple[Probe, ...]
+    warnings: Tuple[str, ...]
+    port: Optional[int] = None
+
+    @property
+    def names(self) -> List[str]:
+        """Declared process names in file order."""
+        return [entry.name for entry in self.entries]
+
+    def get(self, name: str) -> Optional[ProcfileEntry]:
+        """The entry declaring a process, if any."""
+        for entry in self.entries:
+            if entry.name == name:
+                return entry
+        return None
+
+    def unknown_processes(self, names: List[str]) -> List[str]:
+        """Names that match no declared process.
+
+        Scaled instances such as ``web#2`` are checked by their base name and
+        shell-style wildcards must match at least one process.
+        """
+        declared = set(self.names)
+        unknown = []
+        for name in names:
+            base = name.split("#", 1)[0]
+            if any(c in base for c in "*?["):
+                if not fnmatch.filter(declared, base):
+                    unknown.append(name)
+            elif base not in declared:
+                unknown.append(name)
+        return unknown
+
+    def check_processes(self, names: List[str]) -> Optional[str]:
+        """Describe unknown process names, or None if all are declared."""
+        unknown = self.unknown_processes(names)
+        if not unknown:
+            return None
+        return (
+            f"Unknown process(es) {', '.join(unknown)}; "
+            f"{self.path} declares: {', '.join(self.names)}"
+        )
+
+    def check_formation(self, formation: str) -> Optional[str]:
+        """Describe problems in a formation such as ``web=2,worker=0``, or None."""
+        try:
+            counts = parse_formation(formation)
+        except ValueError as e:
+            return str(e)
+        unknown = self.unknown_processes([name for name in counts if name != FORMATION_ALL])
+        if unknown:
+            return (
+                f"Formation names unknown process(es) {', '.join(unknown)}; "
+                f"{self.path} declares: {', '.join(self.names)}"
+            )
+        return None
+
+
+def parse_formation(formation: str) -> Dict[str, int]:
+    """Parse an Overmind formation such as ``web=2,worker=0``.
+
+    Raises:
+        ValueError: If an entry is malformed or its count is not a non-negative integer
+    """
+    counts = {}
+    for item in formation.split(","):
+        item = item.strip()
+        if not item:
+            continue
+        name, sep, count = item.partition("=")
+        name, count = name.strip(), count.strip()
+        if not sep or not name:
+            raise ValueError(f"Invalid formation entry {item!r}; expected name=count")
+        if not count.isdigit():
+            raise ValueError(f"Invalid count for {name} in formation: {count!r}")
+        counts[name] = int(count)
+    return counts
+
+
+def read_env_file(path: Path) -> Dict[str, str]:
+    """Read ``KEY=value`` lines from a dotenv-style file."""
+    try:
+        lines = path.read_text().splitlines()
+    except OSError:
+        return {}
+    values = {}
+    for line in lines:
+        line = line.strip()
+        if line.startswith("export "):
+            line = line[len("export "):]
+        key, sep, value = line.partition("=")
+        if sep and key and not key.startswith("#"):
+            values[key.strip()] = value.strip().strip("'\"")
+    return values
+
+
+def parse_procfile(text: str, path: Path, env: Optional[Dict[str, str]] = None) -> Procfile:
+    """Parse Procfile text into a model.
+
+    Args:
+        text: Contents of the Procfile
+        path: Location of the Procfile, used in messages
+        env: Overmind options from ``.overmind.env`` (optional)
+    """
+    entries: List[ProcfileEntry] = []
+    probes: List[Probe] = []
+    warnings: List[str] = []
+    seen = set()
+    for number, raw in enumerate(text.splitlines(), 1):
+        line = raw.strip()
+        if not line:
+            continue
+        if line.startswith("#"):
+            match = PROBE_COMMENT.match(line)
+            if match:
+                try:
+                    probes.append(parse_probe(match.group("process"), match.group("spec")))
+                except ProbeError as e:
+                    warnings.append(f"line {number}: {e}")
+            continue
+        match = ENTRY_LINE.match(line)
+        if match is None:
+            warnings.append(f"line {number}: not a 'name: command' declaration")
+            continue
+        name, command = match.group("name"), match.group("command").strip()
+        if not command:
+            warnings.append(f"line {number}: process {name} has no command")
+            continue
+        if name in seen:
+            warnings.append(f"line {number}: duplicate process {name}")
+            continue
+        seen.add(name)
+        refs = tuple(dict.fromkeys(
+            m.group("braced") or m.group("plain") for m in ENV_REFERENCE.finditer(command)
+        ))
+        entries.append(ProcfileEntry(name, command, number, refs))
+
+    formation = {entry.name: 1 for entry in entries}
+    default_formation = (env or {}).get("OVERMIND_FORMATION")
+    if default_formation:
+        try:
+            counts = parse_formation(default_formation)
+        except ValueError as e:
+            warnings.append(f"{OVERMIND_ENV_FILE}: {e}")
+        else:
+            if FORMATION_ALL in counts:
+                formation = {name: counts[FORMATION_ALL] for name in formation}
+            for name, count in counts.items():
+                if name in formation:
+                    formation[name] = count
+                elif name != FORMATION_ALL:
+                    warnings.append(f"{OVERMIND_ENV_FILE}: formation names unknown process {name}")
+
+    port = None
+    port_value = (env or {}).get(PORT_OPTION)
+    if port_value:
+        if port_value.isdigit() and 0 < int(port_value) < 65536:
+            port = int(port_value)
+        else:
+            warnings.append(f"{OVERMIND_ENV_FILE}: invalid {PORT_OPTION} {port_value!r}")
+
+    for probe in probes:
+        if probe.process.split("#", 1)[0] not in seen:
+            warnings.append(f"health probe for unknown process {probe.process}")
+
+    return Procfile(path, tuple(entries), formation, tuple(probes), tuple(warnings), port)
+
+
+def _stat_key(path: Path) -> Optional[Tuple[int, int]]:
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return st.st_mtime_ns, st.st_size
+
+
+class ProcfileCache:
+    """Thread-safe cache of parsed Procfiles keyed by mtime and size."""
+
+    def __init__(self):
+        """Initialize an empty cache."""
+        self._entries: Dict[Path, Tuple[tuple, Procfile]] = {}
+        self._lock = threading.Lock()
+        # Number of times a Procfile was actually parsed, for diagnostics
+        self.parsed = 0
+
+    def load(self, path: Path) -> Optional[Procfile]:
+        """Return the parsed Procfile at path, or None if it can't be read."""
+        path = Path(path).resolve()
+        env_path = path.parent / OVERMIND_ENV_FILE
+        key = (_stat_key(path), _stat_key(env_path))
+        if key[0] is None:
+            with self._lock:
+                self._entries.pop(path, None)
+            return None
+
+        with self._lock:
+            cached = self._entries.get(path)
+        if cached is not None and cached[0] == key:
+            return cached[1]
+
+        try:
+            text = path.read_text()
+        except (OSError, UnicodeDecodeError):
+            return None
+        model = parse_procfile(text, path, read_env_file(env_path))
+        with self._lock:
+            self._entries[path] = (key, model)
+            self.parsed += 1
+        return model
+
+    def clear(self) -> None:
+        """Drop all cached models."""
+        with self._lock:
+            self._entries.clear()
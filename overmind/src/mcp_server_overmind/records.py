@@ -0,0 +1,236 @@
+"""Indexed store of structured log records parsed from captured output.
+
+Procfile processes commonly log lines such as::
+
+    [LOGGER] 2024-05-01 12:00:00 [ERROR] database: Query failed
+
+Captured lines matching that shape are parsed into records and appended to
+a bounded store with secondary indexes by level, process and time bucket, so
+queries like "ERROR lines from worker in the last 10 minutes" touch only the
+matching records instead of scanning all output.
+"""
+
+import bisect
+import heapq
+import re
+import time
+from datetime import datetime
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional
+
+from .logs import LogLine, process_matches
+
+# Matches "[TAG] <timestamp> [LEVEL] component: message"; the tag, timestamp
+# and component are optional
+STRUCTURED_LINE = re.compile(
+    r"^(?:\[(?P<tag>[^\]]+)\]\s+)?"
+    r"(?:(?P<logged>\d{4}-\d{2}-\d{2}[ T]\d{2}:\d{2}:\d{2}(?:[.,]\d+)?)\s+)?"
+    r"\[(?P<level>(?i:trace|debug|info|notice|warn|warning|error|err|critical|fatal))\]\s+"
+    r"(?:(?P<component>[\w./-]+):\s)?"
+    r"(?P<message>.*)$"
+)
+
+# Level names folded onto their canonical spelling
+LEVEL_ALIASES = {"WARNING": "WARN", "ERR": "ERROR", "CRITICAL": "FATAL", "TRACE": "DEBUG"}
+
+# Default number of records kept
+DEFAULT_MAX_RECORDS = 100000
+
+# Width of the time index buckets, in seconds
+TIME_BUCKET_SECONDS = 60
+
+
+class LogRecord(NamedTuple):
+    """A structured log line."""
+
+    seq: int
+    timestamp: float
+    process: str
+    level: str
+    component: Optional[str]
+    message: str
+    logged_at: Optional[float]
+
+
+def normalize_level(level: str) -> str:
+    """Canonical upper-case spelling of a level name."""
+    level = level.upper()
+    return LEVEL_ALIASES.get(level, level)
+
+
+def parse_record(line: LogLine) -> Optional[LogRecord]:
+    """Parse a captured line into a record, or None if it isn't structured."""
+    match = STRUCTURED_LINE.match(line.text)
+    if match is None:
+        return None
+    logged_at = None
+    if match.group("logged"):
+        try:
+            logged_at = datetime.fromisoformat(match.group("logged").replace(",", ".")).timestamp()
+        except ValueError:
+            pass
+    return LogRecord(
+        line.seq,
+        line.timestamp,
+        line.process,
+        normalize_level(match.group("level")),
+        match.group("component"),
+        match.group("message"),
+        logged_at,
+    )
+
+
+class RecordStore:
+    """Append-only, bounded store of log records with secondary indexes.
+
+    Records are addressed by their position since the store was created.
+    The level and process indexes map each key to the ascending positions of
+    its records, and the time index maps capture-time buckets to the first
+    position in each bucket. When the store is full the oldest quarter is
+    dropped at once, keeping eviction amortized.
+    """
+
+    def __init__(self, max_records: int = DEFAULT_MAX_RECORDS, bucket_seconds: int = TIME_BUCKET_SECONDS):
+        """Initialize the store.
+
+        Args:
+            max_records: Number of records kept
+            bucket_seconds: Width of the time index buckets
+        """
+        self.max_records = max_records
+        self.bucket_seconds = bucket_seconds
+        self._records: List[LogRecord] = []
+        self._offset = 0
+        self._by_level: Dict[str, List[int]] = {}
+        self._by_process: Dict[str, List[int]] = {}
+        self._bucket_keys: List[int] = []
+        self._bucket_starts: List[int] = []
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+    def add(self, record: LogRecord) -> None:
+        """Append a record."""
+        if len(self._records) >= self.max_records:
+            self._evict(max(1, self.max_records // 4))
+        position = self._offset + len(self._records)
+        self._records.append(record)
+        self._by_level.setdefault(record.level, []).append(position)
+        self._by_process.setdefault(record.process, []).append(position)
+        # Capture times only move forward, so buckets are appended in order
+        bucket = int(record.timestamp // self.bucket_seconds)
+        if not self._bucket_keys or bucket > self._bucket_keys[-1]:
+            self._bucket_keys.append(bucket)
+            self._bucket_starts.append(position)
+
+    def add_line(self, line: LogLine) -> None:
+        """Parse a captured line and append it if it is structured."""
+        record = parse_record(line)
+        if record is not None:
+            self.add(record)
+
+    def _evict(self, count: int) -> None:
+        del self._records[:count]
+        self._offset += count
+        for index in (self._by_level, self._by_process):
+            for key in list(index):
+                positions = index[key]
+                del positions[:bisect.bisect_left(positions, self._offset)]
+                if not positions:
+                    del index[key]
+        keep = bisect.bisect_right(self._bucket_starts, self._offset) - 1
+        if keep > 0:
+            del self._bucket_keys[:keep]
+            del self._bucket_starts[:keep]
+
+    def _first_position_since(self, cutoff: float) -> int:
+        """Lowest position that may hold a record captured at or after cutoff."""
+        i = bisect.bisect_left(self._bucket_keys, int(cutoff // self.bucket_seconds))
+        if i >= len(self._bucket_starts):
+            return self._offset + len(self._records)
+        return max(self._bucket_starts[i], self._offset)
+
+    def levels(self) -> Dict[str, int]:
+        """Number of records per level."""
+        return {level: len(positions) for level, positions in sorted(self._by_level.items())}
+
+    def processes(self) -> List[str]:
+        """Names of all processes with records."""
+        return sorted(self._by_process)
+
+    def query(
+        self,
+        process: Optional[str] = None,
+        levels: Optional[Iterable[str]] = None,
+        component: Optional[str] = None,
+        since: Optional[float] = None,
+        contains: Optional[str] = None,
+        limit: int = 100
+    ) -> List[LogRecord]:
+        """Return the most recent matching records, oldest first.
+
+        Args:
+            process: Only records from this process or its scaled instances (optional)
+            levels: Only records with one of these levels (optional)
+            component: Only records from this component (optional)
+            since: Only records captured in the last N seconds (optional)
+            contains: Only records whose message contains this text (optional)
+            limit: Maximum number of records returned
+        """
+        if limit <= 0:
+            return []
+
+        candidates: List[List[int]] = []
+        if levels is not None:
+            wanted_levels = {normalize_level(level) for level in levels}
+            candidates.append(self._merge(self._by_level.get(level, []) for level in wanted_levels))
+        if process is not None:
+            candidates.append(self._merge(
+                positions for name, positions in self._by_process.items()
+                if process_matches(name, process)
+            ))
+        cutoff = time.time() - since if since is not None else None
+        start = self._first_position_since(cutoff) if cutoff is not None else self._offset
+
+        if candidates:
+            # Walk the most selective index; the others are checked per record
+            positions = min(candidates, key=len)
+            first = bisect.bisect_left(positions, start)
+            ordered: Iterator[int] = (positions[i] for i in range(len(positions) - 1, first - 1, -1))
+        else:
+            end = self._offset + len(self._records)
+            ordered = iter(range(end - 1, start - 1, -1))
+
+        selected = []
+        for position in ordered:
+            record = self._records[position - self._offset]
+            if cutoff is not None and record.timestamp < cutoff:
+                break
+            if levels is not None and record.level not in wanted_levels:
+                continue
+            if process is not None and not process_matches(record.process, process):
+                continue
+            if component is not None and record.component != component:
+                continue
+            if contains is not None and contains not in record.message:
+                continue
+            selected.append(record)
+            if len(selected) >= limit:
+                break
+        selected.reverse()
+        return selected
+
+    @staticmethod
+    def _merge(lists: Iterable[List[int]]) -> List[int]:
+        lists = [positions for positions in lists if positions]
+        if len(lists) == 1:
+            return lists[0]
+        return list(heapq.merge(*lists))
+
+    def clear(self) -> None:
+        """Drop all records."""
+        self._offset += len(self._records)
+        self._records = []
+        self._by_level.clear()
+        self._by_process.clear()
+        self._bucket_keys = []
+        self._bucket_starts = []
@@ -1,17 +1,118 @@
 """MCP server for managing Overmind processes."""
 
 import asyncio
+import hashlib
 import json
 import os
+import signal
 import socket
+import stat
 import subprocess
+import time
+from collections import OrderedDict
+from datetime import datetime
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Union
-from mcp.server.fastmcp import FastMCP
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set, Tuple, Union
+from urllib.parse import quote, unquote
+from mcp.server.fastmcp import Context, FastMCP
+
+from .client import (
+    CONTROL_COMMANDS,
+    RESPONSE_COMMANDS,
+    OvermindClient,
+    OvermindProtocolError,
+    parse_status,
+)
+from .discovery import ProcfileIndex
+from .health import (
+    DEFAULT_PROBE_TIMEOUT,
+    PORT_PLACEHOLDER,
+    HealthChecker,
+    Probe,
+    ProbeError,
+    parse_probe,
+    run_probe,
+)
+from .history import STATE_DIR, LogHistory, history_enabled, read_segments
+from .instrumentation import ERROR_PREFIXES, Instrumentation
+from .logs import BoundedOutput, LogBuffer, LogCapture, READ_CHUNK_SIZE, process_matches
+from .metrics import MetricsSampler, metrics_supported
+from .procfile import PORT_OPTION, Procfile, ProcfileCache
+from .records import RecordStore
+from .watcher import OvermindWatcher
 
 # Initialize FastMCP server
 mcp = FastMCP("overmind")
 
+# Per-tool latency, error, spawn and output statistics
+stats = Instrumentation(os.environ.get("OVERMIND_MCP_PROMETHEUS_FILE"))
+
+# Default number of seconds overmind_start waits for the control socket
+DEFAULT_READY_TIMEOUT = 30.0
+
+# Seconds of silence after which overmind_echo stops collecting output
+ECHO_IDLE_TIMEOUT = 1.0
+
+# Seconds and bytes after which overmind_echo stops collecting output, since
+# a formation that keeps printing is never silent for ECHO_IDLE_TIMEOUT
+ECHO_MAX_TIME = 5.0
+ECHO_MAX_BYTES = 1024 * 1024
+
+# Seconds a status snapshot is reused before Overmind is asked again
+DEFAULT_STATUS_TTL = float(os.environ.get("OVERMIND_MCP_STATUS_TTL", "1.0"))
+
+# Seconds between the first two metric samples, so CPU usage is available
+# on the first overmind_metrics call
+METRICS_PRIME_DELAY = 0.5
+
+# Default wall-clock limit for overmind_run, in seconds
+DEFAULT_RUN_TIMEOUT = 300.0
+
+# Default number of output bytes kept per stream by overmind_run
+DEFAULT_MAX_OUTPUT_BYTES = 1024 * 1024
+
+# Seconds between SIGTERM and SIGKILL when stopping a timed out command
+KILL_GRACE_PERIOD = 2.0
+
+# Minimum seconds between progress notifications from overmind_run
+PROGRESS_INTERVAL = 0.25
+
+# Bounds for the adaptive readiness polling interval, in seconds
+READY_POLL_MIN_INTERVAL = 0.01
+READY_POLL_MAX_INTERVAL = 0.25
+
+# Default seconds each overmind_rolling_restart batch may take to become ready
+DEFAULT_BATCH_READY_TIMEOUT = 60.0
+
+# Number of status snapshots remembered per project for overmind_status cursors
+STATUS_CURSOR_HISTORY = 16
+
+# Maximum number of lines overmind_echo returns after a cursor
+ECHO_DELTA_LINES = 500
+
+# Default window in seconds searched by overmind_log_history
+DEFAULT_HISTORY_WINDOW = 3600.0
+
+# First port overmind_start_all hands out, matching Overmind's own default
+DEFAULT_PORT_BASE = 5000
+
+# Ports Overmind reserves per process (its default -P port step)
+PORT_STEP = 100
+
+# Highest usable port number
+MAX_PORT = 65535
+
+# Managers of projects that aren't running are dropped, least recently used
+# first, once there are more than this many
+MAX_IDLE_MANAGERS = 32
+
+# Seconds after which the manager of a project that isn't running is dropped
+MANAGER_IDLE_TIMEOUT = 3600.0
+
+# Managers used within this many seconds are never dropped, so a batch over
+# more projects than MAX_IDLE_MANAGERS doesn't discard its own managers
+MANAGER_MIN_IDLE = 60.0
+
 class OvermindManager:
     """Manager for Overmind processes and operations."""
     
@@ -25,10 +126,81 @@ class OvermindManager:
         self.working_dir = Path(working_dir) if working_dir else Path.cwd()
         self.procfile_path = Path(procfile_path) if procfile_path else self.working_dir / "Procfile"
         self.socket_path = self.working_dir / ".overmind.sock"
+        self.process: Optional[asyncio.subprocess.Process] = None
+        self.client = OvermindClient(self.socket_path)
+        self.logs = LogBuffer()
+        self.records = RecordStore()
+        self.capture: Optional[LogCapture] = None
+        # Identifies the Overmind run being captured, so overmind_echo cursors
+        # from an earlier run or server are never applied to this one
+        self.run_id: Optional[str] = None
+        # Serializes state-changing operations on this instance only
+        self.lock = asyncio.Lock()
+        self.status_ttl = DEFAULT_STATUS_TTL
+        self._status_cache: Optional[Tuple[float, Dict[str, Any]]] = None
+        self._status_fetch: Optional[asyncio.Task] = None
+        self._status_generation = 0
+        self.metrics = MetricsSampler(self.process_pids)
+        self.health = HealthChecker()
+        self.watcher: Optional[OvermindWatcher] = None
+        # Recent status snapshots by cursor, so overmind_status can send deltas
+        self.status_snapshots: "OrderedDict[str, Dict[str, Tuple[Optional[int], str]]]" = OrderedDict()
+        # First and last port of the range the running Overmind was started with
+        self.ports: Optional[Tuple[int, int]] = None
+        self.history: Optional[LogHistory] = None
+    
+    async def is_running(self) -> bool:
+        """Check if Overmind is running: its control socket accepts connections.
+        
+        A socket file nobody listens on, left behind by an Overmind that
+        died, is removed so it can't be mistaken for a running one.
+        """
+        if not self.socket_path.exists():
+            return False
+        if await self.socket_accepts():
+            return True
+        # An Overmind started here may not be listening yet
+        if self.process is None or self.process.returncode is not None:
+            self.remove_stale_socket()
+        return False
+    
+    def remove_stale_socket(self) -> bool:
+        """Remove the control socket if it refuses connections.
+        
+        Returns:
+            True if a stale socket was removed
+        """
+        try:
+            if not stat.S_ISSOCK(os.lstat(self.socket_path).st_mode):
+                return False
+            with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as probe:
+                probe.connect(str(self.socket_path))
+        except ConnectionRefusedError:
+            # Only a refusal proves nobody listens; other errors may be transient
+            try:
+                self.socket_path.unlink()
+            except OSError:
+                return False
+            return True
+        except OSError:
+            pass
+        return False
+    
+    def resolved_procfile_path(self) -> Path:
+        """The Procfile path, with a relative path taken from the working directory as Overmind does."""
+        if self.procfile_path.is_absolute():
+            return self.procfile_path
+        return self.working_dir / self.procfile_path
+    
+    def procfile(self) -> Optional[Procfile]:
+        """The parsed Procfile, or None if it can't be read."""
+        return procfile_cache.load(self.resolved_procfile_path())
     
-    def is_running(self) -> bool:
-        """Check if Overmind is currently running by checking for the socket file."""
-        return self.socket_path.exists()
+    def log_history(self) -> Optional[LogHistory]:
+        """The persistent output history, or None if it is disabled."""
+        if self.history is None and history_enabled():
+            self.history = LogHistory(self.working_dir / STATE_DIR / "logs")
+        return self.history
     
     async def run_command(self, command: List[str]) -> Dict[str, Any]:
         """Run an overmind command and return the result."""
@@ -40,8 +212,10 @@ class OvermindManager:
                 stdout=asyncio.subprocess.PIPE,
                 stderr=asyncio.subprocess.PIPE
             )
+            stats.record_spawn()
             
             stdout, stderr = await process.communicate()
+            stats.record_output(len(stdout or b"") + len(stderr or b""))
             
             return {
                 "success": process.returncode == 0,
@@ -57,8 +231,220 @@ class OvermindManager:
                 "return_code": -1
             }
 
-    async def start_overmind_background(self, command: List[str]) -> Dict[str, Any]:
-        """Start overmind in the background and return immediately."""
+    async def stream_command(
+        self,
+        command: List[str],
+        timeout: Optional[float] = DEFAULT_RUN_TIMEOUT,
+        max_output_bytes: int = DEFAULT_MAX_OUTPUT_BYTES,
+        on_output: Optional[Callable[[str, bytes], Awaitable[None]]] = None
+    ) -> Dict[str, Any]:
+        """Run a command, reading its output incrementally.
+        
+        Output is kept within max_output_bytes per stream (head and tail are
+        preserved). When the timeout expires or the caller is cancelled, the
+        command's whole process group is terminated.
+        
+        Args:
+            command: Command to execute
+            timeout: Wall-clock limit in seconds (optional, None waits forever)
+            max_output_bytes: Bytes of output retained per stream
+            on_output: Coroutine called with the stream name and each chunk
+        """
+        try:
+            process = await asyncio.create_subprocess_exec(
+                *command,
+                cwd=self.working_dir,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.PIPE,
+                start_new_session=True
+            )
+            stats.record_spawn()
+        except Exception as e:
+            return {
+                "success": False,
+                "stdout": "",
+                "stderr": f"Error executing command: {str(e)}",
+                "return_code": -1,
+                "timed_out": False,
+                "truncated": False
+            }
+        
+        outputs = {
+            "stdout": BoundedOutput(max_output_bytes),
+            "stderr": BoundedOutput(max_output_bytes),
+        }
+        
+        async def drain(name: str, stream: asyncio.StreamReader) -> None:
+            while True:
+                chunk = await stream.read(READ_CHUNK_SIZE)
+                if not chunk:
+                    break
+                outputs[name].write(chunk)
+                stats.record_output(len(chunk))
+                if on_output is not None:
+                    await on_output(name, chunk)
+        
+        readers = asyncio.gather(
+            drain("stdout", process.stdout),
+            drain("stderr", process.stderr)
+        )
+        
+        async def finish() -> None:
+            await asyncio.shield(readers)
+            await process.wait()
+        
+        timed_out = False
+        try:
+            # One deadline covers the output and the exit, so a command that
+            # closes its pipes and keeps running still times out
+            await asyncio.wait_for(finish(), timeout)
+        except asyncio.TimeoutError:
+            timed_out = True
+            await self._kill_process_group(process)
+            try:
+                await asyncio.wait_for(asyncio.shield(readers), KILL_GRACE_PERIOD)
+            except asyncio.TimeoutError:
+                # Something outside the process group still holds the pipes
+                readers.cancel()
+        except asyncio.CancelledError:
+            await self._kill_process_group(process)
+            readers.cancel()
+            raise
+        
+        stderr = outputs["stderr"].getvalue().strip()
+        if timed_out:
+            stderr = (stderr + "\n" if stderr else "") + f"Command timed out after {timeout} seconds"
+        return {
+            "success": process.returncode == 0 and not timed_out,
+            "stdout": outputs["stdout"].getvalue().strip(),
+            "stderr": stderr,
+            "return_code": process.returncode,
+            "timed_out": timed_out,
+            "truncated": outputs["stdout"].truncated or outputs["stderr"].truncated
+        }
+
+    @staticmethod
+    async def _kill_process_group(process: asyncio.subprocess.Process) -> None:
+        """Terminate a process group, escalating to SIGKILL after a grace period."""
+        for sig in (signal.SIGTERM, signal.SIGKILL):
+            try:
+                os.killpg(process.pid, sig)
+            except (ProcessLookupError, PermissionError):
+                return
+            try:
+                await asyncio.wait_for(process.wait(), KILL_GRACE_PERIOD)
+                return
+            except asyncio.TimeoutError:
+                continue
+
+    async def control(self, command: str, args: Optional[List[str]] = None) -> Dict[str, Any]:
+        """Run an overmind command over the control socket.
+
+        Falls back to spawning the overmind CLI when the socket cannot serve
+        the command, e.g. because the protocol is not supported.
+
+        Args:
+            command: Overmind command name (status, restart, stop, quit, kill, echo)
+            args: Command arguments, typically process names
+        """
+        args = [arg for arg in (args or []) if arg.strip()]
+        try:
+            if command in RESPONSE_COMMANDS:
+                if command == "echo":
+                    output = await self.client.request(
+                        command, args, idle_timeout=ECHO_IDLE_TIMEOUT,
+                        max_time=ECHO_MAX_TIME, max_bytes=ECHO_MAX_BYTES
+                    )
+                else:
+                    output = await self.client.request(command, args)
+                if command == "status" and not output.strip():
+                    raise OvermindProtocolError("Empty status response")
+            else:
+                await self.client.send(command, args)
+                output = ""
+        except OvermindProtocolError:
+            result = await self.run_command(["overmind", command] + args)
+        else:
+            result = {
+                "success": True,
+                "stdout": output.strip(),
+                "stderr": "",
+                "return_code": 0
+            }
+        
+        if command in CONTROL_COMMANDS:
+            self.invalidate_status()
+            self.health.invalidate()
+            self.health.reset(args, self.logs.last_seq)
+        return result
+
+    async def get_status(self, max_age: Optional[float] = None) -> Dict[str, Any]:
+        """Get a process status snapshot.
+        
+        Concurrent callers share a single in-flight fetch, and successful
+        snapshots are reused for ``status_ttl`` seconds.
+        
+        Args:
+            max_age: Oldest cached snapshot to accept in seconds (optional,
+                defaults to ``status_ttl``)
+        
+        Returns:
+            The command result with the parsed rows added under ``processes``.
+        """
+        max_age = self.status_ttl if max_age is None else max_age
+        loop = asyncio.get_running_loop()
+        
+        if self._status_cache is not None:
+            fetched_at, snapshot = self._status_cache
+            if loop.time() - fetched_at <= max_age:
+                return dict(snapshot)
+        
+        if self._status_fetch is None:
+            self._status_fetch = asyncio.ensure_future(self._fetch_status())
+        # Shield so one cancelled caller doesn't cancel the fetch for the others
+        return dict(await asyncio.shield(self._status_fetch))
+
+    async def _fetch_status(self) -> Dict[str, Any]:
+        generation = self._status_generation
+        try:
+            result = await self.control("status")
+            result["processes"] = parse_status(result["stdout"]) if result["success"] else []
+            if result["success"] and generation == self._status_generation:
+                self._status_cache = (asyncio.get_running_loop().time(), result)
+            return result
+        finally:
+            if self._status_fetch is asyncio.current_task():
+                self._status_fetch = None
+
+    async def process_pids(self) -> Dict[str, int]:
+        """Map each running process to the PID Overmind reports for it."""
+        if not await self.is_running():
+            return {}
+        status = await self.get_status()
+        return {
+            p["name"]: p["pid"] for p in status["processes"]
+            if p["pid"] and p["status"] == "running"
+        }
+
+    def invalidate_status(self) -> None:
+        """Drop the cached status so the next request fetches a fresh one."""
+        self._status_generation += 1
+        self._status_cache = None
+        self._status_fetch = None
+        if self.watcher is not None:
+            self.watcher.wake()
+
+    async def start_overmind_background(
+        self,
+        command: List[str],
+        ready_timeout: float = DEFAULT_READY_TIMEOUT
+    ) -> Dict[str, Any]:
+        """Start overmind in the background and return as soon as it is ready.
+
+        Args:
+            command: The overmind start command to execute
+            ready_timeout: Seconds to wait for the control socket to accept connections
+        """
         try:
             # Start the process but don't wait for it to complete
             process = await asyncio.create_subprocess_exec(
@@ -67,13 +453,26 @@ class OvermindManager:
                 stdout=asyncio.subprocess.PIPE,
                 stderr=asyncio.subprocess.PIPE
             )
+            stats.record_spawn()
+            self.process = process
+            self.invalidate_status()
+            self.health.invalidate()
             
-            # Give it a moment to start and check if it fails immediately
-            await asyncio.sleep(2)
+            # Drain the pipes continuously so chatty processes can't stall Overmind
+            if self.capture is not None:
+                await self.capture.stop()
+            self.logs.clear()
+            self.records.clear()
+            self.health.reset(after_seq=self.logs.last_seq)
+            self.capture = LogCapture(self.logs)
+            self.run_id = os.urandom(4).hex()
+            self.capture.add_listener(self.records.add_line)
+            history = self.log_history()
+            if history is not None:
+                self.capture.add_listener(history.append)
+            self.capture.attach(process)
             
-            # Check if the process is still running
-            if process.returncode is None:
-                # Process is still running, which is good for overmind start
+            if await self.wait_until_ready(process, ready_timeout):
                 return {
                     "success": True,
                     "stdout": f"Overmind started in background with PID {process.pid}",
@@ -81,34 +480,192 @@ class OvermindManager:
                     "return_code": 0,
                     "process": process
                 }
-            else:
-                # Process exited quickly, probably an error
-                stdout, stderr = await process.communicate()
+            
+            if process.returncode is None:
+                # Still alive but the socket never came up; leave it running so
+                # a slow start can still finish, but report it to the caller.
                 return {
                     "success": False,
-                    "stdout": stdout.decode('utf-8').strip() if stdout else "",
-                    "stderr": stderr.decode('utf-8').strip() if stderr else "",
-                    "return_code": process.returncode
+                    "stdout": "",
+                    "stderr": (
+                        f"Overmind (PID {process.pid}) did not become ready within "
+                        f"{ready_timeout} seconds"
+                    ),
+                    "return_code": -1
                 }
+            
+            # Process exited before becoming ready, probably an error
+            await self.capture.wait()
+            return {
+                "success": False,
+                "stdout": self.capture.output("stdout"),
+                "stderr": self.capture.output("stderr"),
+                "return_code": process.returncode
+            }
         except Exception as e:
             return {
                 "success": False,
                 "stdout": "",
                 "stderr": f"Error starting overmind: {str(e)}",
-                                 "return_code": -1
-             }
+                "return_code": -1
+            }
+
+    async def wait_until_ready(
+        self,
+        process: asyncio.subprocess.Process,
+        timeout: float = DEFAULT_READY_TIMEOUT
+    ) -> bool:
+        """Wait for the control socket to accept connections.
+
+        Polls with an exponentially growing interval so a fast start is noticed
+        within milliseconds, and returns early if the child process exits.
+
+        Args:
+            process: The running overmind start process
+            timeout: Maximum number of seconds to wait
+
+        Returns:
+            True once the socket accepts connections, False on timeout or exit.
+        """
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        delay = READY_POLL_MIN_INTERVAL
+        exited = asyncio.ensure_future(process.wait())
+        
+        try:
+            while True:
+                if exited.done():
+                    return False
+                if self.socket_path.exists() and await self.socket_accepts():
+                    return True
+                
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    return False
+                
+                await asyncio.wait({exited}, timeout=min(delay, remaining))
+                delay = min(delay * 2, READY_POLL_MAX_INTERVAL)
+        finally:
+            if not exited.done():
+                exited.cancel()
+
+    async def socket_accepts(self) -> bool:
+        """Check whether the control socket accepts connections."""
+        try:
+            _, writer = await asyncio.open_unix_connection(str(self.socket_path))
+        except OSError:
+            return False
+        
+        writer.close()
+        try:
+            await writer.wait_closed()
+        except OSError:
+            pass
+        return True
+
+class ManagerRegistry:
+    """Registry of OvermindManager instances keyed by resolved working directory."""
+    
+    def __init__(self):
+        """Initialize an empty registry."""
+        # Least recently used first
+        self._managers: "OrderedDict[Path, OvermindManager]" = OrderedDict()
+        self._used: Dict[Path, float] = {}
+        self.default_dir: Optional[Path] = None
+    
+    def get(self, working_dir: Optional[str] = None, procfile: Optional[str] = None) -> OvermindManager:
+        """Get the manager for a working directory, creating it if needed.
+        
+        Args:
+            working_dir: Working directory (optional, defaults to the directory of the
+                most recent overmind_start, or the current directory)
+            procfile: Path to the Procfile used when Overmind is next started (optional)
+        """
+        if working_dir:
+            key = Path(working_dir).resolve()
+        else:
+            key = self.default_dir or Path.cwd().resolve()
+        
+        manager = self._managers.get(key)
+        if manager is None:
+            manager = self._managers[key] = OvermindManager(procfile, str(key))
+            self.prune(exclude=key)
+        elif not manager.socket_path.exists() and (manager.process is None or manager.process.returncode is not None):
+            # Overmind is next started with -f only if a Procfile is given
+            # again, so checks must not keep using an earlier one
+            manager.procfile_path = Path(procfile) if procfile else manager.working_dir / "Procfile"
+        self._managers.move_to_end(key)
+        self._used[key] = time.monotonic()
+        return manager
+    
+    def managers(self) -> List[OvermindManager]:
+        """All registered managers."""
+        return list(self._managers.values())
+    
+    @staticmethod
+    def _idle(manager: OvermindManager) -> bool:
+        """Whether nothing is running or in progress in a manager's project."""
+        process = manager.process
+        return (
+            (process is None or process.returncode is not None)
+            and not manager.socket_path.exists()
+            and not manager.lock.locked()
+            and not (manager.watcher is not None and manager.watcher.active)
+            and not manager.metrics.running
+        )
+    
+    def prune(self, exclude: Optional[Path] = None, now: Optional[float] = None) -> int:
+        """Drop managers of idle projects beyond MAX_IDLE_MANAGERS or MANAGER_IDLE_TIMEOUT.
+        
+        Managers used within the last MANAGER_MIN_IDLE seconds are always kept.
+        
+        Args:
+            exclude: Directory whose manager is kept regardless (optional)
+            now: Current monotonic time (optional)
+        
+        Returns:
+            Number of managers dropped
+        """
+        now = time.monotonic() if now is None else now
+        idle = [
+            key for key, manager in self._managers.items()
+            if key != self.default_dir and self._idle(manager)
+        ]
+        excess = len(idle) - MAX_IDLE_MANAGERS
+        dropped = 0
+        for key in idle:
+            idle_for = now - self._used.get(key, now)
+            if key == exclude or idle_for < MANAGER_MIN_IDLE:
+                continue
+            if excess <= 0 and idle_for <= MANAGER_IDLE_TIMEOUT:
+                continue
+            manager = self._managers.pop(key)
+            self._used.pop(key, None)
+            if manager.history is not None:
+                manager.history.close()
+            excess -= 1
+            dropped += 1
+        return dropped
 
-# Global manager instance
-overmind_manager = OvermindManager()
+# Global registry of managers, one per project directory
+registry = ManagerRegistry()
+
+# Shared Procfile discovery index, reused across overmind_find_procfiles calls
+procfile_index = ProcfileIndex()
+
+# Parsed Procfiles shared by all tools, reparsed when a file changes
+procfile_cache = ProcfileCache()
 
 @mcp.tool()
+@stats.instrument
 async def overmind_start(
     procfile: Optional[str] = None,
     working_dir: Optional[str] = None,
     formation: Optional[str] = None,
     port: Optional[int] = None,
     timeout: Optional[int] = None,
-    auto_restart: bool = False
+    auto_restart: bool = False,
+    ready_timeout: float = DEFAULT_READY_TIMEOUT
 ) -> str:
     """Start Overmind with the specified Procfile.
     
@@ -119,27 +676,40 @@ async def overmind_start(
         port: Port number to start from
         timeout: Timeout for process startup in seconds
         auto_restart: Enable auto-restart of failed processes
+        ready_timeout: Seconds to wait for Overmind to accept connections
     """
-    global overmind_manager
-    
-    # Update manager if working directory or procfile specified
-    if working_dir or procfile:
-        overmind_manager = OvermindManager(procfile, working_dir)
+    overmind_manager = registry.get(working_dir, procfile)
+    if working_dir:
+        registry.default_dir = overmind_manager.working_dir
     
-    if overmind_manager.is_running():
+    async with overmind_manager.lock:
+        return await _start(overmind_manager, procfile, formation, port, timeout, auto_restart, ready_timeout)
+
+async def _start(
+    overmind_manager: OvermindManager,
+    procfile: Optional[str],
+    formation: Optional[str],
+    port: Optional[int],
+    timeout: Optional[int],
+    auto_restart: bool,
+    ready_timeout: float
+) -> str:
+    """Start Overmind for a manager whose lock is held."""
+    if await overmind_manager.is_running():
         return f"Overmind is already running in {overmind_manager.working_dir}."
     
     # More detailed Procfile detection and error reporting
-    if not overmind_manager.procfile_path.exists():
+    procfile_path = overmind_manager.resolved_procfile_path()
+    if not procfile_path.exists():
         # Try to provide helpful suggestions
-        error_msg = f"Procfile not found at {overmind_manager.procfile_path}."
+        error_msg = f"Procfile not found at {procfile_path}."
         
         # Check if there's a Procfile in common locations
         suggestions = []
         
         # Check current directory
         current_procfile = Path.cwd() / "Procfile"
-        if current_procfile.exists() and current_procfile != overmind_manager.procfile_path:
+        if current_procfile.exists() and current_procfile != procfile_path:
             suggestions.append(f"Found Procfile at {current_procfile}")
         
         # Check parent directories
@@ -155,6 +725,15 @@ async def overmind_start(
         
         return error_msg
     
+    # Catch typos before paying for a full overmind start
+    model = overmind_manager.procfile()
+    if model is not None:
+        if not model.entries:
+            return f"Procfile at {model.path} declares no processes."
+        error = model.check_formation(formation) if formation else None
+        if error:
+            return f"Invalid formation: {error}"
+    
     command = ["overmind", "start"]
     
     if procfile:
@@ -169,33 +748,111 @@ async def overmind_start(
         command.append("-r")
     
     # Use the background start method for overmind start
-    result = await overmind_manager.start_overmind_background(command)
+    result = await overmind_manager.start_overmind_background(
+        command, ready_timeout=ready_timeout
+    )
     
     if result["success"]:
-        # Wait a bit more and check if it's actually running
-        await asyncio.sleep(3)
-        if overmind_manager.is_running():
-            return f"Overmind started successfully and is running.\n{result['stdout']}"
-        else:
-            return f"Overmind appeared to start but is not running. Check for errors."
+        base = port or _default_port(model)
+        overmind_manager.ports = (base, base + _port_block(model) - 1)
+        return f"Overmind started successfully and is running.\n{result['stdout']}"
     else:
         return f"Failed to start Overmind: {result['stderr']}"
 
+def _port_block(model: Optional[Procfile]) -> int:
+    """Number of ports Overmind uses from its base port for a Procfile."""
+    if model is None:
+        return PORT_STEP
+    processes = max(1, len(model.entries), sum(model.formation.values()))
+    return processes * PORT_STEP
+
+def _default_port(model: Optional[Procfile]) -> int:
+    """Base port Overmind uses without -p.
+    
+    Like Overmind, OVERMIND_PORT from the environment takes precedence over
+    the one in .overmind.env.
+    """
+    value = os.environ.get(PORT_OPTION, "")
+    if value.isdigit():
+        return int(value)
+    if model is not None and model.port:
+        return model.port
+    return DEFAULT_PORT_BASE
+
+def _port_range(overmind_manager: OvermindManager, model: Optional[Procfile] = None) -> Tuple[int, int]:
+    """First and last port a project's Overmind uses.
+    
+    Projects not started by this server are assumed to use the default range.
+    """
+    if overmind_manager.ports:
+        return overmind_manager.ports
+    model = model if model is not None else overmind_manager.procfile()
+    base = _default_port(model)
+    return base, base + _port_block(model) - 1
+
+def _process_port(overmind_manager: OvermindManager, model: Optional[Procfile], process: str) -> Optional[int]:
+    """The $PORT Overmind gives a process, or None if the Procfile doesn't declare it.
+    
+    Overmind steps the port by PORT_STEP for each process instance, in
+    Procfile order, starting from its base port.
+    """
+    name, _, instance = process.partition("#")
+    if model is None or model.get(name) is None:
+        return None
+    index = 0
+    for entry in model.entries:
+        if entry.name == name:
+            break
+        index += model.formation.get(entry.name, 1)
+    if instance.isdigit():
+        index += int(instance) - 1
+    base = _port_range(overmind_manager, model)[0]
+    return base + index * PORT_STEP
+
+def _resolve_ports(overmind_manager: OvermindManager, model: Optional[Procfile], probes: List[Probe]) -> List[Probe]:
+    """Replace $PORT in probe targets with each process's port.
+    
+    A $PORT probe for a scaled process becomes one probe per instance, since
+    every instance listens on its own port.
+    """
+    resolved = []
+    for probe in probes:
+        names = [probe.process]
+        count = model.formation.get(probe.process, 1) if model is not None else 1
+        if probe.kind != "log" and PORT_PLACEHOLDER in probe.target and count > 1:
+            names = [f"{probe.process}#{instance}" for instance in range(1, count + 1)]
+        for name in names:
+            port = _process_port(overmind_manager, model, name)
+            instance = probe._replace(process=name)
+            resolved.append(instance.with_port(port) if port is not None else instance)
+    return resolved
+
+def _check_processes(overmind_manager: OvermindManager, names: List[str]) -> Optional[str]:
+    """Describe process names the Procfile doesn't declare, or None if all are valid."""
+    model = overmind_manager.procfile()
+    if model is None:
+        return None
+    return model.check_processes(names)
+
 @mcp.tool()
-async def overmind_stop(processes: Optional[str] = None) -> str:
+@stats.instrument
+async def overmind_stop(processes: Optional[str] = None, working_dir: Optional[str] = None) -> str:
     """Stop specified processes or interrupt all processes.
     
     Args:
         processes: Comma-separated list of process names to stop (optional, stops all if not specified)
+        working_dir: Project directory (optional, defaults to the most recently started project)
     """
-    if not overmind_manager.is_running():
+    overmind_manager = registry.get(working_dir)
+    if not await overmind_manager.is_running():
         return "Overmind is not currently running."
     
-    command = ["overmind", "stop"]
-    if processes:
-        command.extend(processes.split(","))
-    
-    result = await overmind_manager.run_command(command)
+    names = processes.split(",") if processes else []
+    error = _check_processes(overmind_manager, names)
+    if error:
+        return error
+    async with overmind_manager.lock:
+        result = await overmind_manager.control("stop", names)
     
     if result["success"]:
         return f"Processes stopped successfully.\n{result['stdout']}"
@@ -203,58 +860,312 @@ async def overmind_stop(processes: Optional[str] = None) -> str:
         return f"Failed to stop processes: {result['stderr']}"
 
 @mcp.tool()
-async def overmind_restart(processes: str) -> str:
+@stats.instrument
+async def overmind_restart(processes: str, working_dir: Optional[str] = None) -> str:
     """Restart specified processes.
     
     Args:
         processes: Comma-separated list of process names to restart
+        working_dir: Project directory (optional, defaults to the most recently started project)
     """
-    if not overmind_manager.is_running():
+    overmind_manager = registry.get(working_dir)
+    if not await overmind_manager.is_running():
         return "Overmind is not currently running. Use overmind_start first."
     
-    command = ["overmind", "restart"] + processes.split(",")
-    result = await overmind_manager.run_command(command)
+    names = processes.split(",")
+    error = _check_processes(overmind_manager, names)
+    if error:
+        return error
+    async with overmind_manager.lock:
+        result = await overmind_manager.control("restart", names)
     
     if result["success"]:
         return f"Processes restarted successfully.\n{result['stdout']}"
     else:
         return f"Failed to restart processes: {result['stderr']}"
 
+def _instance_key(name: str) -> Tuple[str, int]:
+    """Sort key ordering scaled instances by number, e.g. worker#2 before worker#10."""
+    base, _, number = name.partition("#")
+    return base, int(number) if number.isdigit() else 0
+
+def _instance_checks(
+    overmind_manager: OvermindManager,
+    model: Optional[Procfile],
+    batch: List[str],
+    probes: List[Probe]
+) -> List[Tuple[Probe, List[str]]]:
+    """The probes to run for each instance of a batch.
+    
+    Every probe is run for every instance, with $PORT resolved to that
+    instance's port. tcp and http probes that resolve to the same target
+    are run once for all the instances sharing it.
+    
+    Returns:
+        Each check with the instances it covers
+    """
+    checks: Dict[Tuple[str, str, Optional[str]], Tuple[Probe, List[str]]] = {}
+    for probe in probes:
+        for name in batch:
+            check = probe._replace(process=name)
+            if probe.kind != "log":
+                port = _process_port(overmind_manager, model, name)
+                check = check.with_port(port) if port is not None else check
+            key = (check.kind, check.target, name if check.kind == "log" else None)
+            checks.setdefault(key, (check, []))[1].append(name)
+    return list(checks.values())
+
+async def _wait_for_batch(
+    overmind_manager: OvermindManager,
+    model: Optional[Procfile],
+    batch: List[str],
+    old_pids: Dict[str, Optional[int]],
+    probes: List[Probe],
+    after_seq: int,
+    timeout: float
+) -> Dict[str, str]:
+    """Wait until every instance of a restarted batch is ready.
+    
+    An instance is ready when Overmind reports it running under a new PID
+    and every probe passes for it; log probes only count output captured
+    after the restart was sent.
+    
+    Returns:
+        The reason each instance that didn't become ready in time failed
+    """
+    deadline = time.monotonic() + timeout
+    interval = READY_POLL_MIN_INTERVAL
+    while True:
+        failures: Dict[str, str] = {}
+        status = await overmind_manager.get_status(max_age=0)
+        rows = {p["name"]: p for p in status.get("processes", [])}
+        for name in batch:
+            row = rows.get(name)
+            if row is None:
+                failures[name] = "missing from status"
+            elif row["status"] != "running":
+                failures[name] = f"status {row['status']}"
+            elif old_pids.get(name) is not None and row["pid"] == old_pids[name]:
+                failures[name] = "not restarted yet"
+        
+        if not failures and probes:
+            checks = _instance_checks(overmind_manager, model, batch, probes)
+            remaining = max(0.0, deadline - time.monotonic())
+            results = await asyncio.gather(*(
+                run_probe(check, overmind_manager.logs, min(DEFAULT_PROBE_TIMEOUT, remaining) or 0.01, after_seq)
+                for check, _ in checks
+            ))
+            for (check, names), result in zip(checks, results):
+                if not result["healthy"]:
+                    for name in names:
+                        failures.setdefault(name, f"{check.spec}: {result['detail']}")
+        
+        if not failures:
+            return {}
+        if time.monotonic() >= deadline:
+            return failures
+        await asyncio.sleep(min(interval, max(0.0, deadline - time.monotonic())))
+        interval = min(interval * 2, READY_POLL_MAX_INTERVAL)
+
 @mcp.tool()
-async def overmind_status() -> str:
-    """Get the status of all processes."""
-    if not overmind_manager.is_running():
+@stats.instrument
+async def overmind_rolling_restart(
+    process: str,
+    batch_size: int = 1,
+    probe: Optional[str] = None,
+    ready_timeout: float = DEFAULT_BATCH_READY_TIMEOUT,
+    max_failures: int = 0,
+    on_failure: str = "abort",
+    working_dir: Optional[str] = None,
+    ctx: Optional[Context] = None
+) -> str:
+    """Restart the instances of a scaled process a few at a time.
+    
+    Each batch must be ready before the next one is restarted: running under
+    a new PID and passing the process's health probes (declared in the
+    Procfile, or given with probe).
+    
+    Args:
+        process: Process whose instances are restarted, e.g. 'worker' for worker#1..worker#4
+        batch_size: Instances restarted at once
+        probe: Readiness probe such as 'tcp:8000' or 'log:ready', in addition to declared ones (optional)
+        ready_timeout: Seconds each batch may take to become ready
+        max_failures: Instances allowed to fail before on_failure applies
+        on_failure: 'abort' to stop once max_failures is exceeded, or 'continue' to roll forward anyway
+        working_dir: Project directory (optional, defaults to the most recently started project)
+    """
+    if batch_size < 1:
+        return "batch_size must be at least 1"
+    if on_failure not in ("abort", "continue"):
+        return "on_failure must be 'abort' or 'continue'"
+    
+    overmind_manager = registry.get(working_dir)
+    if not await overmind_manager.is_running():
+        return "Overmind is not currently running. Use overmind_start first."
+    error = _check_processes(overmind_manager, [process])
+    if error:
+        return error
+    
+    model = overmind_manager.procfile()
+    probes = [p for p in (model.probes if model is not None else ()) if process_matches(process, p.process)]
+    if probe:
+        try:
+            probes.append(parse_probe(process, probe))
+        except ProbeError as e:
+            return str(e)
+    
+    status = await overmind_manager.get_status(max_age=0)
+    if not status["success"]:
+        return f"Failed to get process status: {status['stderr']}"
+    pids = {p["name"]: p["pid"] for p in status["processes"] if process_matches(p["name"], process)}
+    instances = sorted(pids, key=_instance_key)
+    if not instances:
+        return f"No running instances of '{process}'."
+    
+    batches = [instances[i:i + batch_size] for i in range(0, len(instances), batch_size)]
+    result = f"Rolling restart of {process}: {len(instances)} instance(s) in batches of {batch_size}\n\n"
+    failed: List[str] = []
+    restarted = 0
+    aborted = False
+    for number, batch in enumerate(batches, 1):
+        if ctx is not None:
+            await _report_progress(ctx, restarted, f"Restarting {', '.join(batch)}")
+        after_seq = overmind_manager.logs.last_seq
+        started = time.monotonic()
+        async with overmind_manager.lock:
+            restart = await overmind_manager.control("restart", batch)
+        if restart["success"]:
+            failures = await _wait_for_batch(
+                overmind_manager, model, batch, pids, probes, after_seq, ready_timeout
+            )
+        else:
+            failures = {name: restart["stderr"] or "restart failed" for name in batch}
+        restarted += len(batch)
+        elapsed = time.monotonic() - started
+        
+        if failures:
+            failed.extend(failures)
+            result += f"Batch {number}: {', '.join(batch)} not ready after {elapsed:.2f}s\n"
+            for name, reason in failures.items():
+                result += f"  {name}: {reason}\n"
+        else:
+            result += f"Batch {number}: {', '.join(batch)} ready in {elapsed:.2f}s\n"
+        
+        if len(failed) > max_failures and on_failure == "abort" and number < len(batches):
+            aborted = True
+            skipped = [name for later in batches[number:] for name in later]
+            result += f"\nAborted: {len(failed)} instance(s) failed (max_failures={max_failures}); "
+            result += f"not restarted: {', '.join(skipped)}\n"
+            break
+    
+    if ctx is not None:
+        await _report_progress(ctx, restarted, "Rolling restart finished")
+    ready = restarted - len(failed)
+    summary = "aborted" if aborted else "completed"
+    result += f"\nRolling restart {summary}: {ready}/{len(instances)} instance(s) ready"
+    if failed:
+        result += f", {len(failed)} failed"
+    return result
+
+@mcp.tool()
+@stats.instrument
+async def overmind_status(
+    working_dir: Optional[str] = None,
+    max_age: Optional[float] = None,
+    cursor: Optional[str] = None
+) -> str:
+    """Get the status of all processes.
+    
+    Every response ends with a cursor. Pass it back to get only the
+    processes that changed since that response.
+    
+    Args:
+        working_dir: Project directory (optional, defaults to the most recently started project)
+        max_age: Oldest cached snapshot to accept in seconds (optional, defaults
+            to OVERMIND_MCP_STATUS_TTL, 1 second)
+        cursor: Cursor from a previous overmind_status response (optional)
+    """
+    overmind_manager = registry.get(working_dir)
+    if not await overmind_manager.is_running():
         return "Overmind is not currently running."
     
-    command = ["overmind", "status"]
-    result = await overmind_manager.run_command(command)
+    result = await overmind_manager.get_status(max_age)
     
-    if result["success"]:
-        return f"Process status:\n{result['stdout']}"
-    else:
+    if not result["success"]:
         return f"Failed to get process status: {result['stderr']}"
+    
+    rows = {p["name"]: (p["pid"], p["status"]) for p in result.get("processes", [])}
+    current = hashlib.sha1(json.dumps(sorted(rows.items())).encode()).hexdigest()[:12]
+    snapshots = overmind_manager.status_snapshots
+    previous = snapshots.get(cursor) if cursor else None
+    snapshots[current] = rows
+    snapshots.move_to_end(current)
+    while len(snapshots) > STATUS_CURSOR_HISTORY:
+        snapshots.popitem(last=False)
+    
+    if cursor == current:
+        return f"No change (cursor {current})"
+    if previous is None:
+        return f"Process status:\n{result['stdout']}\n\nCursor: {current}"
+    
+    changes = []
+    for name in sorted(set(previous) | set(rows)):
+        before, after = previous.get(name), rows.get(name)
+        if before == after:
+            continue
+        if before is None:
+            changes.append(f"+ {name}: {after[1]} (pid {after[0]})")
+        elif after is None:
+            changes.append(f"- {name}: gone (was {before[1]})")
+        else:
+            changes.append(f"~ {name}: {before[1]} -> {after[1]} (pid {after[0]})")
+    return f"Status changed ({len(changes)} process(es)):\n" + "\n".join(changes) + f"\n\nCursor: {current}"
 
 @mcp.tool()
-async def overmind_connect(process_name: str) -> str:
+@stats.instrument
+async def overmind_connect(process_name: str, working_dir: Optional[str] = None) -> str:
     """Connect to a specific process (this will provide connection info since actual connection requires terminal).
     
     Args:
         process_name: Name of the process to connect to
+        working_dir: Project directory (optional, defaults to the most recently started project)
     """
-    if not overmind_manager.is_running():
+    overmind_manager = registry.get(working_dir)
+    if not await overmind_manager.is_running():
         return "Overmind is not currently running."
     
     return f"To connect to process '{process_name}', run the following command in your terminal:\n\novermind connect {process_name}\n\nThis will attach to the tmux session for that process."
 
+async def _report_progress(ctx: Context, progress: float, message: str) -> None:
+    """Send a progress notification, without the message on older MCP versions."""
+    try:
+        await ctx.report_progress(progress, message=message)
+    except TypeError:
+        await ctx.report_progress(progress)
+
 @mcp.tool()
-async def overmind_run(command: str, process_name: Optional[str] = None) -> str:
+@stats.instrument
+async def overmind_run(
+    command: str,
+    process_name: Optional[str] = None,
+    working_dir: Optional[str] = None,
+    timeout: Optional[float] = DEFAULT_RUN_TIMEOUT,
+    max_output_bytes: int = DEFAULT_MAX_OUTPUT_BYTES,
+    ctx: Optional[Context] = None
+) -> str:
     """Run a command within the Overmind environment.
     
+    Partial output is streamed as progress notifications while the command runs.
+    
     Args:
         command: Command to run
         process_name: Optional process name context
+        working_dir: Project directory (optional, defaults to the most recently started project)
+        timeout: Seconds before the command and its children are killed (optional)
+        max_output_bytes: Output bytes kept per stream; the middle of longer output is dropped
     """
-    if not overmind_manager.is_running():
+    overmind_manager = registry.get(working_dir)
+    if not await overmind_manager.is_running():
         return "Overmind is not currently running."
     
     cmd = ["overmind", "run"]
@@ -262,21 +1173,51 @@ async def overmind_run(command: str, process_name: Optional[str] = None) -> str:
         cmd.extend(["-p", process_name])
     cmd.append(command)
     
-    result = await overmind_manager.run_command(cmd)
+    on_output = None
+    if ctx is not None:
+        loop = asyncio.get_running_loop()
+        received = 0
+        pending = bytearray()
+        last_report = 0.0
+        
+        async def on_output(stream: str, chunk: bytes) -> None:
+            nonlocal received, last_report
+            received += len(chunk)
+            pending.extend(chunk)
+            if loop.time() - last_report < PROGRESS_INTERVAL:
+                return
+            last_report = loop.time()
+            # Keep notifications small; the full output is in the final result
+            message = pending[-4096:].decode("utf-8", errors="replace")
+            pending.clear()
+            await _report_progress(ctx, received, message)
+    
+    result = await overmind_manager.stream_command(
+        cmd, timeout=timeout, max_output_bytes=max_output_bytes, on_output=on_output
+    )
     
+    notes = " (output truncated)" if result["truncated"] else ""
     if result["success"]:
-        return f"Command executed successfully.\nOutput:\n{result['stdout']}"
+        return f"Command executed successfully{notes}.\nOutput:\n{result['stdout']}"
+    elif result["timed_out"]:
+        return f"Command timed out{notes}.\nOutput:\n{result['stdout']}\n{result['stderr']}"
     else:
-        return f"Command failed: {result['stderr']}"
+        return f"Command failed{notes}: {result['stderr']}"
 
 @mcp.tool()
-async def overmind_quit() -> str:
-    """Gracefully quit Overmind."""
-    if not overmind_manager.is_running():
+@stats.instrument
+async def overmind_quit(working_dir: Optional[str] = None) -> str:
+    """Gracefully quit Overmind.
+    
+    Args:
+        working_dir: Project directory (optional, defaults to the most recently started project)
+    """
+    overmind_manager = registry.get(working_dir)
+    if not await overmind_manager.is_running():
         return "Overmind is not currently running."
     
-    command = ["overmind", "quit"]
-    result = await overmind_manager.run_command(command)
+    async with overmind_manager.lock:
+        result = await overmind_manager.control("quit")
     
     if result["success"]:
         return f"Overmind quit successfully.\n{result['stdout']}"
@@ -284,13 +1225,19 @@ async def overmind_quit() -> str:
         return f"Failed to quit Overmind: {result['stderr']}"
 
 @mcp.tool()
-async def overmind_kill() -> str:
-    """Forcefully kill all processes."""
-    if not overmind_manager.is_running():
+@stats.instrument
+async def overmind_kill(working_dir: Optional[str] = None) -> str:
+    """Forcefully kill all processes.
+    
+    Args:
+        working_dir: Project directory (optional, defaults to the most recently started project)
+    """
+    overmind_manager = registry.get(working_dir)
+    if not await overmind_manager.is_running():
         return "Overmind is not currently running."
     
-    command = ["overmind", "kill"]
-    result = await overmind_manager.run_command(command)
+    async with overmind_manager.lock:
+        result = await overmind_manager.control("kill")
     
     if result["success"]:
         return f"All processes killed.\n{result['stdout']}"
@@ -298,70 +1245,382 @@ async def overmind_kill() -> str:
         return f"Failed to kill processes: {result['stderr']}"
 
 @mcp.tool()
-async def overmind_echo() -> str:
-    """Echo output from master Overmind instance."""
-    if not overmind_manager.is_running():
+@stats.instrument
+async def overmind_echo(working_dir: Optional[str] = None, cursor: Optional[str] = None) -> str:
+    """Echo output from master Overmind instance.
+    
+    When Overmind was started by this server, responses end with a cursor.
+    Pass it back to get only the lines captured since that response. A cursor
+    from an earlier run of Overmind or of this server returns the full output.
+    
+    Args:
+        working_dir: Project directory (optional, defaults to the most recently started project)
+        cursor: Cursor from a previous overmind_echo response (optional)
+    """
+    overmind_manager = registry.get(working_dir)
+    if not await overmind_manager.is_running():
         return "Overmind is not currently running."
     
-    command = ["overmind", "echo"]
-    result = await overmind_manager.run_command(command)
+    captured = overmind_manager.capture is not None
+    current = overmind_manager.logs.last_seq
+    note = ""
+    if cursor is not None and captured:
+        run_id, _, after = cursor.partition(":")
+        if not after.isdigit():
+            return f"Invalid cursor: {cursor!r}"
+        after_seq = int(after)
+        if run_id != overmind_manager.run_id or after_seq > current:
+            after_seq = None
+            note = "Cursor is from an earlier run; returning the full output.\n"
+    else:
+        after_seq = None
+    
+    if after_seq is not None:
+        if current <= after_seq:
+            return f"No new output (cursor {overmind_manager.run_id}:{current})"
+        entries = overmind_manager.logs.tail(lines=ECHO_DELTA_LINES, after_seq=after_seq)
+        skipped = current - after_seq - len(entries)
+        result = f"{len(entries)} new line(s)"
+        if skipped > 0:
+            result += f" ({skipped} older line(s) omitted or no longer buffered)"
+        result += ":\n" + "".join(f"{entry.process} | {entry.text}\n" for entry in entries)
+        return result + f"\nCursor: {overmind_manager.run_id}:{current}"
+    
+    result = await overmind_manager.control("echo")
+    
+    if result["success"] and captured:
+        cursor = f"{overmind_manager.run_id}:{overmind_manager.logs.last_seq}"
+        return f"{note}Overmind output:\n{result['stdout']}\n\nCursor: {cursor}"
     
     if result["success"]:
         return f"Overmind output:\n{result['stdout']}"
     else:
         return f"Failed to echo output: {result['stderr']}"
 
+def _capture_warning(overmind_manager: OvermindManager) -> str:
+    """A note on listeners failing to receive captured lines, or an empty string."""
+    warning = overmind_manager.capture.listener_warning() if overmind_manager.capture is not None else None
+    return f"\nWarning: {warning}\n" if warning else ""
+
 @mcp.tool()
+@stats.instrument
+async def overmind_logs(
+    process: Optional[str] = None,
+    lines: int = 50,
+    since: Optional[float] = None,
+    working_dir: Optional[str] = None
+) -> str:
+    """Show recent output captured from processes started by this server.
+    
+    Args:
+        process: Process name to show output for (optional, shows all if not specified)
+        lines: Maximum number of lines to return
+        since: Only include lines from the last N seconds (optional)
+        working_dir: Project directory (optional, defaults to the most recently started project)
+    """
+    overmind_manager = registry.get(working_dir)
+    if overmind_manager.capture is None:
+        return "No output captured. Overmind was not started by this server; use overmind_echo instead."
+    
+    entries = overmind_manager.logs.tail(process, lines, since)
+    if not entries:
+        target = f" for process '{process}'" if process else ""
+        return f"No output captured{target}."
+    
+    result = ""
+    for entry in entries:
+        stamp = datetime.fromtimestamp(entry.timestamp).strftime("%H:%M:%S")
+        result += f"[{stamp}] {entry.process} | {entry.text}\n"
+    return result + _capture_warning(overmind_manager)
+
+@mcp.tool()
+@stats.instrument
+async def overmind_query_logs(
+    process: Optional[str] = None,
+    level: Optional[str] = None,
+    component: Optional[str] = None,
+    since: Optional[float] = None,
+    contains: Optional[str] = None,
+    limit: int = 100,
+    working_dir: Optional[str] = None
+) -> str:
+    """Query structured log records parsed from captured process output.
+    
+    Lines shaped like "[TAG] 2024-05-01 12:00:00 [ERROR] component: message"
+    are indexed by level, process and time, so filtered queries only visit
+    matching records.
+    
+    Args:
+        process: Only records from this process (optional)
+        level: Comma-separated levels to include, e.g. "ERROR,WARN" (optional)
+        component: Only records from this component (optional)
+        since: Only records from the last N seconds (optional)
+        contains: Only records whose message contains this text (optional)
+        limit: Maximum number of records to return
+        working_dir: Project directory (optional, defaults to the most recently started project)
+    """
+    overmind_manager = registry.get(working_dir)
+    if overmind_manager.capture is None:
+        return "No output captured. Overmind was not started by this server; use overmind_echo instead."
+    
+    levels = [name.strip() for name in level.split(",") if name.strip()] if level else None
+    records = overmind_manager.records.query(process, levels, component, since, contains, limit)
+    if not records:
+        return f"No matching records ({len(overmind_manager.records)} structured records captured)."
+    
+    result = f"{len(records)} matching record(s):\n\n"
+    for record in records:
+        stamp = datetime.fromtimestamp(record.timestamp).strftime("%H:%M:%S")
+        source = f"{record.component}: " if record.component else ""
+        result += f"[{stamp}] {record.process} {record.level} {source}{record.message}\n"
+    return result + _capture_warning(overmind_manager)
+
+@mcp.tool()
+@stats.instrument
+async def overmind_log_history(
+    since: float = DEFAULT_HISTORY_WINDOW,
+    until: Optional[float] = None,
+    process: Optional[str] = None,
+    contains: Optional[str] = None,
+    limit: int = 200,
+    working_dir: Optional[str] = None
+) -> str:
+    """Read persisted process output from a past time window.
+    
+    Output captured by this server is kept on disk under .overmind-mcp/logs,
+    so it survives server restarts and outlives the in-memory buffers.
+    
+    Args:
+        since: Start of the window, in seconds ago (default one hour)
+        until: End of the window, in seconds ago (optional, defaults to now)
+        process: Only lines from this process (optional)
+        contains: Only lines containing this text (optional)
+        limit: Maximum number of lines to return, oldest first
+        working_dir: Project directory (optional, defaults to the most recently started project)
+    """
+    overmind_manager = registry.get(working_dir)
+    history = overmind_manager.log_history()
+    if history is None:
+        return "Output history is disabled (OVERMIND_MCP_HISTORY=0)."
+    # Lines the history failed to store are missing from every window
+    warning = _capture_warning(overmind_manager)
+    if not history.segments:
+        return f"No output history in {history.directory}.{warning}"
+    
+    now = time.time()
+    start = now - since
+    end = now - until if until is not None else None
+    try:
+        # Snapshot on the loop thread, which appends and rotates segments
+        segments = history.snapshot()
+        entries = await asyncio.to_thread(read_segments, segments, start, end, process, contains, limit)
+    except Exception as e:
+        return f"Error reading output history: {str(e)}"
+    if not entries:
+        return f"No output history in that window.{warning}"
+    
+    result = f"{len(entries)} line(s)"
+    if len(entries) >= limit:
+        result += " (limit reached; narrow the window or raise limit)"
+    result += ":\n\n"
+    for entry in entries:
+        stamp = datetime.fromtimestamp(entry.timestamp).strftime("%Y-%m-%d %H:%M:%S")
+        result += f"[{stamp}] {entry.process} | {entry.text}\n"
+    return result + warning
+
+def _format_bytes(value: float) -> str:
+    """Format a byte count in MiB."""
+    return f"{value / (1024 * 1024):.1f} MiB"
+
+@mcp.tool()
+@stats.instrument
+async def overmind_metrics(
+    process: Optional[str] = None,
+    window: float = 60,
+    working_dir: Optional[str] = None
+) -> str:
+    """Show CPU and memory usage of each process and its children.
+    
+    The first call starts a background sampler that reads /proc on an interval
+    (OVERMIND_MCP_METRICS_INTERVAL, 5 seconds by default).
+    
+    Args:
+        process: Process name to show (optional, shows all if not specified)
+        window: Seconds of history to summarize as min/avg/max
+        working_dir: Project directory (optional, defaults to the most recently started project)
+    """
+    if not metrics_supported():
+        return "Process metrics require a Linux /proc filesystem."
+    
+    overmind_manager = registry.get(working_dir)
+    if not await overmind_manager.is_running():
+        return "Overmind is not currently running."
+    
+    sampler = overmind_manager.metrics
+    if not sampler.running:
+        # CPU usage is the difference between two samples, so take both here
+        # rather than leaving the second to the background loop
+        if not await sampler.sample():
+            return "No running processes to sample."
+        await asyncio.sleep(METRICS_PRIME_DELAY)
+        await sampler.sample()
+        sampler.start()
+    
+    names = sorted(sampler.series)
+    if process:
+        names = [name for name in names if name == process or name.split("#", 1)[0] == process]
+    if not names:
+        return f"No metrics for process '{process}'." if process else "No metrics collected yet."
+    
+    result = f"Process metrics (last {window:g}s):\n\n"
+    for name in names:
+        series = sampler.series[name]
+        _, cpu, rss = series.latest()
+        summary = series.summary(window)
+        pids = sampler.pids.get(name, [])
+        result += f"{name} (PIDs: {', '.join(map(str, pids)) or 'none'})\n"
+        result += f"   CPU: {cpu:.1f}%"
+        if summary:
+            result += (
+                f" (min {summary['cpu_min']:.1f}% / avg {summary['cpu_avg']:.1f}%"
+                f" / max {summary['cpu_max']:.1f}%)"
+            )
+        result += f"\n   Memory: {_format_bytes(rss)}"
+        if summary:
+            result += (
+                f" (min {_format_bytes(summary['rss_min'])} / avg {_format_bytes(summary['rss_avg'])}"
+                f" / max {_format_bytes(summary['rss_max'])})"
+            )
+            result += f"\n   Samples: {summary['samples']}"
+        result += "\n\n"
+    return result
+
+@mcp.tool()
+@stats.instrument
+async def overmind_health(
+    process: Optional[str] = None,
+    probes: Optional[Dict[str, str]] = None,
+    timeout: float = DEFAULT_PROBE_TIMEOUT,
+    max_age: Optional[float] = None,
+    working_dir: Optional[str] = None
+) -> str:
+    """Check whether processes are actually serving, not just running.
+    
+    Probes are declared in the Procfile with comments such as
+    "# health web tcp:$PORT", "# health api http://127.0.0.1:3000/health" or
+    "# health worker log:Worker ready". All probes run concurrently. A log
+    probe stays passed once it matches, until its process is restarted.
+    
+    Args:
+        process: Only check probes for this process (optional)
+        probes: Extra probes as a mapping of process name to probe, e.g.
+            {"web": "tcp:8000"} (optional)
+        timeout: Seconds each probe may take
+        max_age: Oldest cached result to accept in seconds (optional, defaults to 2)
+        working_dir: Project directory (optional, defaults to the most recently started project)
+    """
+    overmind_manager = registry.get(working_dir)
+    
+    model = overmind_manager.procfile()
+    declared = list(model.probes) if model is not None else []
+    try:
+        declared += [parse_probe(name, spec) for name, spec in (probes or {}).items()]
+    except ProbeError as e:
+        return str(e)
+    
+    if process:
+        declared = [p for p in declared if p.process == process or p.process.split("#", 1)[0] == process]
+    if not declared:
+        target = f" for process '{process}'" if process else ""
+        return (
+            f"No health probes declared{target}. Add comments such as "
+            f"'# health web tcp:8000' to {overmind_manager.resolved_procfile_path()} or pass probes."
+        )
+    
+    declared = _resolve_ports(overmind_manager, model, declared)
+    logs = overmind_manager.logs if overmind_manager.capture is not None else None
+    # Latched log probes are rechecked when their process gets a new PID
+    pids = None
+    if logs is not None and any(p.kind == "log" for p in declared):
+        pids = await overmind_manager.process_pids()
+    results = await overmind_manager.health.check(declared, logs, timeout, max_age, pids)
+    
+    healthy = sum(1 for r in results if r["healthy"])
+    result = f"Health: {healthy}/{len(results)} probe(s) passing\n\n"
+    for r in results:
+        state = "OK" if r["healthy"] else "FAIL"
+        result += f"{state} {r['process']} {r['probe']} ({r['latency'] * 1000:.1f} ms): {r['detail']}\n"
+    return result
+
+@mcp.tool()
+@stats.instrument
 async def overmind_check_procfile(path: Optional[str] = None) -> str:
     """Check if a Procfile exists and show its contents.
     
     Args:
         path: Path to check for Procfile (optional, defaults to current directory)
     """
-    procfile_path = Path(path) / "Procfile" if path else overmind_manager.procfile_path
+    procfile_path = Path(path) / "Procfile" if path else registry.get().resolved_procfile_path()
     
     if procfile_path.exists():
         try:
             content = procfile_path.read_text()
-            return f"Procfile found at {procfile_path}:\n\n{content}"
         except Exception as e:
             return f"Procfile exists at {procfile_path} but couldn't read it: {str(e)}"
+        result = f"Procfile found at {procfile_path}:\n\n{content}"
+        model = procfile_cache.load(procfile_path)
+        if model is not None:
+            result += "\n\n" + _describe_procfile(model)
+        return result
     else:
         return f"No Procfile found at {procfile_path}"
 
+def _describe_procfile(model: Procfile) -> str:
+    """Summarize a parsed Procfile."""
+    result = f"Processes ({len(model.entries)}):\n"
+    for entry in model.entries:
+        count = model.formation.get(entry.name, 1)
+        result += f"- {entry.name} (x{count}): {entry.command}\n"
+        if entry.env_refs:
+            result += f"  env: {', '.join(entry.env_refs)}\n"
+    if model.probes:
+        result += "Health probes:\n"
+        for probe in model.probes:
+            result += f"- {probe.process}: {probe.spec}\n"
+    if model.warnings:
+        result += "Warnings:\n"
+        for warning in model.warnings:
+            result += f"- {warning}\n"
+    return result.rstrip("\n")
+
 @mcp.tool()
-async def overmind_find_procfiles(start_path: Optional[str] = None) -> str:
+@stats.instrument
+async def overmind_find_procfiles(
+    start_path: Optional[str] = None,
+    max_depth: int = 1,
+    ignore: Optional[str] = None,
+    use_gitignore: bool = True
+) -> str:
     """Find all Procfiles in the specified directory and its subdirectories.
     
     Args:
         start_path: Path to start searching from (optional, defaults to current directory)
+        max_depth: Number of subdirectory levels to search below start_path
+        ignore: Comma-separated directory names or glob patterns to skip, in
+            addition to .git, node_modules, virtualenvs and caches (optional)
+        use_gitignore: Skip directories matched by .gitignore files
     """
     search_path = Path(start_path) if start_path else Path.cwd()
     
     if not search_path.exists():
         return f"Search path does not exist: {search_path}"
     
-    procfiles = []
+    extra_ignores = [name.strip() for name in ignore.split(",") if name.strip()] if ignore else []
     
     try:
-        # Search current directory and up to 2 levels of subdirectories
-        for procfile in search_path.rglob("Procfile"):
-            try:
-                # Limit depth to avoid searching too deep
-                if len(procfile.parts) - len(search_path.parts) <= 2:
-                    content_preview = procfile.read_text()[:200]  # First 200 chars
-                    if len(content_preview) == 200:
-                        content_preview += "..."
-                    procfiles.append({
-                        "path": str(procfile),
-                        "size": procfile.stat().st_size,
-                        "preview": content_preview
-                    })
-            except Exception as e:
-                procfiles.append({
-                    "path": str(procfile),
-                    "error": str(e)
-                })
+        procfiles = await asyncio.to_thread(
+            procfile_index.find, str(search_path), max_depth, extra_ignores, use_gitignore
+        )
     except Exception as e:
         return f"Error searching for Procfiles: {str(e)}"
     
@@ -375,34 +1634,487 @@ async def overmind_find_procfiles(start_path: Optional[str] = None) -> str:
             result += f"   Error: {pf['error']}\n"
         else:
             result += f"   Size: {pf['size']} bytes\n"
+            model = procfile_cache.load(Path(pf['path']))
+            if model is not None:
+                result += f"   Processes: {', '.join(model.names) or 'none'}\n"
             result += f"   Preview: {pf['preview']}\n"
         result += "\n"
     
     return result
 
 @mcp.tool()
+@stats.instrument
 async def overmind_is_running(working_dir: Optional[str] = None) -> str:
     """Check if Overmind is currently running in the specified directory.
     
     Args:
-        working_dir: Directory to check (optional, defaults to current directory)
+        working_dir: Directory to check (optional, defaults to the most recently started project)
     """
-    if working_dir:
-        temp_manager = OvermindManager(working_dir=working_dir)
-        running = temp_manager.is_running()
-        socket_path = temp_manager.socket_path
+    overmind_manager = registry.get(working_dir)
+    socket_path = overmind_manager.socket_path
+    
+    if not socket_path.exists():
+        return f"Overmind is not running (no socket at {socket_path})"
+    if not await overmind_manager.is_running():
+        return f"Overmind is not running (stale socket at {socket_path} refuses connections)"
+    return f"Overmind is running (socket found at {socket_path})"
+
+# Operations accepted by overmind_batch and the tools implementing them
+BATCH_HANDLERS = {
+    "start": overmind_start,
+    "stop": overmind_stop,
+    "restart": overmind_restart,
+    "status": overmind_status,
+    "run": overmind_run,
+}
+
+# Default number of batch operations run at the same time
+DEFAULT_BATCH_CONCURRENCY = 4
+
+def _validate_batch(operations: List[Dict[str, Any]]) -> Tuple[List[str], Optional[str]]:
+    """Assign operation ids and check operation names and dependencies.
+    
+    Returns:
+        The operation ids and an error message, or None if the batch is valid.
+    """
+    ids = [str(op.get("id", i)) for i, op in enumerate(operations, 1)]
+    if len(set(ids)) != len(ids):
+        return ids, "Operation ids must be unique."
+    
+    for op_id, op in zip(ids, operations):
+        if op.get("op") not in BATCH_HANDLERS:
+            return ids, f"Operation {op_id}: unknown op {op.get('op')!r}, expected one of {', '.join(BATCH_HANDLERS)}."
+        if not isinstance(op.get("depends_on", []), list):
+            return ids, f"Operation {op_id}: depends_on must be a list of operation ids."
+        for dep in op.get("depends_on", []):
+            if str(dep) not in ids:
+                return ids, f"Operation {op_id}: depends on unknown operation {dep!r}."
+    
+    # Depth-first search for dependency cycles
+    deps = {op_id: [str(d) for d in op.get("depends_on", [])] for op_id, op in zip(ids, operations)}
+    state: Dict[str, int] = {}
+    
+    def visit(op_id: str) -> bool:
+        if state.get(op_id) == 1:
+            return False
+        if state.get(op_id) == 2:
+            return True
+        state[op_id] = 1
+        if not all(visit(dep) for dep in deps[op_id]):
+            return False
+        state[op_id] = 2
+        return True
+    
+    for op_id in ids:
+        if not visit(op_id):
+            return ids, f"Operation {op_id}: dependency cycle detected."
+    return ids, None
+
+@mcp.tool()
+@stats.instrument
+async def overmind_batch(
+    operations: List[Dict[str, Any]],
+    concurrency: int = DEFAULT_BATCH_CONCURRENCY
+) -> str:
+    """Run several Overmind operations in one call.
+    
+    Independent operations run concurrently; an operation with depends_on waits
+    until the listed operations have finished, and is skipped if any of them
+    failed. Operations on the same project are still serialized by that
+    project's lock.
+    
+    Args:
+        operations: List of operations. Each has an "op" (start, stop, restart,
+            status or run), an optional "id" (defaults to its 1-based position),
+            optional "depends_on" (list of ids), and the arguments of the
+            matching tool, e.g. {"op": "restart", "processes": "web",
+            "working_dir": "/path/to/project"}
+        concurrency: Maximum number of operations running at the same time
+    """
+    if not operations:
+        return "No operations given."
+    
+    ids, error = _validate_batch(operations)
+    if error:
+        return f"Invalid batch: {error}"
+    
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+    tasks: Dict[str, asyncio.Task] = {}
+    
+    async def run(op: Dict[str, Any]) -> Tuple[str, str, float]:
+        deps = [str(dep) for dep in op.get("depends_on", [])]
+        if deps:
+            await asyncio.wait([tasks[dep] for dep in deps])
+            unmet = [dep for dep in deps if tasks[dep].result()[0] != "ok"]
+            if unmet:
+                return "skipped", f"Skipped: depends on unsuccessful operation(s) {', '.join(unmet)}", 0.0
+        
+        handler = BATCH_HANDLERS[op["op"]]
+        args = {k: v for k, v in op.items() if k not in ("op", "id", "depends_on")}
+        async with semaphore:
+            started = time.monotonic()
+            try:
+                output = await handler(**args)
+            except Exception as e:
+                return "failed", f"Error: {str(e)}", time.monotonic() - started
+            state = "failed" if output.startswith(ERROR_PREFIXES) else "ok"
+            return state, output, time.monotonic() - started
+    
+    # Create every task before any runs so dependency lookups always succeed
+    for op_id, op in zip(ids, operations):
+        tasks[op_id] = asyncio.ensure_future(run(op))
+    await asyncio.gather(*tasks.values())
+    
+    counts = {"failed": 0, "skipped": 0}
+    result = ""
+    for op_id, op in zip(ids, operations):
+        state, output, elapsed = tasks[op_id].result()
+        if state in counts:
+            counts[state] += 1
+        target = op.get("working_dir") or "default project"
+        result += f"[{op_id}] {op['op']} in {target} ({elapsed:.2f}s)\n{output}\n\n"
+    
+    summary = f"Batch completed: {len(operations)} operation(s)"
+    for state, count in counts.items():
+        if count:
+            summary += f", {count} {state}"
+    return f"{summary}\n\n{result}"
+
+async def _select_projects(
+    working_dirs: Optional[str],
+    start_path: Optional[str],
+    max_depth: int,
+    ignore: Optional[str],
+    use_gitignore: bool
+) -> List[Path]:
+    """Resolve project directories from an explicit list or Procfile discovery.
+    
+    Raises:
+        ValueError: If the search path doesn't exist
+    """
+    if working_dirs:
+        dirs = [Path(d.strip()).resolve() for d in working_dirs.split(",") if d.strip()]
     else:
-        running = overmind_manager.is_running()
-        socket_path = overmind_manager.socket_path
+        search_path = Path(start_path) if start_path else Path.cwd()
+        if not search_path.exists():
+            raise ValueError(f"Search path does not exist: {search_path}")
+        extra_ignores = [name.strip() for name in ignore.split(",") if name.strip()] if ignore else []
+        found = await asyncio.to_thread(
+            procfile_index.find, str(search_path), max_depth, extra_ignores, use_gitignore
+        )
+        dirs = [Path(pf["path"]).parent.resolve() for pf in found if "error" not in pf]
+    return list(dict.fromkeys(dirs))
+
+def _allocate_ports(blocks: List[int], base: int, reserved: List[Tuple[int, int]]) -> List[int]:
+    """Assign each block of ports a start, skipping ranges already in use.
     
-    if running:
-        return f"Overmind is running (socket found at {socket_path})"
+    Starts are aligned to PORT_STEP so ranges stay easy to read.
+    
+    Raises:
+        ValueError: If the ports run out
+    """
+    reserved = sorted(reserved)
+    starts = []
+    cursor = base
+    for size in blocks:
+        moved = True
+        while moved:
+            moved = False
+            for first, last in reserved:
+                if cursor <= last and first <= cursor + size - 1:
+                    cursor = -(-(last + 1) // PORT_STEP) * PORT_STEP
+                    moved = True
+        if cursor + size - 1 > MAX_PORT:
+            raise ValueError(f"Not enough ports above {base} for {len(blocks)} project(s)")
+        starts.append(cursor)
+        reserved.append((cursor, cursor + size - 1))
+        cursor += size
+    return starts
+
+@mcp.tool()
+@stats.instrument
+async def overmind_start_all(
+    working_dirs: Optional[str] = None,
+    start_path: Optional[str] = None,
+    max_depth: int = 1,
+    ignore: Optional[str] = None,
+    use_gitignore: bool = True,
+    concurrency: int = DEFAULT_BATCH_CONCURRENCY,
+    port_base: int = DEFAULT_PORT_BASE,
+    auto_restart: bool = False,
+    ready_timeout: float = DEFAULT_READY_TIMEOUT
+) -> str:
+    """Start Overmind in several projects at once.
+    
+    Each project gets its own port range (passed with -p), sized at 100 ports
+    per process and placed after the ranges of projects already running, so
+    services don't collide on $PORT.
+    
+    Args:
+        working_dirs: Comma-separated project directories (optional, defaults to
+            every directory with a Procfile found under start_path)
+        start_path: Directory to search for Procfiles (optional, defaults to current directory)
+        max_depth: Number of subdirectory levels to search below start_path
+        ignore: Comma-separated directory names or glob patterns to skip while searching (optional)
+        use_gitignore: Skip directories matched by .gitignore files while searching
+        concurrency: Maximum number of projects starting at the same time
+        port_base: First port to hand out
+        auto_restart: Enable auto-restart of failed processes
+        ready_timeout: Seconds to wait for each Overmind to accept connections
+    """
+    try:
+        dirs = await _select_projects(working_dirs, start_path, max_depth, ignore, use_gitignore)
+    except Exception as e:
+        return f"Error selecting projects: {str(e)}"
+    if not dirs:
+        return "No projects with a Procfile found."
+    
+    managers = [registry.get(str(d)) for d in dirs]
+    known = managers + [m for m in registry.managers() if m not in managers]
+    alive = dict(zip(known, await asyncio.gather(*(m.is_running() for m in known))))
+    pending = [m for m in managers if not alive[m]]
+    reserved = [_port_range(m) for m in known if alive[m]]
+    blocks = [_port_block(m.procfile()) for m in pending]
+    try:
+        starts = _allocate_ports(blocks, port_base, reserved)
+    except ValueError as e:
+        return f"Error allocating ports: {str(e)}"
+    ports = {m.working_dir: (first, first + size - 1) for m, first, size in zip(pending, starts, blocks)}
+    
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+    
+    async def start(overmind_manager: OvermindManager) -> Tuple[str, str, float]:
+        if overmind_manager.working_dir not in ports:
+            return "already running", "", 0.0
+        async with semaphore:
+            started = time.monotonic()
+            try:
+                async with overmind_manager.lock:
+                    output = await _start(
+                        overmind_manager, None, None, ports[overmind_manager.working_dir][0],
+                        None, auto_restart, ready_timeout
+                    )
+            except Exception as e:
+                output = f"Error: {str(e)}"
+            elapsed = time.monotonic() - started
+        if output.startswith("Overmind started successfully"):
+            return "ok", "", elapsed
+        if "already running" in output:
+            return "already running", "", elapsed
+        return "failed", output, elapsed
+    
+    started = time.monotonic()
+    results = await asyncio.gather(*(start(m) for m in managers))
+    elapsed = time.monotonic() - started
+    
+    ok = sum(1 for state, _, _ in results if state == "ok")
+    failed = sum(1 for state, _, _ in results if state == "failed")
+    summary = f"Started {ok} of {len(managers)} project(s) in {elapsed:.2f}s"
+    if failed:
+        summary += f", {failed} failed"
+    lines = [summary, ""]
+    for overmind_manager, (state, output, took) in zip(managers, results):
+        line = f"[{state}] {overmind_manager.working_dir}"
+        if overmind_manager.working_dir in ports:
+            first, last = ports[overmind_manager.working_dir]
+            line += f" (ports {first}-{last}, {took:.2f}s)"
+        lines.append(line)
+        if output:
+            lines.append(f"  {output.strip()}")
+    return "\n".join(lines)
+
+@mcp.tool()
+@stats.instrument
+async def overmind_stop_all(
+    working_dirs: Optional[str] = None,
+    start_path: Optional[str] = None,
+    max_depth: int = 1,
+    ignore: Optional[str] = None,
+    use_gitignore: bool = True,
+    concurrency: int = DEFAULT_BATCH_CONCURRENCY,
+    kill: bool = False
+) -> str:
+    """Quit Overmind in several projects at once.
+    
+    Args:
+        working_dirs: Comma-separated project directories (optional)
+        start_path: Directory to search for Procfiles (optional; with neither
+            argument, every project this server knows about is stopped)
+        max_depth: Number of subdirectory levels to search below start_path
+        ignore: Comma-separated directory names or glob patterns to skip while searching (optional)
+        use_gitignore: Skip directories matched by .gitignore files while searching
+        concurrency: Maximum number of projects stopping at the same time
+        kill: Kill processes instead of quitting gracefully
+    """
+    if working_dirs or start_path:
+        try:
+            dirs = await _select_projects(working_dirs, start_path, max_depth, ignore, use_gitignore)
+        except Exception as e:
+            return f"Error selecting projects: {str(e)}"
+        managers = [registry.get(str(d)) for d in dirs]
     else:
-        return f"Overmind is not running (no socket at {socket_path})"
+        known = registry.managers()
+        alive = await asyncio.gather(*(m.is_running() for m in known))
+        managers = [m for m, running in zip(known, alive) if running]
+    if not managers:
+        return "No running projects to stop."
+    
+    command = "kill" if kill else "quit"
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+    
+    async def stop(overmind_manager: OvermindManager) -> Tuple[str, str, float]:
+        if not await overmind_manager.is_running():
+            return "not running", "", 0.0
+        async with semaphore:
+            started = time.monotonic()
+            try:
+                async with overmind_manager.lock:
+                    result = await overmind_manager.control(command)
+            except Exception as e:
+                result = {"success": False, "stderr": str(e)}
+            elapsed = time.monotonic() - started
+        if result["success"]:
+            return "ok", "", elapsed
+        return "failed", result["stderr"], elapsed
+    
+    started = time.monotonic()
+    results = await asyncio.gather(*(stop(m) for m in managers))
+    elapsed = time.monotonic() - started
+    
+    ok = sum(1 for state, _, _ in results if state == "ok")
+    failed = sum(1 for state, _, _ in results if state == "failed")
+    summary = f"Stopped {ok} of {len(managers)} project(s) in {elapsed:.2f}s"
+    if failed:
+        summary += f", {failed} failed"
+    lines = [summary, ""]
+    for overmind_manager, (state, output, took) in zip(managers, results):
+        line = f"[{state}] {overmind_manager.working_dir}"
+        if state != "not running":
+            line += f" ({took:.2f}s)"
+        lines.append(line)
+        if output:
+            lines.append(f"  Failed to {command} Overmind: {output.strip()}")
+    return "\n".join(lines)
+
+@mcp.tool()
+async def overmind_server_stats(tool: Optional[str] = None, reset: bool = False) -> str:
+    """Show latency, error and subprocess statistics for the server's tools.
+
+    Args:
+        tool: Only show this tool (optional)
+        reset: Clear the statistics after reporting them
+    """
+    rows = [(name, s) for name, s in stats.summary() if tool is None or name == tool]
+    if not rows:
+        return f"No calls recorded for {tool}" if tool else "No tool calls recorded yet"
+
+    uptime = time.time() - stats.started
+    result = f"Tool statistics over {uptime:.0f}s:\n\n"
+    result += (
+        f"{'TOOL':<26}{'CALLS':>7}{'ERRORS':>8}{'MEAN':>10}{'P95<=':>10}{'MAX':>10}"
+        f"{'SPAWNS':>8}{'OUTPUT':>10}\n"
+    )
+    for name, s in rows:
+        result += (
+            f"{name:<26}{s.calls:>7}{s.errors:>8}"
+            f"{s.total_seconds / s.calls * 1000:>8.1f}ms{s.quantile(0.95) * 1000:>8.0f}ms"
+            f"{s.max_seconds * 1000:>8.1f}ms{s.spawns:>8}{_format_bytes(s.output_bytes):>10}\n"
+        )
+    if stats.export_path is not None:
+        result += f"\nPrometheus metrics are written to {stats.export_path}\n"
+    if reset:
+        stats.reset()
+    return result
+
+# URI template of the per-project status resource; the project is the
+# URL-encoded working directory
+STATUS_RESOURCE = "overmind://status/{project}"
+
+# Sessions subscribed to each status resource URI
+subscriptions: Dict[str, Set[Any]] = {}
+
+def status_resource_uri(working_dir: Path) -> str:
+    """URI of the status resource for a project directory."""
+    return STATUS_RESOURCE.format(project=quote(str(working_dir), safe=""))
+
+def _watcher(overmind_manager: OvermindManager) -> OvermindWatcher:
+    """The watcher of a project, created but not started if needed."""
+    if overmind_manager.watcher is None:
+        overmind_manager.watcher = OvermindWatcher(overmind_manager, _publish_status)
+    return overmind_manager.watcher
+
+async def _publish_status(watcher: OvermindWatcher) -> None:
+    """Notify subscribers that a project's status resource changed."""
+    uri = status_resource_uri(watcher.manager.working_dir)
+    sessions = subscriptions.get(uri, set())
+    for session in list(sessions):
+        try:
+            await session.send_resource_updated(uri)
+        except Exception:
+            # The client went away
+            sessions.discard(session)
+
+@mcp.resource(STATUS_RESOURCE, mime_type="application/json")
+async def overmind_status_resource(project: str) -> str:
+    """Liveness, process states and recent state transitions of a project.
+    
+    Subscribe to receive a resource-updated notification whenever Overmind
+    starts or stops or a process changes state. Without a subscription a
+    read checks the state once; only subscriptions keep a watcher running.
+    """
+    watcher = _watcher(registry.get(unquote(project)))
+    if await watcher.refresh():
+        await _publish_status(watcher)
+    return json.dumps(watcher.snapshot())
+
+# FastMCP has no decorators for subscriptions, so register them on the
+# low-level server
+@mcp._mcp_server.subscribe_resource()
+async def _subscribe_status(uri: Any) -> None:
+    uri = str(uri)
+    prefix = STATUS_RESOURCE.split("{", 1)[0]
+    if not uri.startswith(prefix):
+        return
+    subscriptions.setdefault(uri, set()).add(mcp._mcp_server.request_context.session)
+    _watcher(registry.get(unquote(uri[len(prefix):]))).start()
+
+@mcp._mcp_server.unsubscribe_resource()
+async def _unsubscribe_status(uri: Any) -> None:
+    uri = str(uri)
+    prefix = STATUS_RESOURCE.split("{", 1)[0]
+    sessions = subscriptions.get(uri)
+    if sessions is None:
+        return
+    sessions.discard(mcp._mcp_server.request_context.session)
+    if not sessions and uri.startswith(prefix):
+        del subscriptions[uri]
+        watcher = registry.get(unquote(uri[len(prefix):])).watcher
+        if watcher is not None:
+            await watcher.stop()
+
+_get_capabilities = mcp._mcp_server.get_capabilities
+
+def _advertise_subscriptions(*args: Any, **kwargs: Any) -> Any:
+    """Server capabilities with resource subscriptions enabled.
+    
+    The low-level server always reports resources.subscribe as false, and
+    clients only send resources/subscribe to servers that advertise it.
+    """
+    capabilities = _get_capabilities(*args, **kwargs)
+    if capabilities.resources is not None:
+        capabilities.resources.subscribe = True
+    return capabilities
+
+mcp._mcp_server.get_capabilities = _advertise_subscriptions
 
 def main():
     """Main entry point for the MCP server."""
-    mcp.run(transport="stdio")
+    try:
+        mcp.run(transport="stdio")
+    finally:
+        for overmind_manager in registry.managers():
+            if overmind_manager.history is not None:
+                overmind_manager.history.close()
 
 if __name__ == "__main__":
     main() 
\ No newline at end of file
@@ -0,0 +1,301 @@
+"""Push-based tracking of Overmind state.
+
+The watcher notices the control socket appearing and disappearing through
+inotify (falling back to polling where inotify is unavailable), confirms
+liveness by actually connecting, and while Overmind is up polls its status to
+record per-process state transitions. Each change is reported to a callback,
+which the server turns into MCP resource-updated notifications.
+"""
+
+import asyncio
+import ctypes
+import ctypes.util
+import os
+import struct
+import sys
+import time
+from collections import deque
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Deque, Dict, Optional
+
+# inotify event masks and flags from <sys/inotify.h>
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+
+# Header of each struct inotify_event: wd, mask, cookie, len
+EVENT_HEADER = struct.Struct("iIII")
+
+# Seconds between existence checks when inotify is unavailable
+DEFAULT_POLL_INTERVAL = 1.0
+
+# Seconds between status polls while Overmind is running
+DEFAULT_STATUS_INTERVAL = float(os.environ.get("OVERMIND_MCP_WATCH_INTERVAL", "2.0"))
+
+# Number of state transitions remembered per project
+MAX_TRANSITIONS = 100
+
+# State name used for Overmind itself in transitions
+MASTER_STATE = "overmind"
+
+_libc = None
+
+
+def _load_libc():
+    global _libc
+    if _libc is None:
+        _libc = ctypes.CDLL(ctypes.util.find_library("c") or None, use_errno=True)
+    return _libc
+
+
+def inotify_supported() -> bool:
+    """Whether inotify can be used on this platform."""
+    if not sys.platform.startswith("linux"):
+        return False
+    try:
+        return hasattr(_load_libc(), "inotify_init1")
+    except OSError:
+        return False
+
+
+class FileEvents:
+    """Signals when a file in a directory is created, deleted or renamed.
+
+    Uses inotify through ctypes when available, otherwise compares the
+    file's stat signature every ``poll_interval`` seconds.
+    """
+
+    def __init__(self, path: Path, poll_interval: float = DEFAULT_POLL_INTERVAL, use_inotify: bool = True):
+        """Initialize the watch.
+
+        Args:
+            path: File to watch
+            poll_interval: Seconds between checks in polling mode
+            use_inotify: Use inotify if the platform supports it
+        """
+        self.path = path
+        self.poll_interval = poll_interval
+        self._changed = asyncio.Event()
+        self._fd: Optional[int] = None
+        self._signature = self._stat()
+        if use_inotify and inotify_supported():
+            self._open_inotify()
+
+    @property
+    def inotify(self) -> bool:
+        """Whether events come from inotify rather than polling."""
+        return self._fd is not None
+
+    def _stat(self):
+        try:
+            st = os.stat(self.path)
+        except OSError:
+            return None
+        return st.st_ino, st.st_mtime_ns
+
+    def _open_inotify(self) -> None:
+        libc = _load_libc()
+        fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if fd < 0:
+            return
+        mask = IN_CREATE | IN_DELETE | IN_MOVED_FROM | IN_MOVED_TO
+        if libc.inotify_add_watch(fd, os.fsencode(self.path.parent), mask) < 0:
+            os.close(fd)
+            return
+        self._fd = fd
+        asyncio.get_running_loop().add_reader(fd, self._read)
+
+    def _read(self) -> None:
+        try:
+            data = os.read(self._fd, 65536)
+        except BlockingIOError:
+            return
+        name = os.fsencode(self.path.name)
+        offset = 0
+        while offset + EVENT_HEADER.size <= len(data):
+            _, _, _, length = EVENT_HEADER.unpack_from(data, offset)
+            offset += EVENT_HEADER.size
+            if data[offset:offset + length].rstrip(b"\0") == name:
+                self._changed.set()
+            offset += length
+
+    def set(self) -> None:
+        """Wake a pending wait without a file change."""
+        self._changed.set()
+
+    async def wait(self, timeout: Optional[float]) -> bool:
+        """Wait for a change, a wake-up or the timeout.
+
+        Returns:
+            True if something changed or a wake-up was requested
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            remaining = None if deadline is None else max(0.0, deadline - time.monotonic())
+            if self.inotify:
+                step = remaining
+            elif remaining is None:
+                step = self.poll_interval
+            else:
+                step = min(self.poll_interval, remaining)
+            # asyncio.wait rather than wait_for, which can swallow a
+            # cancellation that races with the event being set
+            waiter = asyncio.ensure_future(self._changed.wait())
+            try:
+                await asyncio.wait({waiter}, timeout=step)
+            finally:
+                waiter.cancel()
+            if not self.inotify:
+                signature = self._stat()
+                if signature != self._signature:
+                    self._signature = signature
+                    self._changed.set()
+            if self._changed.is_set():
+                self._changed.clear()
+                return True
+            if deadline is not None and time.monotonic() >= deadline:
+                return False
+
+    def close(self) -> None:
+        """Stop watching."""
+        if self._fd is not None:
+            try:
+                asyncio.get_running_loop().remove_reader(self._fd)
+            except RuntimeError:
+                pass
+            os.close(self._fd)
+            self._fd = None
+
+
+class OvermindWatcher:
+    """Tracks whether Overmind is alive and the state of its processes."""
+
+    def __init__(
+        self,
+        manager: Any,
+        on_change: Optional[Callable[["OvermindWatcher"], Awaitable[None]]] = None,
+        status_interval: float = DEFAULT_STATUS_INTERVAL,
+        poll_interval: float = DEFAULT_POLL_INTERVAL,
+        use_inotify: bool = True
+    ):
+        """Initialize the watcher.
+
+        Args:
+            manager: The OvermindManager to watch
+            on_change: Coroutine called after each state change
+            status_interval: Seconds between status polls while Overmind runs
+            poll_interval: Seconds between socket checks without inotify
+            use_inotify: Use inotify if the platform supports it
+        """
+        self.manager = manager
+        self.on_change = on_change
+        self.status_interval = status_interval
+        self.poll_interval = poll_interval
+        self.use_inotify = use_inotify
+        self.running = False
+        self.processes: Dict[str, str] = {}
+        self.transitions: Deque[Dict[str, Any]] = deque(maxlen=MAX_TRANSITIONS)
+        self.version = 0
+        self.updated = time.time()
+        self._events: Optional[FileEvents] = None
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def active(self) -> bool:
+        """Whether the background watch is running."""
+        return self._task is not None and not self._task.done()
+
+    def start(self) -> None:
+        """Start watching in the background."""
+        if not self.active:
+            if self._events is not None:
+                self._events.close()
+            self._events = FileEvents(self.manager.socket_path, self.poll_interval, self.use_inotify)
+            self._task = asyncio.ensure_future(self._run())
+
+    async def stop(self) -> None:
+        """Stop watching."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._events is not None:
+            self._events.close()
+            self._events = None
+
+    def wake(self) -> None:
+        """Refresh as soon as possible, e.g. after a control command."""
+        if self._events is not None:
+            self._events.set()
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Current state as a JSON-serializable dictionary."""
+        return {
+            "working_dir": str(self.manager.working_dir),
+            "running": self.running,
+            "processes": dict(self.processes),
+            "version": self.version,
+            "updated": self.updated,
+            "transitions": list(self.transitions),
+        }
+
+    async def refresh(self) -> bool:
+        """Check liveness and process states, recording any transitions.
+
+        Returns:
+            True if anything changed
+        """
+        running = self.manager.socket_path.exists() and await self.manager.socket_accepts()
+        processes: Dict[str, str] = {}
+        if running:
+            status = await self.manager.get_status(max_age=0)
+            if status["success"]:
+                processes = {p["name"]: p["status"] for p in status["processes"]}
+            else:
+                running = False
+
+        now = time.time()
+        changes = []
+        if running != self.running:
+            changes.append(self._transition(now, MASTER_STATE, self.running, running))
+        for name in sorted(set(self.processes) | set(processes)):
+            before, after = self.processes.get(name), processes.get(name)
+            if before != after:
+                changes.append({"time": now, "process": name, "from": before, "to": after})
+        if not changes:
+            return False
+
+        self.running = running
+        self.processes = processes
+        self.transitions.extend(changes)
+        self.version += 1
+        self.updated = now
+        return True
+
+    @staticmethod
+    def _transition(now: float, name: str, before: bool, after: bool) -> Dict[str, Any]:
+        state = {True: "running", False: "stopped"}
+        return {"time": now, "process": name, "from": state[before], "to": state[after]}
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                changed = await self.refresh()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                changed = False
+            if changed and self.on_change is not None:
+                try:
+                    await self.on_change(self)
+                except Exception:
+                    pass
+            # Only socket events matter while Overmind is down; while it runs,
+            # poll so crashed processes are noticed too
+            await self._events.wait(self.status_interval if self.running else None)
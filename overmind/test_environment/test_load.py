@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""Load generator process that writes log lines at a configurable rate.
+
+Every option can also be set through an environment variable (shown in
+brackets), so Procfile entries and formations can be tuned without editing
+the Procfile.
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+from datetime import datetime
+
+LOG_LEVELS = ["INFO", "INFO", "INFO", "DEBUG", "WARN", "ERROR"]
+COMPONENTS = ["auth", "database", "cache", "api", "scheduler"]
+
+# Output is written in slices of this many seconds
+TICK = 0.01
+
+
+def env(name, default):
+    return type(default)(os.environ.get(name, default))
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rate", type=float, default=env("LOAD_RATE", 1000.0),
+                        help="lines per second [LOAD_RATE]")
+    parser.add_argument("--size", type=int, default=env("LOAD_SIZE", 120),
+                        help="approximate bytes per line [LOAD_SIZE]")
+    parser.add_argument("--burst", type=int, default=env("LOAD_BURST", 0),
+                        help="extra lines written at once every burst interval [LOAD_BURST]")
+    parser.add_argument("--burst-interval", type=float, default=env("LOAD_BURST_INTERVAL", 5.0),
+                        help="seconds between bursts [LOAD_BURST_INTERVAL]")
+    parser.add_argument("--trace-every", type=int, default=env("LOAD_TRACE_EVERY", 0),
+                        help="write a multi-line stack trace every N lines, 0 for never [LOAD_TRACE_EVERY]")
+    parser.add_argument("--duration", type=float, default=env("LOAD_DURATION", 0.0),
+                        help="seconds to run, 0 for forever [LOAD_DURATION]")
+    parser.add_argument("--tag", default=os.environ.get("LOAD_TAG", "LOAD"),
+                        help="tag at the start of each line [LOAD_TAG]")
+    parser.add_argument("--prefix", default=os.environ.get("LOAD_PREFIX", ""),
+                        help="emulate Overmind's 'name | ' prefix, for driving the capture directly [LOAD_PREFIX]")
+    return parser.parse_args()
+
+
+class Generator:
+    """Formats log lines and stack traces of a given size."""
+
+    def __init__(self, args):
+        self.args = args
+        self.prefix = f"{args.prefix.ljust(10)}| " if args.prefix else ""
+        self.seq = 0
+        self.lines_written = 0
+        self.rng = random.Random(os.getpid())
+
+    def line(self):
+        self.seq += 1
+        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        level = self.rng.choice(LOG_LEVELS)
+        component = self.rng.choice(COMPONENTS)
+        # The send time lets the driver measure capture lag
+        head = f"{self.prefix}[{self.args.tag}] {timestamp} [{level}] {component}: seq={self.seq} t={time.time():.6f} "
+        return head + "x" * max(0, self.args.size - len(head)) + "\n"
+
+    def trace(self):
+        lines = [
+            f"{self.prefix}Traceback (most recent call last):\n",
+        ]
+        for depth in range(self.rng.randint(3, 8)):
+            lines.append(f'{self.prefix}  File "/app/service/module_{depth}.py", line {self.rng.randint(1, 500)}, in handler_{depth}\n')
+            lines.append(f"{self.prefix}    result = handler_{depth + 1}(request)\n")
+        lines.append(f"{self.prefix}RuntimeError: simulated failure after line {self.seq}\n")
+        return lines
+
+    def batch(self, count):
+        out = []
+        for _ in range(count):
+            out.append(self.line())
+            if self.args.trace_every and self.seq % self.args.trace_every == 0:
+                out.extend(self.trace())
+        self.lines_written += len(out)
+        return out
+
+
+def main():
+    args = parse_args()
+    generator = Generator(args)
+    out = sys.stdout
+    started = time.monotonic()
+    next_burst = started + args.burst_interval if args.burst else None
+    written = 0
+
+    while True:
+        now = time.monotonic()
+        elapsed = now - started
+        if args.duration and elapsed >= args.duration:
+            break
+
+        # Catch up to the target rate; a blocked pipe shows up as a shortfall
+        due = int(elapsed * args.rate) - written
+        if next_burst is not None and now >= next_burst:
+            out.writelines(generator.batch(args.burst))
+            next_burst += args.burst_interval
+        if due > 0:
+            out.writelines(generator.batch(due))
+            written += due
+        out.flush()
+        time.sleep(TICK)
+
+    elapsed = time.monotonic() - started
+    print(
+        f"[{args.tag}] wrote {generator.lines_written} lines in {elapsed:.2f}s "
+        f"({generator.seq / elapsed:.0f} records/s, target {args.rate:.0f}/s)",
+        file=sys.stderr, flush=True
+    )
+
+
+if __name__ == "__main__":
+    try:
+        main()
+    except (KeyboardInterrupt, BrokenPipeError):
+        sys.exit(0)
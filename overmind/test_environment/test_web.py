@@ -1,13 +1,38 @@
 #!/usr/bin/env python3
 """Simple web-like process that outputs to stdout periodically."""
 
+import os
 import time
 import sys
+import threading
 from datetime import datetime
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+class HealthHandler(BaseHTTPRequestHandler):
+    """Answers every GET with 200 so health probes have something to hit."""
+    
+    def do_GET(self):
+        self.send_response(200)
+        self.end_headers()
+        self.wfile.write(b"ok\n")
+    
+    def log_message(self, format, *args):
+        pass
+
+def serve(port):
+    """Listen for HTTP requests in the background."""
+    try:
+        server = HTTPServer(("127.0.0.1", port), HealthHandler)
+    except OSError as e:
+        print(f"[WEB:{port}] Could not listen on port {port}: {e}", flush=True)
+        return
+    threading.Thread(target=server.serve_forever, daemon=True).start()
 
 def main():
     print("Starting web server process...", flush=True)
-    port = 8000
+    # Overmind assigns each process its port; 5000 is its default base
+    port = int(os.environ.get("PORT", "5000"))
+    serve(port)
     
     while True:
         timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
@@ -0,0 +1,165 @@
+"""Tests for the Overmind control socket client."""
+
+import asyncio
+import tempfile
+import pytest
+import pytest_asyncio
+from pathlib import Path
+
+from mcp_server_overmind.client import OvermindClient, OvermindProtocolError, parse_status
+
+
+class FakeCommandCenter:
+    """Minimal stand-in for Overmind's command center."""
+
+    def __init__(self, socket_path: Path):
+        self.socket_path = socket_path
+        self.commands = []
+        self.connections = 0
+        self.server = None
+
+    async def start(self):
+        self.server = await asyncio.start_unix_server(self.handle, str(self.socket_path))
+
+    async def stop(self):
+        self.server.close()
+        await self.server.wait_closed()
+
+    async def handle(self, reader, writer):
+        self.connections += 1
+        while True:
+            line = await reader.readline()
+            if not line:
+                break
+            args = line.decode().split()
+            self.commands.append(args)
+            if args[0] == "status":
+                writer.write(b"PROCESS   PID       STATUS\nweb       123       running\n")
+                await writer.drain()
+                break
+            if args[0] == "echo":
+                writer.write(b"web | hello\n")
+                await writer.drain()
+            if args[0] == "get-connection":
+                # Streams forever, like echo on a formation that keeps printing
+                while True:
+                    writer.write(b"web | tick\n")
+                    await writer.drain()
+                    await asyncio.sleep(0.05)
+        writer.close()
+
+
+@pytest_asyncio.fixture
+async def command_center():
+    with tempfile.TemporaryDirectory() as temp_dir:
+        center = FakeCommandCenter(Path(temp_dir) / ".overmind.sock")
+        await center.start()
+        yield center
+        await center.stop()
+
+
+class TestOvermindClient:
+    """Test the OvermindClient class."""
+
+    def test_encode(self):
+        """Test encoding a command line."""
+        assert OvermindClient.encode("restart", ["web", " worker "]) == b"restart web worker\n"
+
+    def test_encode_rejects_whitespace(self):
+        """Test that arguments with embedded whitespace are rejected."""
+        with pytest.raises(OvermindProtocolError):
+            OvermindClient.encode("restart", ["web worker"])
+
+    @pytest.mark.asyncio
+    async def test_request_status(self, command_center):
+        """Test reading a status response until the server closes."""
+        client = OvermindClient(command_center.socket_path)
+        output = await client.request("status")
+        assert "web       123       running" in output
+        assert command_center.commands == [["status"]]
+
+    @pytest.mark.asyncio
+    async def test_request_idle_timeout(self, command_center):
+        """Test that streaming responses stop after an idle period."""
+        client = OvermindClient(command_center.socket_path)
+        output = await client.request("echo", idle_timeout=0.1)
+        assert output == "web | hello\n"
+
+    @pytest.mark.asyncio
+    async def test_request_limits(self, command_center):
+        """Test that a response that never goes quiet is cut off by time and size."""
+        client = OvermindClient(command_center.socket_path)
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        output = await client.request("get-connection", idle_timeout=1.0, max_time=0.3)
+        assert loop.time() - started < 1.0
+        assert output.startswith("web | tick\n")
+
+        output = await client.request("get-connection", idle_timeout=1.0, max_bytes=25)
+        assert output == "web | tick\nweb | tick\nweb"
+
+    @pytest.mark.asyncio
+    async def test_send_reuses_connection(self, command_center):
+        """Test that control commands share one persistent connection."""
+        client = OvermindClient(command_center.socket_path)
+        await client.send("restart", ["web"])
+        await client.send("stop", ["worker"])
+        await asyncio.sleep(0.05)
+        await client.close()
+        
+        assert command_center.commands == [["restart", "web"], ["stop", "worker"]]
+        assert command_center.connections == 1
+
+    @pytest.mark.asyncio
+    async def test_send_reconnects(self, command_center):
+        """Test reconnecting after the server drops the connection."""
+        client = OvermindClient(command_center.socket_path)
+        await client.send("restart", ["web"])
+        await asyncio.sleep(0.05)
+        client._writer.close()
+        await client.send("restart", ["worker"])
+        await asyncio.sleep(0.05)
+        await client.close()
+        
+        assert ["restart", "worker"] in command_center.commands
+        assert command_center.connections == 2
+
+    @pytest.mark.asyncio
+    async def test_unreachable_socket(self):
+        """Test that a missing socket raises a protocol error."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            client = OvermindClient(Path(temp_dir) / ".overmind.sock")
+            with pytest.raises(OvermindProtocolError):
+                await client.request("status")
+            with pytest.raises(OvermindProtocolError):
+                await client.send("quit")
+
+    @pytest.mark.asyncio
+    async def test_unsupported_command(self, command_center):
+        """Test that unknown commands are rejected before connecting."""
+        client = OvermindClient(command_center.socket_path)
+        with pytest.raises(OvermindProtocolError):
+            await client.request("restart")
+        with pytest.raises(OvermindProtocolError):
+            await client.send("status")
+
+
+class TestParseStatus:
+    """Test parsing overmind status output."""
+
+    def test_parse_status(self):
+        """Test parsing the status table."""
+        output = (
+            "PROCESS   PID       STATUS\n"
+            "web       12345     running\n"
+            "worker#2  12346     dead\n"
+        )
+        assert parse_status(output) == [
+            {"name": "web", "pid": 12345, "status": "running"},
+            {"name": "worker#2", "pid": 12346, "status": "dead"},
+        ]
+
+    def test_parse_status_empty(self):
+        """Test that blank or header-only output yields no rows."""
+        assert parse_status("") == []
+        assert parse_status("PROCESS   PID       STATUS\n") == []
@@ -0,0 +1,93 @@
+"""Tests for Procfile discovery."""
+
+import os
+import tempfile
+import pytest
+from pathlib import Path
+
+from mcp_server_overmind.discovery import PREVIEW_LENGTH, ProcfileIndex, parse_gitignore
+
+
+@pytest.fixture
+def project_tree():
+    with tempfile.TemporaryDirectory() as temp_dir:
+        root = Path(temp_dir)
+        (root / "Procfile").write_text("web: python app.py")
+        for name in ("api", "node_modules/pkg", ".git", "build", "deep/nested"):
+            (root / name).mkdir(parents=True)
+            (root / name / "Procfile").write_text(f"{name}: run")
+        yield root
+
+
+def paths(results, root):
+    return [os.path.relpath(result["path"], root) for result in results]
+
+
+class TestParseGitignore:
+    """Test parsing .gitignore patterns."""
+
+    def test_patterns(self):
+        """Test comments, negations, anchors and trailing slashes."""
+        text = "# comment\n\nbuild/\n!keep\n/dist\nlogs/*.d\n**/tmp\n"
+        assert parse_gitignore(text) == (
+            ("build", False),
+            ("dist", True),
+            ("logs/*.d", True),
+            ("tmp", False),
+        )
+
+
+class TestProcfileIndex:
+    """Test the ProcfileIndex class."""
+
+    def test_prunes_ignored_directories(self, project_tree):
+        """Test that default ignores and depth bound are applied."""
+        index = ProcfileIndex()
+        results = index.find(str(project_tree))
+        assert paths(results, project_tree) == ["Procfile", "api/Procfile", "build/Procfile"]
+        assert results[0]["preview"] == "web: python app.py"
+
+    def test_depth(self, project_tree):
+        """Test descending further with a larger depth."""
+        index = ProcfileIndex()
+        results = index.find(str(project_tree), max_depth=2)
+        assert "deep/nested/Procfile" in paths(results, project_tree)
+        assert "node_modules/pkg/Procfile" not in paths(results, project_tree)
+
+    def test_extra_ignores_and_gitignore(self, project_tree):
+        """Test custom ignore patterns and .gitignore rules."""
+        (project_tree / ".gitignore").write_text("build/\n")
+        index = ProcfileIndex()
+        assert paths(index.find(str(project_tree)), project_tree) == ["Procfile", "api/Procfile"]
+        assert paths(index.find(str(project_tree), ignore=["a*"]), project_tree) == ["Procfile"]
+        assert "build/Procfile" in paths(
+            index.find(str(project_tree), use_gitignore=False), project_tree
+        )
+
+    def test_repeat_search_uses_cache(self, project_tree):
+        """Test that unchanged directories are not listed again."""
+        index = ProcfileIndex()
+        index.find(str(project_tree))
+        scanned = index.scanned
+        index.find(str(project_tree))
+        assert index.scanned == scanned
+
+    def test_changed_directory_rescanned(self, project_tree):
+        """Test that only a changed directory is listed again."""
+        index = ProcfileIndex()
+        index.find(str(project_tree))
+        scanned = index.scanned
+        
+        (project_tree / "api" / "Procfile").unlink()
+        os.utime(project_tree / "api", ns=(1, 1))
+        
+        assert paths(index.find(str(project_tree)), project_tree) == ["Procfile", "build/Procfile"]
+        assert index.scanned == scanned + 1
+
+    def test_preview_refreshed_on_change(self, project_tree):
+        """Test that previews follow Procfile edits and are truncated."""
+        index = ProcfileIndex()
+        index.find(str(project_tree))
+        (project_tree / "Procfile").write_text("x" * (PREVIEW_LENGTH + 50))
+        preview = index.find(str(project_tree))[0]["preview"]
+        assert preview == "x" * PREVIEW_LENGTH + "..."
@@ -0,0 +1,167 @@
+"""Tests for process health probes."""
+
+import asyncio
+import tempfile
+import pytest
+import pytest_asyncio
+from pathlib import Path
+
+from mcp_server_overmind.health import (
+    HealthChecker,
+    Probe,
+    ProbeError,
+    parse_probe,
+    run_probe,
+)
+from mcp_server_overmind.logs import LogBuffer
+
+
+@pytest_asyncio.fixture
+async def http_server():
+    """Serve a fixed HTTP status on an ephemeral port."""
+    status = {"code": 200}
+
+    async def handle(reader, writer):
+        await reader.readuntil(b"\r\n\r\n")
+        writer.write(f"HTTP/1.0 {status['code']} X\r\n\r\n".encode())
+        await writer.drain()
+        writer.close()
+
+    server = await asyncio.start_server(handle, "127.0.0.1", 0)
+    port = server.sockets[0].getsockname()[1]
+    yield port, status
+    server.close()
+    await server.wait_closed()
+
+
+class TestParseProbe:
+    """Test parsing probe specifications."""
+
+    def test_tcp(self):
+        """Test TCP probes with and without a host."""
+        assert parse_probe("web", "tcp:8000") == Probe("web", "tcp", "127.0.0.1:8000")
+        assert parse_probe("web", "tcp:localhost:8000").target == "localhost:8000"
+
+    def test_http_and_log(self):
+        """Test HTTP and log probes."""
+        assert parse_probe("api", "http://x/health").kind == "http"
+        assert parse_probe("worker", "log:ready .*").target == "ready .*"
+        assert parse_probe("worker", "log:ready").spec == "log:ready"
+
+    def test_port_placeholder(self):
+        """Test substituting the process's port for $PORT."""
+        probe = parse_probe("web", "tcp:$PORT")
+        assert probe.target == "127.0.0.1:$PORT"
+        assert probe.with_port(5100).target == "127.0.0.1:5100"
+        assert parse_probe("web", "http://127.0.0.1:$PORT/up").with_port(5000).target == "http://127.0.0.1:5000/up"
+        assert parse_probe("web", "log:$PORT").with_port(5000).target == "$PORT"
+
+    @pytest.mark.parametrize("spec", ["tcp:http", "grpc:1", "log:(", "8000"])
+    def test_invalid(self, spec):
+        """Test rejecting malformed probes."""
+        with pytest.raises(ProbeError):
+            parse_probe("web", spec)
+
+
+class TestRunProbe:
+    """Test running individual probes."""
+
+    @pytest.mark.asyncio
+    async def test_tcp(self, http_server):
+        """Test TCP probes against open and closed ports."""
+        port, _ = http_server
+        assert (await run_probe(parse_probe("web", f"tcp:{port}")))["healthy"] is True
+        
+        server = await asyncio.start_server(lambda r, w: None, "127.0.0.1", 0)
+        closed_port = server.sockets[0].getsockname()[1]
+        server.close()
+        await server.wait_closed()
+        assert (await run_probe(parse_probe("web", f"tcp:{closed_port}")))["healthy"] is False
+
+    @pytest.mark.asyncio
+    async def test_http(self, http_server):
+        """Test HTTP probes with success and error responses."""
+        port, status = http_server
+        probe = parse_probe("web", f"http://127.0.0.1:{port}/health")
+        assert (await run_probe(probe))["detail"] == "HTTP 200"
+        
+        status["code"] = 503
+        result = await run_probe(probe)
+        assert result["healthy"] is False
+        assert result["detail"] == "HTTP 503"
+
+    @pytest.mark.asyncio
+    async def test_log(self):
+        """Test log probes, including ignoring lines before a sequence number."""
+        logs = LogBuffer()
+        logs.feed("worker#1 | Worker ready")
+        probe = parse_probe("worker", "log:ready$")
+        
+        assert (await run_probe(probe, logs))["healthy"] is True
+        assert (await run_probe(probe, logs, after_seq=logs.last_seq))["healthy"] is False
+        assert (await run_probe(probe))["healthy"] is False
+
+
+class TestHealthChecker:
+    """Test the HealthChecker class."""
+
+    @pytest.mark.asyncio
+    async def test_probes_run_concurrently_with_timeout(self):
+        """Test that slow probes time out without serializing the others."""
+        async def never_respond(reader, writer):
+            await asyncio.sleep(10)
+        
+        server = await asyncio.start_server(never_respond, "127.0.0.1", 0)
+        port = server.sockets[0].getsockname()[1]
+        probes = [parse_probe(f"p{i}", f"http://127.0.0.1:{port}/") for i in range(5)]
+        checker = HealthChecker()
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        results = await checker.check(probes, timeout=0.3)
+        server.close()
+        
+        assert loop.time() - started < 1.0
+        assert [r["detail"] for r in results] == ["timed out after 0.3s"] * 5
+
+    @pytest.mark.asyncio
+    async def test_results_cached(self, http_server):
+        """Test reusing results within the TTL and after invalidation."""
+        port, status = http_server
+        probe = parse_probe("web", f"http://127.0.0.1:{port}/")
+        checker = HealthChecker(ttl=60)
+        
+        assert (await checker.check([probe]))[0]["healthy"] is True
+        status["code"] = 500
+        assert (await checker.check([probe]))[0]["healthy"] is True
+        assert (await checker.check([probe], max_age=0))[0]["healthy"] is False
+        
+        status["code"] = 200
+        checker.invalidate()
+        assert (await checker.check([probe]))[0]["healthy"] is True
+
+    @pytest.mark.asyncio
+    async def test_log_probes_latch_until_restart(self):
+        """Test that a matched startup message keeps passing after it leaves the buffer."""
+        logs = LogBuffer(max_lines=5)
+        logs.feed("worker | Starting background worker")
+        probe = parse_probe("worker", "log:Starting background worker")
+        checker = HealthChecker(ttl=0)
+        
+        assert (await checker.check([probe], logs, pids={"worker": 10}))[0]["healthy"] is True
+        for i in range(10):
+            logs.feed(f"worker | job {i}")
+        assert (await checker.check([probe], logs, pids={"worker": 10}))[0]["healthy"] is True
+        
+        # A new PID means the process restarted on its own
+        assert (await checker.check([probe], logs, pids={"worker": 11}))[0]["healthy"] is False
+        logs.feed("worker | Starting background worker")
+        assert (await checker.check([probe], logs, pids={"worker": 11}))[0]["healthy"] is True
+        
+        # After a restart through the server only newer output counts
+        checker.reset(["worker"], logs.last_seq)
+        assert (await checker.check([probe], logs, pids={"worker": 11}))[0]["healthy"] is False
+        logs.feed("worker | Starting background worker")
+        assert (await checker.check([probe], logs, pids={"worker": 12}))[0]["healthy"] is True
+        
+        checker.reset(after_seq=logs.last_seq)
+        assert (await checker.check([probe], logs, pids={"worker": 12}))[0]["healthy"] is False
@@ -0,0 +1,104 @@
+"""Tests for the persistent output history."""
+
+import tempfile
+from pathlib import Path
+from unittest.mock import patch
+
+from mcp_server_overmind.history import INDEX_ENTRY, LogHistory, read_segments
+from mcp_server_overmind.logs import LogLine
+
+
+def fill(history, count, start=1000.0, step=1.0, process="web"):
+    for i in range(count):
+        history.append(LogLine(0, start + i * step, process, f"line {i} " + "x" * 100))
+
+
+class TestLogHistory:
+    """Test cases for the segmented history store."""
+
+    def test_read_window(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            history = LogHistory(Path(temp_dir), segment_bytes=1 << 20)
+            fill(history, 500)
+            lines = history.read(since=1100.0, until=1104.5)
+            assert [line.text.split()[1] for line in lines] == ["100", "101", "102", "103", "104"]
+            assert [line.seq for line in lines] == [100, 101, 102, 103, 104]
+            # The index is sparse: far fewer entries than lines
+            index_entries = (Path(temp_dir) / f"{0:020d}.idx").stat().st_size // INDEX_ENTRY.size
+            assert 1 < index_entries < 50
+
+    def test_filters_and_limit(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            history = LogHistory(Path(temp_dir))
+            fill(history, 10, process="web")
+            fill(history, 10, start=1010.0, process="worker#2")
+            assert len(history.read(since=0, process="worker")) == 10
+            assert [line.text.split()[1] for line in history.read(since=0, contains="line 3 ")] == ["3", "3"]
+            assert len(history.read(since=0, limit=4)) == 4
+
+    def test_rotation_and_reopen(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            history = LogHistory(Path(temp_dir), segment_bytes=2000, max_age=1e12)
+            fill(history, 100)
+            history.close()
+            assert len(history.segments) > 5
+
+            reopened = LogHistory(Path(temp_dir), segment_bytes=2000, max_age=1e12)
+            assert len(reopened.read(since=0, limit=1000)) == 100
+            reopened.append(LogLine(0, 2000.0, "web", "after restart"))
+            last = reopened.read(since=1999.0)
+            assert last[0].seq == 100
+            assert last[0].text == "after restart"
+
+    def test_torn_line_repaired(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            history = LogHistory(Path(temp_dir))
+            fill(history, 3)
+            history.close()
+            with open(history.segments[-1].path, "ab") as f:
+                f.write(b"1003.000000\tweb\tpartial")
+
+            reopened = LogHistory(Path(temp_dir))
+            reopened.append(LogLine(0, 1004.0, "web", "next"))
+            assert [line.text for line in reopened.read(since=1001.5)] == [f"line 2 {'x' * 100}", "next"]
+
+    def test_retention_by_size_and_age(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            history = LogHistory(Path(temp_dir), segment_bytes=2000, max_bytes=6000, max_age=1e12)
+            fill(history, 200)
+            assert history.size() <= 6000 + 2000
+            assert history.read(since=0)[0].seq > 0
+
+            aged = LogHistory(Path(temp_dir), segment_bytes=2000, max_bytes=1 << 30, max_age=10)
+            before = len(aged.segments)
+            assert aged.enforce_retention(now=1200.0) > 0
+            assert len(aged.segments) < before
+            # Only the segment straddling the cutoff keeps older lines
+            assert all(line.timestamp >= 1170.0 for line in aged.read(since=0, limit=1000))
+
+    def test_retention_while_appending(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            history = LogHistory(Path(temp_dir), segment_bytes=2000, max_age=1e12)
+            fill(history, 50)
+            assert len(history.segments) > 2
+
+            # Segments age out between rotations too
+            history.max_age = 10
+            with patch("mcp_server_overmind.history.FLUSH_INTERVAL", 0), \
+                 patch("mcp_server_overmind.history.RETENTION_INTERVAL", 0):
+                history.append(LogLine(0, 1050.0, "web", "next"))
+            assert len(history.segments) == 1
+
+    def test_snapshot_is_independent(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            history = LogHistory(Path(temp_dir), segment_bytes=2000, max_age=1e12)
+            fill(history, 30)
+            segments = history.snapshot()
+            count = len(segments[-1].times)
+
+            # Appending, rotating and closing leave the snapshot readable as taken
+            fill(history, 30, start=2000.0)
+            history.close()
+            assert len(segments[-1].times) == count
+            lines = read_segments(segments, since=0, until=1500.0, limit=1000)
+            assert [line.text.split()[1] for line in lines] == [str(i) for i in range(30)]
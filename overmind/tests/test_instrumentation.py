@@ -0,0 +1,147 @@
+"""Tests for tool-call instrumentation."""
+
+import asyncio
+import inspect
+import tempfile
+import pytest
+from pathlib import Path
+
+from mcp_server_overmind.instrumentation import LATENCY_BUCKETS, Instrumentation, ToolStats
+
+
+class TestToolStats:
+    """Test cases for the per-tool counters."""
+
+    def test_observe_buckets(self):
+        stats = ToolStats()
+        stats.observe(0.0005, False)
+        stats.observe(0.2, True)
+        stats.observe(100.0, False)
+        assert stats.calls == 3
+        assert stats.errors == 1
+        assert stats.buckets[0] == 1
+        assert stats.buckets[LATENCY_BUCKETS.index(0.25)] == 1
+        assert stats.buckets[-1] == 1
+        assert stats.max_seconds == 100.0
+
+    def test_quantile(self):
+        stats = ToolStats()
+        for _ in range(99):
+            stats.observe(0.002, False)
+        stats.observe(3.0, False)
+        assert stats.quantile(0.5) == 0.005
+        assert stats.quantile(0.99) == 0.005
+        assert stats.quantile(1.0) == 5.0
+        assert ToolStats().quantile(0.5) == 0.0
+
+
+class TestInstrumentation:
+    """Test cases for the instrumentation collector."""
+
+    @pytest.mark.asyncio
+    async def test_instrument_records_calls(self):
+        collector = Instrumentation()
+
+        @collector.instrument
+        async def tool_ok(value: int = 1) -> str:
+            """Docstring."""
+            return f"done {value}"
+
+        @collector.instrument
+        async def tool_failing() -> str:
+            return "Failed to do it"
+
+        @collector.instrument
+        async def tool_not_running() -> str:
+            return "Overmind is not currently running."
+
+        @collector.instrument
+        async def tool_raising() -> str:
+            raise RuntimeError("boom")
+
+        assert await tool_ok(value=2) == "done 2"
+        await tool_failing()
+        await tool_not_running()
+        with pytest.raises(RuntimeError):
+            await tool_raising()
+
+        assert collector.tools["tool_ok"].calls == 1
+        assert collector.tools["tool_ok"].errors == 0
+        assert collector.tools["tool_failing"].errors == 1
+        assert collector.tools["tool_not_running"].errors == 1
+        assert collector.tools["tool_raising"].errors == 1
+
+    def test_instrument_preserves_signature(self):
+        collector = Instrumentation()
+
+        async def tool(name: str, count: int = 3) -> str:
+            """Tool docstring."""
+            return name
+
+        wrapped = collector.instrument(tool)
+        assert wrapped.__name__ == "tool"
+        assert wrapped.__doc__ == "Tool docstring."
+        assert inspect.signature(wrapped) == inspect.signature(tool)
+        assert inspect.iscoroutinefunction(wrapped)
+
+    @pytest.mark.asyncio
+    async def test_spawns_charged_to_calling_tool(self):
+        collector = Instrumentation()
+
+        async def helper():
+            collector.record_spawn()
+            collector.record_output(10)
+
+        @collector.instrument
+        async def tool() -> str:
+            # Work in child tasks inherits the tool's context
+            await asyncio.gather(helper(), helper())
+            return "ok"
+
+        await tool()
+        collector.record_spawn()  # outside any tool: not recorded
+
+        assert collector.tools["tool"].spawns == 2
+        assert collector.tools["tool"].output_bytes == 20
+        assert list(collector.tools) == ["tool"]
+
+    @pytest.mark.asyncio
+    async def test_render_prometheus(self):
+        collector = Instrumentation()
+
+        @collector.instrument
+        async def tool() -> str:
+            collector.record_spawn()
+            return "ok"
+
+        await tool()
+        await tool()
+        text = collector.render_prometheus()
+        assert 'overmind_mcp_tool_calls_total{tool="tool"} 2' in text
+        assert 'overmind_mcp_tool_duration_seconds_bucket{tool="tool",le="+Inf"} 2' in text
+        assert 'overmind_mcp_tool_duration_seconds_count{tool="tool"} 2' in text
+        assert 'overmind_mcp_subprocess_spawns_total{tool="tool"} 2' in text
+        assert "# TYPE overmind_mcp_tool_duration_seconds histogram" in text
+
+    @pytest.mark.asyncio
+    async def test_exporter_writes_file(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = Path(temp_dir) / "overmind.prom"
+            collector = Instrumentation(str(path), export_interval=0.01)
+
+            @collector.instrument
+            async def tool() -> str:
+                return "ok"
+
+            await tool()
+            await asyncio.sleep(0.05)
+            collector._exporter.cancel()
+
+            assert 'overmind_mcp_tool_calls_total{tool="tool"} 1' in path.read_text()
+            assert not path.with_name("overmind.prom.tmp").exists()
+
+    def test_reset(self):
+        collector = Instrumentation()
+        collector.tools["tool"] = ToolStats()
+        collector.reset()
+        assert collector.tools == {}
@@ -0,0 +1,184 @@
+"""Tests for Overmind output capture and buffering."""
+
+import asyncio
+import sys
+import time
+import pytest
+
+from mcp_server_overmind.logs import (
+    BoundedOutput,
+    LogBuffer,
+    LogCapture,
+    MASTER_PROCESS,
+    MAX_LINE_LENGTH,
+    parse_line,
+)
+
+
+class TestParseLine:
+    """Test splitting raw Overmind output lines."""
+
+    def test_prefixed_line(self):
+        """Test a line with a padded process prefix."""
+        assert parse_line("web     | Listening on 8000\n") == ("web", "Listening on 8000")
+
+    def test_colored_line(self):
+        """Test that ANSI color codes are stripped."""
+        raw = "\x1b[1;38;5;2mworker#2 | \x1b[0mjob done"
+        assert parse_line(raw) == ("worker#2", "job done")
+
+    def test_unprefixed_line(self):
+        """Test that lines without a prefix belong to the master."""
+        assert parse_line("Tmux socket name: overmind-x") == (MASTER_PROCESS, "Tmux socket name: overmind-x")
+
+
+class TestLogBuffer:
+    """Test the LogBuffer class."""
+
+    def test_ring_buffer_is_bounded(self):
+        """Test that each process keeps only the most recent lines."""
+        buffer = LogBuffer(max_lines=3)
+        for i in range(10):
+            buffer.append("web", f"line {i}")
+        
+        assert [line.text for line in buffer.tail("web")] == ["line 7", "line 8", "line 9"]
+        assert buffer.last_seq == 10
+
+    def test_process_limit(self):
+        """Test that extra processes are folded into the master buffer."""
+        buffer = LogBuffer(max_processes=2)
+        buffer.append("web", "a")
+        buffer.append("worker", "b")
+        line = buffer.append("logger", "c")
+        
+        assert line.process == MASTER_PROCESS
+        assert buffer.processes() == [MASTER_PROCESS, "web", "worker"]
+
+    def test_tail_interleaves_processes(self):
+        """Test that lines from all processes come back in capture order."""
+        buffer = LogBuffer()
+        buffer.feed("web | one")
+        buffer.feed("worker | two")
+        buffer.feed("web | three")
+        
+        assert [line.text for line in buffer.tail()] == ["one", "two", "three"]
+        assert [line.text for line in buffer.tail(lines=2)] == ["two", "three"]
+
+    def test_tail_matches_instances(self):
+        """Test that a base name matches scaled instances."""
+        buffer = LogBuffer()
+        buffer.feed("worker#1 | a")
+        buffer.feed("worker#2 | b")
+        buffer.feed("workers | c")
+        
+        assert [line.text for line in buffer.tail("worker")] == ["a", "b"]
+        assert [line.text for line in buffer.tail("worker#2")] == ["b"]
+
+    def test_tail_since(self):
+        """Test filtering by age."""
+        buffer = LogBuffer()
+        buffer.append("web", "old", timestamp=time.time() - 120)
+        buffer.append("web", "new")
+        
+        assert [line.text for line in buffer.tail(since=60)] == ["new"]
+
+
+class TestLogCapture:
+    """Test the LogCapture class."""
+
+    @pytest.mark.asyncio
+    async def test_drains_process_output(self):
+        """Test draining both pipes of a child process."""
+        script = (
+            "import sys\n"
+            "for i in range(2000):\n"
+            "    print(f'web | line {i}')\n"
+            "sys.stderr.write('worker | oops\\n')\n"
+        )
+        process = await asyncio.create_subprocess_exec(
+            sys.executable, "-c", script,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE
+        )
+        buffer = LogBuffer(max_lines=100)
+        capture = LogCapture(buffer)
+        seen = []
+        capture.add_listener(seen.append)
+        capture.attach(process)
+        
+        await asyncio.wait_for(process.wait(), 10)
+        await capture.wait()
+        
+        assert len(seen) == 2001
+        assert len(buffer.tail("web", lines=1000)) == 100
+        assert buffer.tail("web", lines=1)[0].text == "line 1999"
+        assert capture.output("stderr") == "worker | oops"
+
+    @pytest.mark.asyncio
+    async def test_listener_errors_counted(self):
+        """Test that a failing listener is recorded without stopping the capture."""
+        process = await asyncio.create_subprocess_exec(
+            sys.executable, "-c", "print('web | one'); print('web | two')",
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE
+        )
+        capture = LogCapture(LogBuffer())
+        seen = []
+        
+        def broken(line):
+            raise OSError("disk full")
+        
+        capture.add_listener(broken)
+        capture.add_listener(seen.append)
+        assert capture.listener_warning() is None
+        capture.attach(process)
+        
+        await asyncio.wait_for(process.wait(), 10)
+        await capture.wait()
+        
+        assert len(seen) == 2
+        assert sum(capture.listener_errors.values()) == 2
+        assert "OSError: disk full" in capture.listener_warning()
+
+    @pytest.mark.asyncio
+    async def test_truncates_long_lines(self):
+        """Test that over-long lines are truncated rather than buffered whole."""
+        script = "print('web | ' + 'x' * 200000); print('web | next')"
+        process = await asyncio.create_subprocess_exec(
+            sys.executable, "-c", script,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE
+        )
+        buffer = LogBuffer()
+        capture = LogCapture(buffer)
+        capture.attach(process)
+        
+        await asyncio.wait_for(process.wait(), 10)
+        await capture.wait()
+        
+        lines = buffer.tail("web")
+        assert len(lines) == 2
+        assert len(lines[0].text) <= MAX_LINE_LENGTH
+        assert lines[1].text == "next"
+
+
+class TestBoundedOutput:
+    """Test the BoundedOutput class."""
+
+    def test_small_output_kept(self):
+        """Test that output within the budget is kept whole."""
+        output = BoundedOutput(100)
+        output.write(b"hello ")
+        output.write(b"world")
+        assert output.getvalue() == "hello world"
+        assert output.truncated is False
+
+    def test_head_and_tail_kept(self):
+        """Test that the middle of large output is dropped."""
+        output = BoundedOutput(10)
+        for chunk in (b"abcde", b"fghij", b"klmno", b"pqrst"):
+            output.write(chunk)
+        
+        assert output.truncated is True
+        assert output.total == 20
+        assert output.getvalue() == "abcde\n... [10 bytes truncated] ...\npqrst"
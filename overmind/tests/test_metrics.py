@@ -0,0 +1,147 @@
+"""Tests for per-process resource sampling."""
+
+import os
+import tempfile
+import pytest
+from pathlib import Path
+
+from mcp_server_overmind.metrics import (
+    MetricSeries,
+    MetricsSampler,
+    process_tree,
+    read_rss,
+    read_stat,
+)
+
+
+def write_proc(root: Path, pid: int, ppid: int, ticks: int = 0, rss_kb: int = 0):
+    """Write a minimal /proc/<pid> entry."""
+    proc = root / str(pid)
+    proc.mkdir(exist_ok=True)
+    # utime and stime are fields 14 and 15; split the ticks between them
+    fields = ["S", str(ppid)] + ["0"] * 9 + [str(ticks // 2), str(ticks - ticks // 2)] + ["0"] * 10
+    (proc / "stat").write_text(f"{pid} (python (x)) " + " ".join(fields) + "\n")
+    (proc / "status").write_text(f"Name:\tpython\nVmRSS:\t{rss_kb} kB\n")
+
+
+@pytest.fixture
+def proc_root():
+    with tempfile.TemporaryDirectory() as temp_dir:
+        root = Path(temp_dir)
+        write_proc(root, 10, 1, ticks=100, rss_kb=1000)
+        write_proc(root, 11, 10, ticks=50, rss_kb=2000)
+        write_proc(root, 12, 11, ticks=10, rss_kb=500)
+        write_proc(root, 20, 1, ticks=5, rss_kb=100)
+        yield root
+
+
+class TestProcReaders:
+    """Test reading /proc entries."""
+
+    def test_read_stat(self, proc_root):
+        """Test parsing ppid and CPU ticks around a tricky command name."""
+        assert read_stat(11, proc_root) == (10, 50)
+        assert read_stat(99, proc_root) is None
+
+    def test_read_rss(self, proc_root):
+        """Test reading VmRSS in bytes."""
+        assert read_rss(11, proc_root) == 2000 * 1024
+        assert read_rss(99, proc_root) == 0
+
+    def test_process_tree(self, proc_root):
+        """Test resolving descendants of each root."""
+        trees = process_tree({"web": 10, "worker": 20}, proc_root)
+        assert sorted(trees["web"]) == [10, 11, 12]
+        assert trees["worker"] == [20]
+
+    @pytest.mark.skipif(not Path("/proc/self/stat").exists(), reason="requires /proc")
+    def test_real_proc(self):
+        """Test reading this process from the real /proc."""
+        ppid, ticks = read_stat(os.getpid())
+        assert ppid == os.getppid()
+        assert read_rss(os.getpid()) > 0
+
+
+class TestMetricSeries:
+    """Test the MetricSeries ring."""
+
+    def test_ring_overwrites_oldest(self):
+        """Test that the ring keeps only the newest samples."""
+        series = MetricSeries(capacity=3)
+        for i in range(5):
+            series.append(float(i), float(i * 10), float(i * 100))
+        
+        assert series.count == 3
+        assert series.latest() == (4.0, 40.0, 400.0)
+        assert [s[0] for s in series.window(100, now=4.0)] == [2.0, 3.0, 4.0]
+
+    def test_summary(self):
+        """Test min/avg/max over a window."""
+        series = MetricSeries()
+        series.append(100.0, 10.0, 1000.0)
+        series.append(150.0, 20.0, 3000.0)
+        series.append(160.0, 30.0, 2000.0)
+        
+        summary = series.summary(20, now=160.0)
+        assert summary["samples"] == 2
+        assert summary["cpu_avg"] == 25.0
+        assert summary["rss_max"] == 3000.0
+        assert series.summary(1, now=500.0) is None
+
+
+class TestMetricsSampler:
+    """Test the MetricsSampler class."""
+
+    @pytest.mark.asyncio
+    async def test_sample_sums_process_tree(self, proc_root):
+        """Test aggregating CPU and memory across a process tree."""
+        async def get_pids():
+            return {"web": 10}
+        
+        sampler = MetricsSampler(get_pids, proc_root=proc_root)
+        assert await sampler.sample() is True
+        # The first sample is only a baseline for CPU usage
+        assert sampler.series == {}
+        write_proc(proc_root, 11, 10, ticks=50 + sampler._ticks, rss_kb=2000)
+        await sampler.sample()
+        
+        series = sampler.series["web"]
+        _, cpu, rss = series.latest()
+        assert sorted(sampler.pids["web"]) == [10, 11, 12]
+        assert rss == 3500 * 1024
+        assert cpu > 0
+        assert series.count == 1
+
+    @pytest.mark.asyncio
+    async def test_sample_after_restart(self, proc_root):
+        """Test that a replaced process tree starts a new baseline."""
+        roots = {"web": 10}
+
+        async def get_pids():
+            return dict(roots)
+
+        sampler = MetricsSampler(get_pids, proc_root=proc_root)
+        await sampler.sample()
+        await sampler.sample()
+        assert sampler.series["web"].count == 1
+
+        # A restarted process's CPU time isn't compared with the old tree's
+        write_proc(proc_root, 30, 1, ticks=10000, rss_kb=100)
+        roots["web"] = 30
+        await sampler.sample()
+        assert sampler.series["web"].count == 1
+        await sampler.sample()
+        assert sampler.series["web"].count == 2
+        assert sampler.series["web"].summary(60)["cpu_max"] == 0.0
+
+    @pytest.mark.asyncio
+    async def test_sample_nothing_running(self, proc_root):
+        """Test that an empty formation stops sampling."""
+        async def get_pids():
+            return {}
+        
+        sampler = MetricsSampler(get_pids, proc_root=proc_root)
+        assert await sampler.sample() is False
+        sampler.start()
+        await sampler.stop()
+        assert sampler.series == {}
@@ -1,28 +1,60 @@
 """Tests for the MCP Overmind server."""
 
 import asyncio
+import json
+import os
+import socket
+import subprocess
+import sys
 import tempfile
+import time
 import pytest
+from contextlib import contextmanager
 from pathlib import Path
 from unittest.mock import AsyncMock, MagicMock, patch
 
-from mcp_server_overmind.server import OvermindManager
+from mcp_server_overmind.client import OvermindProtocolError
+from mcp_server_overmind.logs import LogCapture
+from mcp_server_overmind.metrics import MetricSeries, MetricsSampler, metrics_supported
+from mcp_server_overmind import server as overmind_server
+from mcp_server_overmind.server import ManagerRegistry, OvermindManager, status_resource_uri
 from mcp_server_overmind.server import (
     overmind_start,
     overmind_stop,
     overmind_restart,
+    overmind_rolling_restart,
     overmind_status,
     overmind_connect,
     overmind_run,
     overmind_quit,
     overmind_kill,
     overmind_echo,
+    overmind_logs,
+    overmind_query_logs,
+    overmind_log_history,
+    overmind_metrics,
+    overmind_health,
     overmind_check_procfile,
     overmind_find_procfiles,
     overmind_is_running,
+    overmind_batch,
+    overmind_start_all,
+    overmind_stop_all,
+    overmind_server_stats,
 )
 
 
+@contextmanager
+def patch_manager(manager=None):
+    """Route every registry lookup in the tools to a single manager."""
+    if manager is None:
+        manager = MagicMock()
+        manager.is_running = AsyncMock(return_value=False)
+    with patch('mcp_server_overmind.server.registry') as mock_registry:
+        mock_registry.get.return_value = manager
+        yield manager
+
+
 class TestOvermindManager:
     """Test the OvermindManager class."""
 
@@ -48,22 +80,48 @@ class TestOvermindManager:
             assert manager.procfile_path == procfile_path
             assert manager.socket_path == temp_path / ".overmind.sock"
 
-    def test_is_running_true(self):
-        """Test is_running when socket file exists."""
+    def test_relative_procfile_resolved_against_working_dir(self):
+        """Test that a relative Procfile path is found in the working directory."""
         with tempfile.TemporaryDirectory() as temp_dir:
-            temp_path = Path(temp_dir)
-            socket_file = temp_path / ".overmind.sock"
-            socket_file.touch()
-            
-            manager = OvermindManager(working_dir=str(temp_path))
-            assert manager.is_running() is True
+            (Path(temp_dir) / "Procfile.dev").write_text("web: python app.py\n")
+            manager = OvermindManager("Procfile.dev", temp_dir)
+            assert manager.resolved_procfile_path() == Path(temp_dir) / "Procfile.dev"
+            assert manager.procfile().names == ["web"]
 
-    def test_is_running_false(self):
+    @pytest.mark.asyncio
+    async def test_is_running_true(self):
+        """Test is_running when the control socket accepts connections."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            manager = OvermindManager(working_dir=temp_dir)
+            server = await asyncio.start_unix_server(lambda r, w: w.close(), str(manager.socket_path))
+            try:
+                assert await manager.is_running() is True
+            finally:
+                server.close()
+                await server.wait_closed()
+
+    @pytest.mark.asyncio
+    async def test_is_running_false(self):
         """Test is_running when socket file doesn't exist."""
         with tempfile.TemporaryDirectory() as temp_dir:
-            temp_path = Path(temp_dir)
-            manager = OvermindManager(working_dir=str(temp_path))
-            assert manager.is_running() is False
+            manager = OvermindManager(working_dir=temp_dir)
+            assert await manager.is_running() is False
+
+    @pytest.mark.asyncio
+    async def test_is_running_removes_stale_socket(self):
+        """Test that a socket left behind by a dead Overmind is cleaned up."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            manager = OvermindManager(working_dir=temp_dir)
+            with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as stale:
+                stale.bind(str(manager.socket_path))
+            assert manager.socket_path.exists()
+            assert await manager.is_running() is False
+            assert not manager.socket_path.exists()
+            
+            # Other files at the socket path are left alone
+            manager.socket_path.touch()
+            assert await manager.is_running() is False
+            assert manager.socket_path.exists()
 
     @pytest.mark.asyncio
     async def test_run_command_success(self):
@@ -114,6 +172,337 @@ class TestOvermindManager:
             assert "Test error" in result["stderr"]
             assert result["return_code"] == -1
 
+    @pytest.mark.asyncio
+    async def test_start_background_returns_when_socket_ready(self):
+        """Test that startup returns as soon as the socket accepts connections."""
+        script = (
+            "import socket, time\n"
+            "time.sleep(0.1)\n"
+            "s = socket.socket(socket.AF_UNIX)\n"
+            "s.bind('.overmind.sock')\n"
+            "s.listen()\n"
+            "time.sleep(10)\n"
+        )
+        with tempfile.TemporaryDirectory() as temp_dir:
+            manager = OvermindManager(working_dir=temp_dir)
+            started = time.monotonic()
+            result = await manager.start_overmind_background(
+                [sys.executable, "-c", script], ready_timeout=5
+            )
+            elapsed = time.monotonic() - started
+            manager.process.kill()
+            await manager.process.wait()
+            
+            assert result["success"] is True
+            assert elapsed < 2
+            assert f"PID {manager.process.pid}" in result["stdout"]
+
+    @pytest.mark.asyncio
+    async def test_start_background_child_exits(self):
+        """Test that startup stops waiting when the child process dies."""
+        script = "import sys; sys.stderr.write('boom'); sys.exit(3)"
+        with tempfile.TemporaryDirectory() as temp_dir:
+            manager = OvermindManager(working_dir=temp_dir)
+            started = time.monotonic()
+            result = await manager.start_overmind_background(
+                [sys.executable, "-c", script], ready_timeout=10
+            )
+            
+            assert time.monotonic() - started < 5
+            assert result["success"] is False
+            assert result["stderr"] == "boom"
+            assert result["return_code"] == 3
+
+    @pytest.mark.asyncio
+    async def test_start_background_ready_timeout(self):
+        """Test startup timing out when the socket never appears."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            manager = OvermindManager(working_dir=temp_dir)
+            result = await manager.start_overmind_background(
+                [sys.executable, "-c", "import time; time.sleep(10)"],
+                ready_timeout=0.2
+            )
+            manager.process.kill()
+            await manager.process.wait()
+            
+            assert result["success"] is False
+            assert "did not become ready" in result["stderr"]
+
+    @pytest.mark.asyncio
+    async def test_socket_accepts_stale_file(self):
+        """Test that a leftover socket file is not treated as accepting."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            manager = OvermindManager(working_dir=temp_dir)
+            manager.socket_path.touch()
+            assert await manager.socket_accepts() is False
+
+    @pytest.mark.asyncio
+    async def test_control_uses_socket(self):
+        """Test that control commands go over the socket without spawning."""
+        manager = OvermindManager()
+        manager.client.send = AsyncMock()
+        
+        with patch('asyncio.create_subprocess_exec') as mock_subprocess:
+            result = await manager.control("restart", ["web", "worker"])
+            
+            mock_subprocess.assert_not_called()
+            manager.client.send.assert_called_once_with("restart", ["web", "worker"])
+            assert result["success"] is True
+
+    @pytest.mark.asyncio
+    async def test_control_falls_back_to_cli(self):
+        """Test falling back to the overmind CLI when the socket fails."""
+        manager = OvermindManager()
+        manager.client.request = AsyncMock(side_effect=OvermindProtocolError("nope"))
+        manager.run_command = AsyncMock(return_value={
+            "success": True,
+            "stdout": "web running",
+            "stderr": "",
+            "return_code": 0
+        })
+        
+        result = await manager.control("status")
+        
+        manager.run_command.assert_called_once_with(["overmind", "status"])
+        assert result["stdout"] == "web running"
+
+    @pytest.mark.asyncio
+    async def test_get_status_coalesces_concurrent_requests(self):
+        """Test that concurrent callers share one status fetch."""
+        manager = OvermindManager()
+        manager.client.request = AsyncMock(
+            return_value="PROCESS   PID       STATUS\nweb       42        running\n"
+        )
+        
+        async def slow_request(*args, **kwargs):
+            await asyncio.sleep(0.05)
+            return manager.client.request.return_value
+        manager.client.request.side_effect = slow_request
+        
+        results = await asyncio.gather(*(manager.get_status() for _ in range(10)))
+        
+        assert manager.client.request.call_count == 1
+        assert all(r["processes"] == [{"name": "web", "pid": 42, "status": "running"}] for r in results)
+
+    @pytest.mark.asyncio
+    async def test_get_status_ttl_and_invalidation(self):
+        """Test that snapshots are cached and dropped after control commands."""
+        manager = OvermindManager()
+        manager.client.request = AsyncMock(return_value="web  42  running")
+        manager.client.send = AsyncMock()
+        
+        await manager.get_status()
+        await manager.get_status()
+        assert manager.client.request.call_count == 1
+        
+        await manager.get_status(max_age=0)
+        assert manager.client.request.call_count == 2
+        
+        await manager.control("restart", ["web"])
+        await manager.get_status()
+        assert manager.client.request.call_count == 3
+
+    @pytest.mark.asyncio
+    async def test_get_status_failure_not_cached(self):
+        """Test that failed fetches are not cached."""
+        manager = OvermindManager()
+        manager.control = AsyncMock(return_value={
+            "success": False, "stdout": "", "stderr": "no socket", "return_code": 1
+        })
+        
+        result = await manager.get_status()
+        await manager.get_status()
+        
+        assert result["processes"] == []
+        assert manager.control.call_count == 2
+
+    @pytest.mark.asyncio
+    async def test_stream_command_output(self):
+        """Test streaming output chunks while collecting the result."""
+        manager = OvermindManager()
+        chunks = []
+        
+        async def on_output(stream, chunk):
+            chunks.append((stream, chunk))
+        
+        result = await manager.stream_command(
+            [sys.executable, "-c", "import sys; print('out'); sys.stderr.write('err')"],
+            on_output=on_output
+        )
+        
+        assert result["success"] is True
+        assert result["stdout"] == "out"
+        assert result["stderr"] == "err"
+        assert b"".join(chunk for stream, chunk in chunks if stream == "stdout") == b"out\n"
+
+    @pytest.mark.asyncio
+    async def test_stream_command_truncates(self):
+        """Test that large output keeps only its head and tail."""
+        manager = OvermindManager()
+        script = "print('HEAD' + 'x' * 100000 + 'TAIL')"
+        result = await manager.stream_command(
+            [sys.executable, "-c", script], max_output_bytes=1000
+        )
+        
+        assert result["truncated"] is True
+        assert result["stdout"].startswith("HEAD")
+        assert result["stdout"].endswith("TAIL")
+        assert "bytes truncated" in result["stdout"]
+        assert len(result["stdout"]) < 1100
+
+    @pytest.mark.asyncio
+    async def test_stream_command_timeout_kills_group(self):
+        """Test that a timed out command and its children are killed."""
+        manager = OvermindManager()
+        script = (
+            "import subprocess, sys, time\n"
+            "child = subprocess.Popen([sys.executable, '-c', 'import time; time.sleep(30)'])\n"
+            "print(child.pid, flush=True)\n"
+            "time.sleep(30)\n"
+        )
+        started = time.monotonic()
+        result = await manager.stream_command([sys.executable, "-c", script], timeout=0.5)
+        
+        assert time.monotonic() - started < 5
+        assert result["timed_out"] is True
+        assert result["success"] is False
+        assert "timed out" in result["stderr"]
+        child_pid = int(result["stdout"])
+        await asyncio.sleep(0.1)
+        assert not Path(f"/proc/{child_pid}").exists() or \
+            Path(f"/proc/{child_pid}/stat").read_text().split(")")[-1].split()[0] == "Z"
+
+    @pytest.mark.asyncio
+    async def test_stream_command_timeout_after_pipes_close(self):
+        """Test that a command that closes its output and keeps running still times out."""
+        manager = OvermindManager()
+        started = time.monotonic()
+        result = await manager.stream_command(["sh", "-c", "exec >/dev/null 2>&1; sleep 30"], timeout=0.5)
+        
+        assert time.monotonic() - started < 5
+        assert result["timed_out"] is True
+        assert result["return_code"] is not None
+
+    @pytest.mark.asyncio
+    async def test_stream_command_cancelled(self):
+        """Test that cancelling the caller kills the command."""
+        manager = OvermindManager()
+        task = asyncio.ensure_future(manager.stream_command(
+            [sys.executable, "-c", "import time; time.sleep(30)"], timeout=None
+        ))
+        await asyncio.sleep(0.3)
+        started = time.monotonic()
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        assert time.monotonic() - started < 3
+
+
+class TestManagerRegistry:
+    """Test the ManagerRegistry class."""
+
+    def test_keyed_by_resolved_directory(self):
+        """Test that equivalent paths share one manager."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            registry = ManagerRegistry()
+            manager = registry.get(temp_dir)
+            assert registry.get(str(Path(temp_dir) / ".")) is manager
+            assert manager.working_dir == Path(temp_dir).resolve()
+
+    def test_separate_directories(self):
+        """Test that different directories get independent managers."""
+        with tempfile.TemporaryDirectory() as first, tempfile.TemporaryDirectory() as second:
+            registry = ManagerRegistry()
+            assert registry.get(first) is not registry.get(second)
+            assert len(registry.managers()) == 2
+
+    def test_default_directory(self):
+        """Test that calls without a directory use the default project."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            registry = ManagerRegistry()
+            assert registry.get().working_dir == Path.cwd().resolve()
+            registry.default_dir = Path(temp_dir).resolve()
+            assert registry.get() is registry.get(temp_dir)
+
+    def test_procfile_updated_when_not_running(self):
+        """Test that a new Procfile path replaces the old one while stopped."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            registry = ManagerRegistry()
+            manager = registry.get(temp_dir)
+            assert registry.get(temp_dir, "Procfile.dev").procfile_path == Path("Procfile.dev")
+            assert registry.get(temp_dir) is manager
+
+    def test_procfile_reset_when_not_given(self):
+        """Test that a Procfile given to one start doesn't stick to later ones."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            registry = ManagerRegistry()
+            manager = registry.get(temp_dir, procfile="Procfile.load")
+            assert manager.resolved_procfile_path() == Path(temp_dir).resolve() / "Procfile.load"
+            
+            # While Overmind runs, the Procfile it was started with is kept
+            manager.socket_path.touch()
+            assert registry.get(temp_dir).procfile_path == Path("Procfile.load")
+            
+            manager.socket_path.unlink()
+            assert registry.get(temp_dir) is manager
+            assert manager.resolved_procfile_path() == Path(temp_dir).resolve() / "Procfile"
+
+    def test_idle_managers_pruned(self):
+        """Test that managers of projects that aren't running don't accumulate."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            dirs = [Path(temp_dir) / str(i) for i in range(5)]
+            for directory in dirs:
+                directory.mkdir()
+            (dirs[0] / ".overmind.sock").touch()
+            
+            registry = ManagerRegistry()
+            with patch('mcp_server_overmind.server.MAX_IDLE_MANAGERS', 2):
+                running = registry.get(str(dirs[0]))
+                for directory in dirs[1:]:
+                    registry.get(str(directory))
+                # Recently used managers survive, e.g. within one batch
+                assert len(registry.managers()) == 5
+                
+                assert registry.prune(now=time.monotonic() + overmind_server.MANAGER_MIN_IDLE + 1) == 2
+                kept = {m.working_dir for m in registry.managers()}
+                # The running project is kept; the least recently used idle ones go
+                assert kept == {dirs[0].resolve(), dirs[3].resolve(), dirs[4].resolve()}
+                assert registry.get(str(dirs[0])) is running
+            
+            assert registry.prune(now=time.monotonic() + overmind_server.MANAGER_IDLE_TIMEOUT + 1) == 2
+            assert registry.managers() == [running]
+
+    @pytest.mark.asyncio
+    async def test_projects_run_in_parallel(self):
+        """Test that operations on different projects don't serialize."""
+        async def slow_control(command, args=None):
+            await asyncio.sleep(0.2)
+            return {"success": True, "stdout": "", "stderr": "", "return_code": 0}
+        
+        with tempfile.TemporaryDirectory() as first, tempfile.TemporaryDirectory() as second:
+            registry = ManagerRegistry()
+            for directory in (first, second):
+                registry.get(directory).is_running = AsyncMock(return_value=True)
+                registry.get(directory).control = slow_control
+            
+            with patch('mcp_server_overmind.server.registry', registry):
+                started = time.monotonic()
+                await asyncio.gather(
+                    overmind_restart("web", working_dir=first),
+                    overmind_restart("web", working_dir=second)
+                )
+                parallel = time.monotonic() - started
+                
+                started = time.monotonic()
+                await asyncio.gather(
+                    overmind_restart("web", working_dir=first),
+                    overmind_restart("worker", working_dir=first)
+                )
+                serialized = time.monotonic() - started
+            
+            assert parallel < 0.35
+            assert serialized >= 0.4
+
 
 class TestOvermindTools:
     """Test the MCP tool functions."""
@@ -121,7 +510,7 @@ class TestOvermindTools:
     @pytest.mark.asyncio
     async def test_overmind_start_already_running(self):
         """Test starting overmind when it's already running."""
-        with patch('mcp_server_overmind.server.overmind_manager') as mock_manager:
+        with patch_manager() as mock_manager:
             mock_manager.is_running.return_value = True
             result = await overmind_start()
             assert "already running" in result
@@ -129,9 +518,9 @@ class TestOvermindTools:
     @pytest.mark.asyncio
     async def test_overmind_start_no_procfile(self):
         """Test starting overmind when Procfile doesn't exist."""
-        with patch('mcp_server_overmind.server.overmind_manager') as mock_manager:
+        with patch_manager() as mock_manager:
             mock_manager.is_running.return_value = False
-            mock_manager.procfile_path.exists.return_value = False
+            mock_manager.resolved_procfile_path.return_value.exists.return_value = False
             result = await overmind_start()
             assert "Procfile not found" in result
 
@@ -145,9 +534,9 @@ class TestOvermindTools:
             "return_code": 0
         }
         
-        with patch('mcp_server_overmind.server.overmind_manager') as mock_manager:
+        with patch_manager() as mock_manager:
             mock_manager.is_running.side_effect = [False, True]  # First call: not running, second call: running
-            mock_manager.procfile_path.exists.return_value = True
+            mock_manager.resolved_procfile_path.return_value.exists.return_value = True
             mock_manager.start_overmind_background = AsyncMock(return_value=mock_result)
             result = await overmind_start()
             assert "successfully" in result
@@ -163,11 +552,13 @@ class TestOvermindTools:
             "return_code": 0
         }
         
-        with patch('mcp_server_overmind.server.OvermindManager') as mock_manager_class:
+        with patch('mcp_server_overmind.server.registry', ManagerRegistry()), \
+                patch('mcp_server_overmind.server.OvermindManager') as mock_manager_class:
             # Create a mock instance
             mock_manager_instance = MagicMock()
-            mock_manager_instance.is_running.side_effect = [False, True]  # First call: not running, second call: running
-            mock_manager_instance.procfile_path.exists.return_value = True
+            mock_manager_instance.is_running = AsyncMock(side_effect=[False, True])  # First call: not running, second call: running
+            mock_manager_instance.resolved_procfile_path.return_value.exists.return_value = True
+            mock_manager_instance.procfile.return_value = None
             mock_manager_instance.start_overmind_background = AsyncMock(return_value=mock_result)
             mock_manager_class.return_value = mock_manager_instance
             
@@ -180,7 +571,7 @@ class TestOvermindTools:
             )
             
             # Verify the manager was created with the right parameters
-            mock_manager_class.assert_called_once_with("/custom/Procfile", None)
+            mock_manager_class.assert_called_once_with("/custom/Procfile", str(Path.cwd().resolve()))
             
             # Verify the command was called
             mock_manager_instance.start_overmind_background.assert_called_once()
@@ -197,10 +588,159 @@ class TestOvermindTools:
             assert "30" in called_command
             assert "-r" in called_command
 
+    @pytest.mark.asyncio
+    async def test_overmind_start_invalid_formation(self):
+        """Test that a bad formation is rejected before anything is spawned."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            (Path(temp_dir) / "Procfile").write_text("web: python app.py\nworker: python worker.py\n")
+            with patch('mcp_server_overmind.server.registry', ManagerRegistry()), \
+                    patch('asyncio.create_subprocess_exec') as spawn:
+                result = await overmind_start(working_dir=temp_dir, formation="web=2,wrker=1")
+                assert "Invalid formation" in result
+                assert "wrker" in result
+                
+                result = await overmind_start(working_dir=temp_dir, formation="web=x")
+                assert "Invalid count for web" in result
+            spawn.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_overmind_restart_unknown_process(self):
+        """Test that restart and stop reject names the Procfile doesn't declare."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            (Path(temp_dir) / "Procfile").write_text("web: python app.py\nworker: python worker.py\n")
+            registry = ManagerRegistry()
+            manager = registry.get(temp_dir)
+            manager.is_running = AsyncMock(return_value=True)
+            manager.control = AsyncMock(return_value={"success": True, "stdout": "", "stderr": "", "return_code": 0})
+            with patch('mcp_server_overmind.server.registry', registry):
+                result = await overmind_restart("web,wokrer", working_dir=temp_dir)
+                assert "Unknown process(es) wokrer" in result
+                result = await overmind_stop("db", working_dir=temp_dir)
+                assert "Unknown process(es) db" in result
+                manager.control.assert_not_called()
+                
+                result = await overmind_restart("web,worker#2", working_dir=temp_dir)
+                assert "restarted successfully" in result
+                manager.control.assert_called_once_with("restart", ["web", "worker#2"])
+
+    def fake_formation(self, manager, names, broken=()):
+        """Simulate scaled instances whose PIDs change when restarted."""
+        pids = {name: 100 + i for i, name in enumerate(names)}
+        restarts = []
+        
+        async def control(command, args=None):
+            restarts.append(list(args))
+            for name in args:
+                pids[name] += 1000
+                if name not in broken:
+                    manager.logs.append(name, "ready")
+            return {"success": True, "stdout": "", "stderr": "", "return_code": 0}
+        
+        async def get_status(max_age=None):
+            return {
+                "success": True, "stdout": "", "stderr": "", "return_code": 0,
+                "processes": [
+                    {"name": name, "pid": pid, "status": "crashed" if name in broken and pid > 1000 else "running"}
+                    for name, pid in pids.items()
+                ],
+            }
+        
+        manager.control = control
+        manager.get_status = get_status
+        return restarts
+
+    @pytest.mark.asyncio
+    async def test_overmind_rolling_restart(self):
+        """Test restarting scaled instances batch by batch."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            (Path(temp_dir) / "Procfile").write_text("# health worker log:ready\nworker: python worker.py\n")
+            registry = ManagerRegistry()
+            manager = registry.get(temp_dir)
+            manager.is_running = AsyncMock(return_value=True)
+            names = ["worker#1", "worker#2", "worker#10", "worker#3"]
+            restarts = self.fake_formation(manager, names)
+            ctx = MagicMock()
+            ctx.report_progress = AsyncMock()
+            
+            with patch('mcp_server_overmind.server.registry', registry):
+                result = await overmind_rolling_restart("worker", batch_size=3, working_dir=temp_dir, ctx=ctx)
+            
+            assert restarts == [["worker#1", "worker#2", "worker#3"], ["worker#10"]]
+            assert "4 instance(s) in batches of 3" in result
+            assert "Batch 1: worker#1, worker#2, worker#3 ready" in result
+            assert "Rolling restart completed: 4/4 instance(s) ready" in result
+            assert ctx.report_progress.await_count == 3
+
+    @pytest.mark.asyncio
+    async def test_overmind_rolling_restart_failure_threshold(self):
+        """Test aborting or rolling forward when a batch doesn't become ready."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            (Path(temp_dir) / "Procfile").write_text("worker: python worker.py\n")
+            registry = ManagerRegistry()
+            manager = registry.get(temp_dir)
+            manager.is_running = AsyncMock(return_value=True)
+            names = ["worker#1", "worker#2", "worker#3", "worker#4"]
+            
+            with patch('mcp_server_overmind.server.registry', registry):
+                restarts = self.fake_formation(manager, names, broken={"worker#2"})
+                result = await overmind_rolling_restart(
+                    "worker", probe="log:ready", ready_timeout=0.1, working_dir=temp_dir
+                )
+                assert restarts == [["worker#1"], ["worker#2"]]
+                assert "worker#2: status crashed" in result
+                assert "not restarted: worker#3, worker#4" in result
+                assert "Rolling restart aborted: 1/4 instance(s) ready, 1 failed" in result
+                
+                restarts = self.fake_formation(manager, names, broken={"worker#2"})
+                result = await overmind_rolling_restart(
+                    "worker", batch_size=2, ready_timeout=0.1, on_failure="continue", working_dir=temp_dir
+                )
+                assert restarts == [["worker#1", "worker#2"], ["worker#3", "worker#4"]]
+                assert "Rolling restart completed: 3/4 instance(s) ready, 1 failed" in result
+                
+                result = await overmind_rolling_restart("wrker", working_dir=temp_dir)
+                assert "Unknown process(es) wrker" in result
+                result = await overmind_rolling_restart("worker", batch_size=0, working_dir=temp_dir)
+                assert "batch_size must be at least 1" in result
+
+    @pytest.mark.asyncio
+    async def test_overmind_rolling_restart_probes_each_instance(self):
+        """Test that $PORT probes check the port of every restarted instance."""
+        server = await asyncio.start_server(lambda r, w: w.close(), "127.0.0.1", 0)
+        port = server.sockets[0].getsockname()[1]
+        try:
+            with tempfile.TemporaryDirectory() as temp_dir:
+                (Path(temp_dir) / "Procfile").write_text("# health web tcp:$PORT\nweb: python app.py\n")
+                (Path(temp_dir) / ".overmind.env").write_text("OVERMIND_FORMATION=web=3\n")
+                registry = ManagerRegistry()
+                manager = registry.get(temp_dir)
+                manager.is_running = AsyncMock(return_value=True)
+                # Only web#2 listens
+                manager.ports = (port - 100, port + 199)
+                self.fake_formation(manager, ["web#1", "web#2", "web#3"])
+                
+                with patch('mcp_server_overmind.server.registry', registry):
+                    result = await overmind_rolling_restart(
+                        "web", ready_timeout=0.2, on_failure="continue", working_dir=temp_dir
+                    )
+                    assert "Batch 2: web#2 ready" in result
+                    assert f"web#1: tcp:127.0.0.1:{port - 100}" in result
+                    assert f"web#3: tcp:127.0.0.1:{port + 100}" in result
+                    assert "1/3 instance(s) ready, 2 failed" in result
+                    
+                    result = await overmind_rolling_restart(
+                        "web", batch_size=3, ready_timeout=0.2, working_dir=temp_dir
+                    )
+                    assert "web#2:" not in result
+                    assert "web#1:" in result and "web#3:" in result
+        finally:
+            server.close()
+            await server.wait_closed()
+
     @pytest.mark.asyncio
     async def test_overmind_stop_not_running(self):
         """Test stopping overmind when it's not running."""
-        with patch('mcp_server_overmind.server.overmind_manager') as mock_manager:
+        with patch_manager() as mock_manager:
             mock_manager.is_running.return_value = False
             result = await overmind_stop()
             assert "not currently running" in result
@@ -215,10 +755,12 @@ class TestOvermindTools:
             "return_code": 0
         }
         
-        with patch('mcp_server_overmind.server.overmind_manager') as mock_manager:
+        with patch_manager() as mock_manager:
             mock_manager.is_running.return_value = True
-            mock_manager.run_command = AsyncMock(return_value=mock_result)
+            mock_manager.procfile.return_value = None
+            mock_manager.control = AsyncMock(return_value=mock_result)
             result = await overmind_stop()
+            mock_manager.control.assert_called_once_with("stop", [])
             assert "successfully" in result
 
     @pytest.mark.asyncio
@@ -231,17 +773,85 @@ class TestOvermindTools:
             "return_code": 0
         }
         
-        with patch('mcp_server_overmind.server.overmind_manager') as mock_manager:
+        with patch_manager() as mock_manager:
             mock_manager.is_running.return_value = True
-            mock_manager.run_command = AsyncMock(return_value=mock_result)
+            mock_manager.get_status = AsyncMock(return_value=mock_result)
             result = await overmind_status()
             assert "Process status:" in result
             assert "web: running" in result
 
+    @pytest.mark.asyncio
+    async def test_overmind_status_cursor(self):
+        """Test that a cursor turns status responses into deltas."""
+        manager = OvermindManager()
+        manager.is_running = AsyncMock(return_value=True)
+        
+        def snapshot(*rows):
+            return {
+                "success": True, "stdout": "table", "stderr": "", "return_code": 0,
+                "processes": [{"name": n, "pid": pid, "status": st} for n, pid, st in rows],
+            }
+        
+        manager.get_status = AsyncMock(return_value=snapshot(("web", 1, "running"), ("worker", 2, "running")))
+        with patch_manager(manager):
+            result = await overmind_status()
+            assert "Process status:\ntable" in result
+            cursor = result.rsplit("Cursor: ", 1)[1]
+            
+            assert await overmind_status(cursor=cursor) == f"No change (cursor {cursor})"
+            
+            manager.get_status.return_value = snapshot(
+                ("web", 1, "running"), ("worker", 3, "crashed"), ("clock", 4, "running")
+            )
+            result = await overmind_status(cursor=cursor)
+            assert result.startswith("Status changed (2 process(es)):")
+            assert "~ worker: running -> crashed (pid 3)" in result
+            assert "+ clock: running (pid 4)" in result
+            assert "web" not in result
+            
+            # Unknown cursors fall back to the full snapshot
+            result = await overmind_status(cursor="bogus")
+            assert "Process status:" in result
+
+    @pytest.mark.asyncio
+    async def test_overmind_echo_cursor(self):
+        """Test returning only output captured after a cursor."""
+        manager = OvermindManager()
+        manager.is_running = AsyncMock(return_value=True)
+        manager.capture = MagicMock()
+        manager.run_id = "run1"
+        manager.control = AsyncMock(return_value={
+            "success": True, "stdout": "web | one", "stderr": "", "return_code": 0
+        })
+        manager.logs.feed("web | one")
+        
+        with patch_manager(manager):
+            result = await overmind_echo()
+            assert "Overmind output:\nweb | one" in result
+            cursor = result.rsplit("Cursor: ", 1)[1]
+            assert cursor == "run1:1"
+            
+            assert await overmind_echo(cursor=cursor) == "No new output (cursor run1:1)"
+            
+            manager.logs.feed("web | two")
+            manager.logs.feed("worker | three")
+            result = await overmind_echo(cursor=cursor)
+            assert result == "2 new line(s):\nweb | two\nworker | three\n\nCursor: run1:3"
+            manager.control.assert_called_once()
+            
+            assert "Invalid cursor" in await overmind_echo(cursor="abc")
+            
+            # A cursor from an earlier run starts over with the full output
+            manager.run_id = "run2"
+            result = await overmind_echo(cursor="run1:3")
+            assert result.startswith("Cursor is from an earlier run")
+            assert result.endswith("Cursor: run2:3")
+            assert manager.control.call_count == 2
+
     @pytest.mark.asyncio
     async def test_overmind_connect(self):
         """Test overmind connect (provides instructions)."""
-        with patch('mcp_server_overmind.server.overmind_manager') as mock_manager:
+        with patch_manager() as mock_manager:
             mock_manager.is_running.return_value = True
             result = await overmind_connect("web")
             assert "overmind connect web" in result
@@ -254,17 +864,19 @@ class TestOvermindTools:
             "success": True,
             "stdout": "command output",
             "stderr": "",
-            "return_code": 0
+            "return_code": 0,
+            "timed_out": False,
+            "truncated": False
         }
         
-        with patch('mcp_server_overmind.server.overmind_manager') as mock_manager:
+        with patch_manager() as mock_manager:
             mock_manager.is_running.return_value = True
-            mock_manager.run_command = AsyncMock(return_value=mock_result)
+            mock_manager.stream_command = AsyncMock(return_value=mock_result)
             result = await overmind_run("ls -la", "web")
             
             # Verify command structure
-            mock_manager.run_command.assert_called_once()
-            called_command = mock_manager.run_command.call_args[0][0]
+            mock_manager.stream_command.assert_called_once()
+            called_command = mock_manager.stream_command.call_args[0][0]
             assert "overmind" in called_command
             assert "run" in called_command
             assert "-p" in called_command
@@ -274,6 +886,30 @@ class TestOvermindTools:
             assert "successfully" in result
             assert "command output" in result
 
+    @pytest.mark.asyncio
+    async def test_overmind_run_reports_progress(self):
+        """Test that partial output is sent as progress notifications."""
+        async def stream_command(command, timeout, max_output_bytes, on_output):
+            await on_output("stdout", b"partial line\n")
+            return {
+                "success": False,
+                "stdout": "partial line",
+                "stderr": "Command timed out after 1 seconds",
+                "return_code": -9,
+                "timed_out": True,
+                "truncated": False
+            }
+        
+        ctx = MagicMock()
+        ctx.report_progress = AsyncMock()
+        with patch_manager() as mock_manager:
+            mock_manager.is_running.return_value = True
+            mock_manager.stream_command = stream_command
+            result = await overmind_run("tail -f log", timeout=1, ctx=ctx)
+        
+        ctx.report_progress.assert_called_once_with(13, message="partial line\n")
+        assert "timed out" in result
+
     @pytest.mark.asyncio
     async def test_overmind_check_procfile_exists(self):
         """Test checking for an existing Procfile."""
@@ -285,6 +921,8 @@ class TestOvermindTools:
             result = await overmind_check_procfile(str(temp_path))
             assert "Procfile found" in result
             assert "web: python app.py" in result
+            assert "Processes (2):" in result
+            assert "- worker (x1): python worker.py" in result
 
     @pytest.mark.asyncio
     async def test_overmind_check_procfile_not_exists(self):
@@ -296,9 +934,9 @@ class TestOvermindTools:
     @pytest.mark.asyncio
     async def test_overmind_is_running_true(self):
         """Test checking if overmind is running (true case)."""
-        with patch('mcp_server_overmind.server.overmind_manager') as mock_manager:
+        with patch_manager() as mock_manager:
             mock_manager.is_running.return_value = True
-            mock_manager.socket_path = Path("/test/.overmind.sock")
+            mock_manager.socket_path.exists.return_value = True
             result = await overmind_is_running()
             assert "is running" in result
             assert "socket found" in result
@@ -306,7 +944,7 @@ class TestOvermindTools:
     @pytest.mark.asyncio
     async def test_overmind_is_running_false(self):
         """Test checking if overmind is running (false case)."""
-        with patch('mcp_server_overmind.server.overmind_manager') as mock_manager:
+        with patch_manager() as mock_manager:
             mock_manager.is_running.return_value = False
             mock_manager.socket_path = Path("/test/.overmind.sock")
             result = await overmind_is_running()
@@ -317,14 +955,27 @@ class TestOvermindTools:
     async def test_overmind_is_running_custom_dir(self):
         """Test checking if overmind is running in custom directory."""
         with tempfile.TemporaryDirectory() as temp_dir:
-            # Create socket file in temp directory
+            # Listen on the control socket path in temp directory
             socket_file = Path(temp_dir) / ".overmind.sock"
-            socket_file.touch()
-            
-            result = await overmind_is_running(temp_dir)
+            server = await asyncio.start_unix_server(lambda r, w: w.close(), str(socket_file))
+            try:
+                result = await overmind_is_running(temp_dir)
+            finally:
+                server.close()
+                await server.wait_closed()
             assert "is running" in result
             assert temp_dir in result
 
+    @pytest.mark.asyncio
+    async def test_overmind_is_running_stale_socket(self):
+        """Test that a socket file nobody listens on is reported as stale."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            (Path(temp_dir) / ".overmind.sock").touch()
+            with patch('mcp_server_overmind.server.registry', ManagerRegistry()):
+                result = await overmind_is_running(temp_dir)
+            assert "is not running" in result
+            assert "stale socket" in result
+
     @pytest.mark.asyncio
     async def test_overmind_find_procfiles(self):
         """Test finding Procfiles in directory."""
@@ -346,4 +997,543 @@ class TestOvermindTools:
         """Test finding Procfiles when none exist."""
         with tempfile.TemporaryDirectory() as temp_dir:
             result = await overmind_find_procfiles(temp_dir)
-            assert "No Procfiles found" in result 
\ No newline at end of file
+            assert "No Procfiles found" in result 
+
+    @pytest.mark.asyncio
+    async def test_overmind_logs_not_captured(self):
+        """Test overmind_logs when Overmind wasn't started by this server."""
+        with patch_manager() as mock_manager:
+            mock_manager.capture = None
+            result = await overmind_logs()
+            assert "No output captured" in result
+
+    @pytest.mark.asyncio
+    async def test_overmind_logs(self):
+        """Test serving captured output from memory."""
+        manager = OvermindManager()
+        manager.capture = LogCapture(manager.logs)
+        manager.logs.feed("web | listening")
+        manager.logs.feed("worker | job 1")
+        
+        with patch_manager(manager):
+            result = await overmind_logs("web")
+            assert "web | listening" in result
+            assert "job 1" not in result
+            assert "Warning" not in result
+            
+            manager.capture.listener_errors["LogHistory.append"] = 3
+            manager.capture.last_listener_error = "LogHistory.append: OSError: disk full"
+            result = await overmind_logs("web")
+            assert "Warning: Captured lines failed to reach LogHistory.append x3" in result
+
+    @pytest.mark.asyncio
+    async def test_overmind_query_logs(self):
+        """Test querying structured records parsed from captured output."""
+        manager = OvermindManager()
+        manager.capture = LogCapture(manager.logs)
+        for raw in (
+            "logger | [LOGGER] 2024-05-01 12:00:00 [ERROR] database: Query failed",
+            "logger | [LOGGER] 2024-05-01 12:00:01 [INFO] api: Request processed",
+            "worker | [WORKER] 2024-05-01 12:00:02 [ERROR] jobs: Job crashed",
+            "web    | Listening on 8000",
+        ):
+            manager.records.add_line(manager.logs.feed(raw))
+        
+        with patch_manager(manager):
+            result = await overmind_query_logs(process="logger", level="ERROR", since=600)
+            assert "1 matching record(s)" in result
+            assert "logger ERROR database: Query failed" in result
+            
+            result = await overmind_query_logs(level="error,info")
+            assert "3 matching record(s)" in result
+            
+            result = await overmind_query_logs(component="nope")
+            assert "No matching records (3 structured records captured)" in result
+
+    @pytest.mark.asyncio
+    async def test_overmind_log_history(self):
+        """Test reading persisted output from a past window."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            manager = OvermindManager(working_dir=temp_dir)
+            with patch_manager(manager):
+                assert "No output history" in await overmind_log_history()
+                
+                now = time.time()
+                history = manager.log_history()
+                history.append(manager.logs.append("web", "two hours ago", now - 7200))
+                history.append(manager.logs.append("worker", "an hour ago", now - 3600))
+                history.append(manager.logs.append("web", "just now", now))
+                
+                result = await overmind_log_history(since=7300, until=3000)
+                assert "2 line(s)" in result
+                assert "web | two hours ago" in result
+                assert "worker | an hour ago" in result
+                assert "just now" not in result
+                
+                result = await overmind_log_history(since=60, process="web")
+                assert "web | just now" in result
+                assert "Warning" not in result
+                assert (Path(temp_dir) / ".overmind-mcp" / "logs").is_dir()
+                
+                # Lines the history failed to store are reported
+                manager.capture = LogCapture(manager.logs)
+                manager.capture.add_listener(MagicMock(side_effect=OSError("No space left on device"), __qualname__="LogHistory.append"))
+                manager.capture._emit(b"web | lost", "stdout")
+                result = await overmind_log_history(since=60, process="web")
+                assert "Warning: Captured lines failed to reach LogHistory.append x1" in result
+                assert "No space left on device" in result
+                history.close()
+            
+            with patch.dict(os.environ, {"OVERMIND_MCP_HISTORY": "0"}), patch_manager(OvermindManager(working_dir=temp_dir)):
+                assert "disabled" in await overmind_log_history()
+
+
+    @pytest.mark.asyncio
+    async def test_overmind_metrics(self):
+        """Test reporting sampled process metrics."""
+        manager = OvermindManager()
+        manager.is_running = AsyncMock(return_value=True)
+        manager.metrics.series = {}
+        manager.metrics.start = MagicMock()
+        
+        async def sample():
+            manager.metrics.series.setdefault("web", MetricSeries()).append(time.time(), 12.5, 50 * 1024 * 1024)
+            manager.metrics.pids["web"] = [123, 124]
+            return True
+        manager.metrics.sample = sample
+        
+        with patch_manager(manager), \
+                patch('mcp_server_overmind.server.METRICS_PRIME_DELAY', 0):
+            result = await overmind_metrics("web")
+        
+        manager.metrics.start.assert_called_once()
+        assert "web (PIDs: 123, 124)" in result
+        assert "CPU: 12.5%" in result
+        assert "Memory: 50.0 MiB" in result
+
+    @pytest.mark.asyncio
+    @pytest.mark.skipif(not metrics_supported(), reason="requires /proc")
+    async def test_overmind_metrics_first_call_reports_cpu(self):
+        """Test that the first call already reports the CPU usage of a busy process."""
+        busy = subprocess.Popen([sys.executable, "-c", "while True: pass"])
+        try:
+            manager = OvermindManager()
+            manager.is_running = AsyncMock(return_value=True)
+            manager.process_pids = AsyncMock(return_value={"busy": busy.pid})
+            manager.metrics = MetricsSampler(manager.process_pids)
+            
+            with patch_manager(manager), \
+                    patch('mcp_server_overmind.server.METRICS_PRIME_DELAY', 0.3):
+                result = await overmind_metrics("busy")
+            await manager.metrics.stop()
+            
+            cpu = float(result.split("CPU: ", 1)[1].split("%", 1)[0])
+            assert cpu > 10
+            # The baseline sample has no CPU usage and isn't summarized
+            assert "Samples: 1" in result
+            assert float(result.split("(min ", 1)[1].split("%", 1)[0]) > 10
+        finally:
+            busy.kill()
+            busy.wait()
+
+    @pytest.mark.asyncio
+    async def test_overmind_health_port_placeholder(self):
+        """Test resolving $PORT in probes from the project's port range."""
+        server = await asyncio.start_server(lambda r, w: w.close(), "127.0.0.1", 0)
+        port = server.sockets[0].getsockname()[1]
+        try:
+            with tempfile.TemporaryDirectory() as temp_dir:
+                (Path(temp_dir) / "Procfile").write_text(
+                    "# health worker tcp:$PORT\nweb: python app.py\nworker: python worker.py\n"
+                )
+                registry = ManagerRegistry()
+                registry.get(temp_dir).ports = (port - 100, port + 99)
+                with patch('mcp_server_overmind.server.registry', registry):
+                    result = await overmind_health(working_dir=temp_dir)
+                assert f"OK worker tcp:127.0.0.1:{port}" in result
+                
+                # Each instance of a scaled process is probed on its own port
+                (Path(temp_dir) / ".overmind.env").write_text("OVERMIND_FORMATION=worker=2\n")
+                with patch('mcp_server_overmind.server.registry', registry):
+                    result = await overmind_health(working_dir=temp_dir)
+                assert f"OK worker#1 tcp:127.0.0.1:{port}" in result
+                assert f"FAIL worker#2 tcp:127.0.0.1:{port + 100}" in result
+        finally:
+            server.close()
+            await server.wait_closed()
+
+    @pytest.mark.asyncio
+    async def test_overmind_health(self):
+        """Test running declared and ad-hoc probes."""
+        server = await asyncio.start_server(lambda r, w: w.close(), "127.0.0.1", 0)
+        port = server.sockets[0].getsockname()[1]
+        try:
+            with tempfile.TemporaryDirectory() as temp_dir:
+                (Path(temp_dir) / "Procfile").write_text(
+                    f"# health web tcp:{port}\nweb: python app.py\n"
+                )
+                with patch('mcp_server_overmind.server.registry', ManagerRegistry()):
+                    result = await overmind_health(
+                        probes={"worker": "log:ready"}, working_dir=temp_dir
+                    )
+                    assert "Health: 1/2 probe(s) passing" in result
+                    assert f"OK web tcp:127.0.0.1:{port}" in result
+                    assert "FAIL worker log:ready" in result
+                    
+                    result = await overmind_health(process="nope", working_dir=temp_dir)
+                    assert "No health probes declared for process 'nope'" in result
+        finally:
+            server.close()
+    
+    @pytest.mark.asyncio
+    async def test_overmind_server_stats(self):
+        """Test that tool calls, spawns and output are reported per tool."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            # A stand-in overmind that echoes its arguments
+            fake = Path(temp_dir) / "overmind"
+            fake.write_text('#!/bin/sh\necho "$@"\n')
+            fake.chmod(0o755)
+            manager = OvermindManager(working_dir=temp_dir)
+            manager.socket_path.touch()
+            manager.is_running = AsyncMock(return_value=True)
+            await overmind_server_stats(reset=True)
+            path = f"{temp_dir}{os.pathsep}{os.environ.get('PATH', '')}"
+            with patch_manager(manager), patch.dict(os.environ, {"PATH": path}):
+                await overmind_run("true", working_dir=temp_dir)
+                await overmind_is_running()
+            
+            result = await overmind_server_stats(tool="overmind_run")
+            assert "overmind_is_running" not in result
+            line = next(l for l in result.splitlines() if l.startswith("overmind_run"))
+            calls, errors = line.split()[1:3]
+            spawns = line.split()[6]
+            assert (calls, errors, spawns) == ("1", "0", "1")
+            
+            result = await overmind_server_stats(reset=True)
+            assert "overmind_is_running" in result
+            assert await overmind_server_stats() == "No tool calls recorded yet"
+
+class TestStatusResource:
+    """Test the subscribable status resource."""
+
+    def test_subscriptions_advertised(self):
+        """Test that clients are told they can subscribe to resources."""
+        options = overmind_server.mcp._mcp_server.create_initialization_options()
+        assert options.capabilities.resources.subscribe is True
+
+    @pytest.mark.asyncio
+    async def test_read_and_publish(self):
+        """Test reading the resource and notifying subscribed sessions."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            registry = ManagerRegistry()
+            manager = registry.get(temp_dir)
+            uri = status_resource_uri(manager.working_dir)
+            assert uri.startswith("overmind://status/%2F")
+            session = MagicMock()
+            session.send_resource_updated = AsyncMock()
+            
+            with patch('mcp_server_overmind.server.registry', registry), \
+                    patch.dict(overmind_server.subscriptions, {uri: {session}}):
+                try:
+                    contents = await overmind_server.mcp.read_resource(uri)
+                    state = json.loads(contents[0].content)
+                    assert state["running"] is False
+                    assert state["working_dir"] == str(manager.working_dir)
+                    # Reading alone checks once and leaves no watcher running
+                    assert not manager.watcher.active
+                    session.send_resource_updated.assert_not_called()
+                    
+                    server = await asyncio.start_unix_server(
+                        lambda r, w: w.close(), str(manager.socket_path)
+                    )
+                    manager.get_status = AsyncMock(return_value={
+                        "success": True, "stdout": "", "stderr": "", "return_code": 0,
+                        "processes": [{"name": "web", "pid": 1, "status": "running"}],
+                    })
+                    try:
+                        contents = await overmind_server.mcp.read_resource(uri)
+                    finally:
+                        server.close()
+                        await server.wait_closed()
+                    state = json.loads(contents[0].content)
+                    assert state["running"] is True
+                    assert state["processes"] == {"web": "running"}
+                    session.send_resource_updated.assert_called_with(uri)
+                finally:
+                    await manager.watcher.stop()
+
+class TestStartStopAll:
+    """Test the overmind_start_all and overmind_stop_all tools."""
+
+    @staticmethod
+    def make_projects(root, *process_counts):
+        dirs = []
+        for i, count in enumerate(process_counts):
+            project = Path(root) / f"svc{i}"
+            project.mkdir()
+            (project / "Procfile").write_text(
+                "".join(f"p{n}: python -u p{n}.py\n" for n in range(count))
+            )
+            dirs.append(project)
+        return dirs
+
+    def test_allocate_ports(self):
+        """Test that port blocks are packed and skip ranges in use."""
+        assert overmind_server._allocate_ports([200, 300], 5000, []) == [5000, 5200]
+        assert overmind_server._allocate_ports([200, 100], 5000, [(5100, 5150)]) == [5200, 5400]
+        with pytest.raises(ValueError):
+            overmind_server._allocate_ports([100000], 5000, [])
+
+    @pytest.mark.asyncio
+    async def test_start_all_concurrently_with_ports(self):
+        """Test that projects start in parallel with non-overlapping ports."""
+        commands = {}
+        
+        async def start_background(self, command, ready_timeout):
+            commands[self.working_dir.name] = command
+            await asyncio.sleep(0.2)
+            return {"success": True, "stdout": "", "stderr": "", "return_code": 0}
+        
+        with tempfile.TemporaryDirectory() as temp_dir:
+            dirs = self.make_projects(temp_dir, 2, 3, 1)
+            with patch('mcp_server_overmind.server.registry', ManagerRegistry()), \
+                 patch.object(OvermindManager, 'start_overmind_background', start_background):
+                started = time.monotonic()
+                result = await overmind_start_all(start_path=temp_dir)
+                elapsed = time.monotonic() - started
+        
+        assert elapsed < 0.5
+        assert "Started 3 of 3 project(s)" in result
+        assert commands["svc0"][-2:] == ["-p", "5000"]
+        assert commands["svc1"][-2:] == ["-p", "5200"]
+        assert commands["svc2"][-2:] == ["-p", "5500"]
+        assert f"[ok] {dirs[1].resolve()} (ports 5200-5499" in result
+
+    @pytest.mark.asyncio
+    async def test_start_all_concurrency_limit_and_failures(self):
+        """Test the concurrency limit and per-project failure reporting."""
+        running = []
+        peak = []
+        
+        async def start_background(self, command, ready_timeout):
+            running.append(1)
+            peak.append(len(running))
+            await asyncio.sleep(0.02)
+            running.pop()
+            if self.working_dir.name == "svc1":
+                return {"success": False, "stdout": "", "stderr": "port in use", "return_code": 1}
+            return {"success": True, "stdout": "", "stderr": "", "return_code": 0}
+        
+        with tempfile.TemporaryDirectory() as temp_dir:
+            dirs = self.make_projects(temp_dir, 1, 1, 1, 1)
+            with patch('mcp_server_overmind.server.registry', ManagerRegistry()), \
+                 patch.object(OvermindManager, 'start_overmind_background', start_background):
+                result = await overmind_start_all(
+                    working_dirs=",".join(str(d) for d in dirs), concurrency=2
+                )
+        
+        assert max(peak) == 2
+        assert "Started 3 of 4 project(s)" in result
+        assert "1 failed" in result
+        assert "port in use" in result
+
+    @pytest.mark.asyncio
+    async def test_start_all_skips_running_projects(self):
+        """Test that running projects keep their ports and aren't restarted."""
+        start_background = AsyncMock(return_value={"success": True, "stdout": "", "stderr": "", "return_code": 0})
+        
+        with tempfile.TemporaryDirectory() as temp_dir:
+            dirs = self.make_projects(temp_dir, 1, 1)
+            registry = ManagerRegistry()
+            running = registry.get(str(dirs[0]))
+            running.is_running = AsyncMock(return_value=True)
+            # Started elsewhere, so its ports are unknown and the default range is reserved
+            assert running.ports is None
+            with patch('mcp_server_overmind.server.registry', registry), \
+                 patch.object(OvermindManager, 'start_overmind_background', start_background):
+                result = await overmind_start_all(start_path=temp_dir)
+        
+        assert start_background.call_count == 1
+        assert start_background.call_args.args[0][-2:] == ["-p", "5100"]
+        assert f"[already running] {dirs[0].resolve()}" in result
+
+    def test_port_range_defaults(self):
+        """Test the port range assumed for projects started without -p."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            (Path(temp_dir) / "Procfile").write_text("web: python app.py\nworker: python worker.py\n")
+            manager = OvermindManager(working_dir=temp_dir)
+            with patch.dict(os.environ):
+                os.environ.pop("OVERMIND_PORT", None)
+                assert overmind_server._port_range(manager) == (5000, 5199)
+                
+                (Path(temp_dir) / ".overmind.env").write_text("OVERMIND_PORT=6000\n")
+                assert overmind_server._port_range(manager) == (6000, 6199)
+                
+                os.environ["OVERMIND_PORT"] = "7000"
+                assert overmind_server._port_range(manager) == (7000, 7199)
+            
+            manager.ports = (8000, 8199)
+            assert overmind_server._port_range(manager) == (8000, 8199)
+
+    @pytest.mark.asyncio
+    async def test_overmind_start_records_default_ports(self):
+        """Test that starting without a port records the range Overmind picks."""
+        start_background = AsyncMock(return_value={"success": True, "stdout": "", "stderr": "", "return_code": 0})
+        with tempfile.TemporaryDirectory() as temp_dir:
+            (Path(temp_dir) / "Procfile").write_text("web: python app.py\n")
+            (Path(temp_dir) / ".overmind.env").write_text("OVERMIND_PORT=6000\n")
+            registry = ManagerRegistry()
+            with patch('mcp_server_overmind.server.registry', registry), \
+                 patch.object(OvermindManager, 'start_overmind_background', start_background), \
+                 patch.dict(os.environ):
+                os.environ.pop("OVERMIND_PORT", None)
+                result = await overmind_start(working_dir=temp_dir)
+                assert "started successfully" in result
+                assert registry.get(temp_dir).ports == (6000, 6099)
+
+    @pytest.mark.asyncio
+    async def test_start_all_without_projects(self):
+        """Test discovery that finds nothing."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            assert "No projects" in await overmind_start_all(start_path=temp_dir)
+        assert "does not exist" in await overmind_start_all(start_path="/nonexistent/path")
+
+    @pytest.mark.asyncio
+    async def test_stop_all_running_projects(self):
+        """Test that stop_all quits every running project it knows about."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            dirs = self.make_projects(temp_dir, 1, 1, 1)
+            registry = ManagerRegistry()
+            managers = [registry.get(str(d)) for d in dirs]
+            for manager in managers[:2]:
+                manager.is_running = AsyncMock(return_value=True)
+                manager.control = AsyncMock(return_value={"success": True, "stdout": "", "stderr": "", "return_code": 0})
+            managers[1].control.return_value = {"success": False, "stdout": "", "stderr": "timeout", "return_code": 1}
+            with patch('mcp_server_overmind.server.registry', registry):
+                result = await overmind_stop_all()
+                assert "Stopped 1 of 2 project(s)" in result
+                assert "Failed to quit Overmind: timeout" in result
+                managers[0].control.assert_awaited_once_with("quit")
+                
+                result = await overmind_stop_all(working_dirs=str(dirs[2]), kill=True)
+                assert f"[not running] {dirs[2].resolve()}" in result
+
+
+class TestOvermindBatch:
+    """Test the overmind_batch tool."""
+
+    @staticmethod
+    def recording_handler(events, delay=0.1):
+        async def handler(**kwargs):
+            name = kwargs.get("processes") or kwargs.get("command")
+            events.append(("start", name))
+            await asyncio.sleep(delay)
+            events.append(("end", name))
+            return f"done {name}"
+        return handler
+
+    @pytest.mark.asyncio
+    async def test_independent_operations_run_concurrently(self):
+        """Test that independent operations overlap."""
+        events = []
+        handler = self.recording_handler(events, delay=0.2)
+        with patch.dict('mcp_server_overmind.server.BATCH_HANDLERS', {"restart": handler}):
+            started = time.monotonic()
+            result = await overmind_batch([
+                {"op": "restart", "processes": "web", "working_dir": "/a"},
+                {"op": "restart", "processes": "worker", "working_dir": "/b"},
+            ])
+            elapsed = time.monotonic() - started
+        
+        assert elapsed < 0.35
+        assert "Batch completed: 2 operation(s)" in result
+        assert "[1] restart in /a" in result
+        assert "done worker" in result
+
+    @pytest.mark.asyncio
+    async def test_dependencies_are_ordered(self):
+        """Test that dependent operations wait for their dependencies."""
+        events = []
+        handler = self.recording_handler(events, delay=0.05)
+        with patch.dict('mcp_server_overmind.server.BATCH_HANDLERS',
+                        {"restart": handler, "run": handler}):
+            await overmind_batch([
+                {"op": "run", "id": "migrate", "command": "migrate", "depends_on": ["web"]},
+                {"op": "restart", "id": "web", "processes": "web"},
+            ])
+        
+        assert events.index(("end", "web")) < events.index(("start", "migrate"))
+
+    @pytest.mark.asyncio
+    async def test_concurrency_limit(self):
+        """Test that no more than the limit run at once."""
+        running = []
+        peak = []
+        
+        async def handler(**kwargs):
+            running.append(1)
+            peak.append(len(running))
+            await asyncio.sleep(0.02)
+            running.pop()
+            return "ok"
+        
+        with patch.dict('mcp_server_overmind.server.BATCH_HANDLERS', {"status": handler}):
+            await overmind_batch([{"op": "status"} for _ in range(6)], concurrency=2)
+        
+        assert max(peak) == 2
+
+    @pytest.mark.asyncio
+    async def test_errors_reported_per_operation(self):
+        """Test that one failing operation doesn't hide the others."""
+        async def handler(working_dir=None):
+            return "ok"
+        
+        with patch.dict('mcp_server_overmind.server.BATCH_HANDLERS', {"status": handler}):
+            result = await overmind_batch([{"op": "status"}, {"op": "status", "bogus": 1}])
+        
+        assert "1 failed" in result
+        assert "[1] status in default project" in result
+        assert "Error:" in result
+
+    @pytest.mark.asyncio
+    async def test_failed_output_skips_dependents(self):
+        """Test that failure messages count as failures and skip dependent operations."""
+        events = []
+        
+        async def restart(**kwargs):
+            events.append("restart")
+            return "Overmind is not currently running. Use overmind_start first."
+        
+        async def run(**kwargs):
+            events.append(kwargs["command"])
+            return "Command executed successfully.\nOutput:\n"
+        
+        with patch.dict('mcp_server_overmind.server.BATCH_HANDLERS', {"restart": restart, "run": run}):
+            result = await overmind_batch([
+                {"op": "restart", "id": "web", "processes": "web"},
+                {"op": "run", "id": "migrate", "command": "migrate", "depends_on": ["web"]},
+                {"op": "run", "id": "seed", "command": "seed", "depends_on": ["migrate"]},
+                {"op": "run", "id": "other", "command": "other"},
+            ])
+        
+        assert events.count("restart") == 1
+        assert "migrate" not in events and "seed" not in events
+        assert "other" in events
+        assert result.startswith("Batch completed: 4 operation(s), 1 failed, 2 skipped")
+        assert "Skipped: depends on unsuccessful operation(s) web" in result
+        assert "Skipped: depends on unsuccessful operation(s) migrate" in result
+
+    @pytest.mark.asyncio
+    async def test_invalid_batches(self):
+        """Test validation of operation names and dependencies."""
+        assert "unknown op" in await overmind_batch([{"op": "explode"}])
+        assert "unknown operation" in await overmind_batch([{"op": "status", "depends_on": ["x"]}])
+        assert "must be a list" in await overmind_batch([
+            {"op": "status", "id": "ab"},
+            {"op": "status", "depends_on": "ab"},
+        ])
+        assert "cycle" in await overmind_batch([
+            {"op": "status", "id": "a", "depends_on": ["b"]},
+            {"op": "status", "id": "b", "depends_on": ["a"]},
+        ])
+        assert "unique" in await overmind_batch([{"op": "status", "id": 1}, {"op": "status"}, {"op": "status", "id": "2"}])
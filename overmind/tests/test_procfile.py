@@ -0,0 +1,119 @@
+"""Tests for the parsed Procfile model and cache."""
+
+import os
+import tempfile
+import pytest
+from pathlib import Path
+
+from mcp_server_overmind.procfile import ProcfileCache, parse_formation, parse_procfile
+
+
+PROCFILE = """\
+# health web tcp:8000
+web: bundle exec puma -p $PORT -e ${RAILS_ENV:-development}
+worker: bundle exec sidekiq
+
+not a declaration
+worker: duplicate
+"""
+
+
+class TestParseProcfile:
+    """Test cases for parsing Procfile text."""
+
+    def test_entries(self):
+        model = parse_procfile(PROCFILE, Path("Procfile"))
+        assert model.names == ["web", "worker"]
+        web = model.get("web")
+        assert web.command.startswith("bundle exec puma")
+        assert web.line == 2
+        assert web.env_refs == ("PORT", "RAILS_ENV")
+        assert model.get("worker").env_refs == ()
+        assert model.get("nope") is None
+
+    def test_probes_and_warnings(self):
+        model = parse_procfile(PROCFILE, Path("Procfile"))
+        assert [p.spec for p in model.probes] == ["tcp:127.0.0.1:8000"]
+        assert any("line 5" in w for w in model.warnings)
+        assert any("duplicate process worker" in w for w in model.warnings)
+
+    def test_formation_defaults(self):
+        model = parse_procfile(PROCFILE, Path("Procfile"))
+        assert model.formation == {"web": 1, "worker": 1}
+
+        model = parse_procfile(PROCFILE, Path("Procfile"), {"OVERMIND_FORMATION": "all=2,worker=0,ghost=1"})
+        assert model.formation == {"web": 2, "worker": 0}
+        assert any("unknown process ghost" in w for w in model.warnings)
+
+    def test_port_option(self):
+        assert parse_procfile(PROCFILE, Path("Procfile")).port is None
+        assert parse_procfile(PROCFILE, Path("Procfile"), {"OVERMIND_PORT": "3000"}).port == 3000
+
+        model = parse_procfile(PROCFILE, Path("Procfile"), {"OVERMIND_PORT": "http"})
+        assert model.port is None
+        assert any("invalid OVERMIND_PORT" in w for w in model.warnings)
+
+    def test_check_processes(self):
+        model = parse_procfile(PROCFILE, Path("Procfile"))
+        assert model.check_processes(["web", "worker#2", "w*"]) is None
+        error = model.check_processes(["web", "wrker", "x*"])
+        assert "Unknown process(es) wrker, x*" in error
+        assert "declares: web, worker" in error
+
+    def test_check_formation(self):
+        model = parse_procfile(PROCFILE, Path("Procfile"))
+        assert model.check_formation("web=2, worker=0") is None
+        assert model.check_formation("all=3") is None
+        assert "unknown process(es) wrker" in model.check_formation("web=2,wrker=1")
+        assert "Invalid count" in model.check_formation("web=two")
+        assert "expected name=count" in model.check_formation("web")
+
+
+class TestParseFormation:
+    """Test cases for formation strings."""
+
+    def test_parse(self):
+        assert parse_formation("web=2,worker=0,") == {"web": 2, "worker": 0}
+
+    def test_invalid(self):
+        with pytest.raises(ValueError):
+            parse_formation("web=-1")
+        with pytest.raises(ValueError):
+            parse_formation("=2")
+
+
+class TestProcfileCache:
+    """Test cases for the stat-keyed cache."""
+
+    def test_cache_and_invalidation(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = Path(temp_dir) / "Procfile"
+            path.write_text("web: python app.py\n")
+            cache = ProcfileCache()
+
+            first = cache.load(path)
+            assert cache.load(path) is first
+            assert cache.parsed == 1
+
+            path.write_text("web: python app.py\nworker: python worker.py\n")
+            assert cache.load(path).names == ["web", "worker"]
+            assert cache.parsed == 2
+
+            # Changing .overmind.env also invalidates the model
+            (Path(temp_dir) / ".overmind.env").write_text("OVERMIND_FORMATION=worker=3\n")
+            assert cache.load(path).formation == {"web": 1, "worker": 3}
+
+            path.unlink()
+            assert cache.load(path) is None
+
+    def test_same_size_rewrite(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = Path(temp_dir) / "Procfile"
+            path.write_text("web: python a.py\n")
+            cache = ProcfileCache()
+            cache.load(path)
+
+            path.write_text("api: python a.py\n")
+            stat = path.stat()
+            os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+            assert cache.load(path).names == ["api"]
@@ -0,0 +1,98 @@
+"""Tests for the structured log record store."""
+
+import time
+import pytest
+
+from mcp_server_overmind.logs import LogLine
+from mcp_server_overmind.records import LogRecord, RecordStore, parse_record
+
+
+def make_record(seq, process="worker", level="INFO", component="db", message="ok", timestamp=None):
+    return LogRecord(seq, timestamp if timestamp is not None else time.time(), process, level, component, message, None)
+
+
+class TestParseRecord:
+    """Test cases for parsing structured lines."""
+
+    def test_logger_format(self):
+        line = LogLine(7, 100.0, "logger", "[LOGGER] 2024-05-01 12:00:00 [ERROR] database: Query failed")
+        record = parse_record(line)
+        assert record.seq == 7
+        assert record.process == "logger"
+        assert record.level == "ERROR"
+        assert record.component == "database"
+        assert record.message == "Query failed"
+        assert record.logged_at is not None
+
+    def test_optional_parts_and_aliases(self):
+        record = parse_record(LogLine(1, 0.0, "web", "[warning] disk almost full"))
+        assert record.level == "WARN"
+        assert record.component is None
+        assert record.message == "disk almost full"
+
+    def test_unstructured_line(self):
+        assert parse_record(LogLine(1, 0.0, "web", "Listening on 8000")) is None
+        assert parse_record(LogLine(1, 0.0, "web", "[LOGGER] Shutting down logging service...")) is None
+
+
+class TestRecordStore:
+    """Test cases for the indexed record store."""
+
+    def test_query_by_level_and_process(self):
+        store = RecordStore()
+        store.add(make_record(1, "worker", "ERROR", message="a"))
+        store.add(make_record(2, "web", "ERROR", message="b"))
+        store.add(make_record(3, "worker#2", "INFO", message="c"))
+        store.add(make_record(4, "worker#2", "ERROR", message="d"))
+
+        records = store.query(process="worker", levels=["error"])
+        assert [r.message for r in records] == ["a", "d"]
+        assert [r.message for r in store.query(levels=["ERROR", "INFO"])] == ["a", "b", "c", "d"]
+        assert [r.message for r in store.query(process="worker#2")] == ["c", "d"]
+        assert store.levels() == {"ERROR": 3, "INFO": 1}
+        assert store.processes() == ["web", "worker", "worker#2"]
+
+    def test_query_filters_and_limit(self):
+        store = RecordStore()
+        for i in range(10):
+            store.add(make_record(i, component="db" if i % 2 else "cache", message=f"msg {i}"))
+
+        assert [r.message for r in store.query(limit=3)] == ["msg 7", "msg 8", "msg 9"]
+        assert [r.seq for r in store.query(component="db", limit=2)] == [7, 9]
+        assert [r.seq for r in store.query(contains="msg 4")] == [4]
+        assert store.query(limit=0) == []
+
+    def test_query_since_uses_time_index(self):
+        store = RecordStore(bucket_seconds=60)
+        now = time.time()
+        store.add(make_record(1, level="ERROR", timestamp=now - 3600))
+        store.add(make_record(2, level="ERROR", timestamp=now - 1200))
+        store.add(make_record(3, level="ERROR", timestamp=now - 30))
+        store.add(make_record(4, level="INFO", timestamp=now - 10))
+
+        assert [r.seq for r in store.query(since=600)] == [3, 4]
+        assert [r.seq for r in store.query(levels=["ERROR"], since=1800)] == [2, 3]
+        assert store._first_position_since(now - 600) == 2
+
+    def test_eviction_keeps_indexes_consistent(self):
+        store = RecordStore(max_records=8)
+        for i in range(20):
+            store.add(make_record(i, process=f"p{i % 2}", level="ERROR" if i % 3 == 0 else "INFO"))
+
+        assert len(store) <= 8
+        remaining = [r.seq for r in store.query(limit=100)]
+        assert remaining == list(range(20 - len(store), 20))
+        assert [r.seq for r in store.query(levels=["ERROR"])] == [s for s in remaining if s % 3 == 0]
+        assert [r.seq for r in store.query(process="p1")] == [s for s in remaining if s % 2 == 1]
+
+    def test_add_line_and_clear(self):
+        store = RecordStore()
+        store.add_line(LogLine(1, time.time(), "logger", "[LOGGER] 2024-05-01 12:00:00 [INFO] api: ok"))
+        store.add_line(LogLine(2, time.time(), "logger", "plain text"))
+        assert len(store) == 1
+
+        store.clear()
+        assert len(store) == 0
+        assert store.query() == []
+        store.add_line(LogLine(3, time.time(), "logger", "[ERROR] api: boom"))
+        assert [r.seq for r in store.query(levels=["ERROR"])] == [3]
@@ -0,0 +1,133 @@
+"""Tests for the Overmind state watcher."""
+
+import asyncio
+import tempfile
+import pytest
+from pathlib import Path
+from unittest.mock import AsyncMock
+
+from mcp_server_overmind.server import OvermindManager
+from mcp_server_overmind.watcher import FileEvents, OvermindWatcher, inotify_supported
+
+
+@pytest.mark.parametrize("use_inotify", [True, False])
+@pytest.mark.asyncio
+async def test_file_events(use_inotify):
+    with tempfile.TemporaryDirectory() as temp_dir:
+        path = Path(temp_dir) / ".overmind.sock"
+        events = FileEvents(path, poll_interval=0.01, use_inotify=use_inotify)
+        try:
+            assert events.inotify == (use_inotify and inotify_supported())
+            assert await events.wait(0.05) is False
+
+            (Path(temp_dir) / "unrelated").touch()
+            path.touch()
+            assert await events.wait(1) is True
+
+            path.unlink()
+            assert await events.wait(1) is True
+
+            events.set()
+            assert await events.wait(0) is True
+        finally:
+            events.close()
+
+
+def status_result(rows):
+    return {
+        "success": True,
+        "stdout": "",
+        "stderr": "",
+        "return_code": 0,
+        "processes": [{"name": name, "pid": 1, "status": status} for name, status in rows],
+    }
+
+
+class TestOvermindWatcher:
+    """Test cases for liveness and transition tracking."""
+
+    @pytest.mark.asyncio
+    async def test_refresh_records_transitions(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            manager = OvermindManager(working_dir=temp_dir)
+            manager.get_status = AsyncMock(return_value=status_result([("web", "running"), ("worker", "running")]))
+            watcher = OvermindWatcher(manager)
+
+            # A socket file nobody listens on is not alive
+            manager.socket_path.touch()
+            assert await watcher.refresh() is False
+            assert watcher.running is False
+            manager.socket_path.unlink()
+
+            server = await asyncio.start_unix_server(lambda r, w: w.close(), str(manager.socket_path))
+            try:
+                assert await watcher.refresh() is True
+                assert watcher.running is True
+                assert watcher.processes == {"web": "running", "worker": "running"}
+
+                manager.get_status.return_value = status_result([("web", "running"), ("worker", "dead")])
+                assert await watcher.refresh() is True
+                assert await watcher.refresh() is False
+            finally:
+                server.close()
+                await server.wait_closed()
+
+            assert await watcher.refresh() is True
+            assert watcher.running is False
+            assert watcher.version == 3
+
+        moves = [(t["process"], t["from"], t["to"]) for t in watcher.transitions]
+        assert moves == [
+            ("overmind", "stopped", "running"),
+            ("web", None, "running"),
+            ("worker", None, "running"),
+            ("worker", "running", "dead"),
+            ("overmind", "running", "stopped"),
+            ("web", "running", None),
+            ("worker", "dead", None),
+        ]
+        snapshot = watcher.snapshot()
+        assert snapshot["running"] is False
+        assert snapshot["version"] == 3
+
+    @pytest.mark.asyncio
+    async def test_background_watch_notifies(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            manager = OvermindManager(working_dir=temp_dir)
+            manager.get_status = AsyncMock(return_value=status_result([("web", "running")]))
+            changes = []
+
+            async def on_change(watcher):
+                changes.append(watcher.running)
+
+            watcher = OvermindWatcher(manager, on_change, status_interval=0.05, poll_interval=0.01)
+            manager.watcher = watcher
+            watcher.start()
+            try:
+                server = await asyncio.start_unix_server(lambda r, w: w.close(), str(manager.socket_path))
+                for _ in range(100):
+                    if changes:
+                        break
+                    await asyncio.sleep(0.01)
+                assert changes == [True]
+
+                # Process crashes are picked up by the status poll
+                manager.get_status.return_value = status_result([("web", "crashed")])
+                manager.invalidate_status()
+                for _ in range(100):
+                    if len(changes) > 1:
+                        break
+                    await asyncio.sleep(0.01)
+                assert watcher.processes == {"web": "crashed"}
+
+                server.close()
+                await server.wait_closed()
+                manager.socket_path.unlink(missing_ok=True)
+                for _ in range(100):
+                    if changes[-1] is False:
+                        break
+                    await asyncio.sleep(0.01)
+                assert changes[-1] is False
+            finally:
+                await watcher.stop()
+            assert not watcher.active